@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Regenerate the service table embedded in port_scanner.py
+
+Usage: python3 build_service_table.py [SOURCE ...]
+
+Each SOURCE is either the IANA registry CSV (service-names-port-numbers.csv, as a
+path or an http(s) URL such as IANA_URL) or a file in services(5) format.
+Earlier sources win when they name the same port. Without arguments
+/etc/services is used. `make services` passes services-overrides, the registry
+(IANA_URL unless IANA= names a local copy) and /etc/services, in that order.
+"""
+
+import base64
+import csv
+import os
+import struct
+import sys
+import tempfile
+import urllib.request
+import zlib
+from array import array
+
+SCANNER_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'port_scanner.py')
+BEGIN_MARKER = '# BEGIN GENERATED SERVICE TABLE'
+END_MARKER = '# END GENERATED SERVICE TABLE'
+PROTOCOLS = ('tcp', 'udp')
+IANA_URL = 'https://www.iana.org/assignments/service-names-port-numbers/service-names-port-numbers.csv'
+
+
+def read_iana_csv(path):
+    """Yield (protocol, port, name) from the IANA service name registry CSV"""
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            name = (row.get('Service Name') or '').strip()
+            protocol = (row.get('Transport Protocol') or '').strip().lower()
+            ports = (row.get('Port Number') or '').strip()
+            if not name or protocol not in PROTOCOLS or not ports:
+                continue
+            first, _, last = ports.partition('-')
+            for port in range(int(first), int(last or first) + 1):
+                yield protocol, port, name
+
+
+def download(url):
+    """Fetch url into a temporary file and return its path"""
+    with urllib.request.urlopen(url, timeout=60) as response, \
+            tempfile.NamedTemporaryFile('wb', suffix='.csv', delete=False) as f:
+        f.write(response.read())
+    return f.name
+
+
+def read_services_file(path):
+    """Yield (protocol, port, name) from a services(5) file"""
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            fields = line.split('#', 1)[0].split()
+            if len(fields) < 2 or '/' not in fields[1]:
+                continue
+            port, _, protocol = fields[1].partition('/')
+            if protocol in PROTOCOLS and port.isdigit():
+                yield protocol, int(port), fields[0]
+
+
+def build_payload(entries):
+    """Pack entries into names plus one little-endian uint16 name index per port and protocol"""
+    names = ['']  # Index 0 means no name
+    name_ids = {}
+    indexes = {protocol: array('H', bytes(2 * 65536)) for protocol in PROTOCOLS}
+    for protocol, port, name in entries:
+        index = indexes[protocol]
+        if not 0 <= port <= 65535 or index[port]:
+            continue
+        if name not in name_ids:
+            name_ids[name] = len(names)
+            names.append(name)
+        index[port] = name_ids[name]
+    names_bytes = '\n'.join(names).encode('utf-8')
+    payload = [struct.pack('<I', len(names_bytes)), names_bytes]
+    for protocol in PROTOCOLS:
+        index = indexes[protocol]
+        if sys.byteorder == 'big':
+            index.byteswap()
+        payload.append(index.tobytes())
+    counts = {protocol: sum(1 for value in indexes[protocol] if value) for protocol in PROTOCOLS}
+    return b''.join(payload), counts
+
+
+def render(payload, width=100):
+    encoded = base64.b85encode(zlib.compress(payload, 9)).decode('ascii')
+    lines = [f"    '{encoded[i:i + width]}'" for i in range(0, len(encoded), width)]
+    return '\n'.join([BEGIN_MARKER, 'SERVICE_TABLE_DATA = (', *lines, ')', END_MARKER])
+
+
+def main(argv=None):
+    sources = (sys.argv[1:] if argv is None else argv) or ['/etc/services']
+    entries = []
+    for path in sources:
+        if path.startswith(('http://', 'https://')):
+            print(f"Downloading {path}")
+            downloaded = download(path)
+            try:
+                entries.extend(read_iana_csv(downloaded))
+            finally:
+                os.unlink(downloaded)
+            continue
+        reader = read_iana_csv if path.lower().endswith('.csv') else read_services_file
+        entries.extend(reader(path))
+    payload, counts = build_payload(entries)
+
+    with open(SCANNER_FILE, encoding='utf-8') as f:
+        source = f.read()
+    start = source.index(BEGIN_MARKER)
+    end = source.index(END_MARKER) + len(END_MARKER)
+    with open(SCANNER_FILE, 'w', encoding='utf-8') as f:
+        f.write(source[:start] + render(payload) + source[end:])
+    print(f"Wrote {counts['tcp']} TCP and {counts['udp']} UDP service names to {SCANNER_FILE}")
+
+
+if __name__ == "__main__":
+    main()
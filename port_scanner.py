@@ -5,16 +5,43 @@ IP Port Scanner - A Linux desktop application for scanning ports on a specified
 
 import socket
 import threading
-from queue import Queue
+import asyncio
+import selectors
+import errno
+import math
+import os
+import mmap
+import struct
+import signal
+import ipaddress
+import itertools
+import functools
+import socketserver
+import argparse
+import sys
+import base64
+import zlib
+import ssl
+import hashlib
+from array import array
+from collections import deque, namedtuple
+import multiprocessing
+from multiprocessing import shared_memory
+from queue import Queue, Empty
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox, filedialog
+from tkinter import ttk, messagebox, filedialog
 import re
 import json
 import csv
-from datetime import datetime
+from datetime import datetime, timezone
 import random
 import time
 
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
 # Common ports and their associated services
 COMMON_SERVICES = {
     20: "FTP Data",
@@ -38,126 +65,3432 @@ COMMON_SERVICES = {
     27017: "MongoDB",
 }
 
+# TCP ports in rough order of how often they are found open: the most frequent hundred
+# from published internet-wide scan statistics, then common database, web and
+# management services. top_ports() ranks every other port after these.
+TOP_PORTS = (
+    80, 23, 443, 21, 22, 25, 3389, 110, 445, 139, 143, 53, 135, 3306, 8080, 1723, 111, 995, 993, 5900, 1025, 587,
+    8888, 199, 1720, 465, 548, 113, 81, 6001, 10000, 514, 5060, 179, 1026, 2000, 8443, 8000, 32768, 554, 26, 1433,
+    49152, 2001, 515, 8008, 49154, 1027, 5666, 646, 5000, 5631, 631, 49153, 8081, 2049, 88, 79, 5800, 106, 2121, 1110,
+    49155, 6000, 513, 990, 5357, 427, 49156, 543, 544, 5101, 144, 7, 389, 8009, 3128, 444, 9999, 5009, 7070, 5190,
+    3000, 5432, 1900, 3986, 13, 1029, 9, 5051, 6646, 49157, 1028, 873, 1755, 2717, 4899, 9100, 119, 37, 1521, 6379,
+    27017, 9200, 11211, 5672, 15672, 9092, 2375, 2376, 6443, 10250, 8086, 9000, 9090, 5601, 7001, 50000, 8001, 8002,
+    8082, 8083, 8088, 8181, 8880, 8889, 9001, 9443, 10443, 1883, 8883, 161, 162, 1194, 636, 3268, 3269, 464, 593,
+    5985, 5986, 47001, 2222, 2082, 2083, 2086, 2087, 2095, 2096, 3690, 4369, 5984, 6666, 6667, 7000, 7443, 8010, 8020,
+    8042, 8069, 8090, 8161, 8200, 8500, 8600, 9042, 9043, 9060, 9080, 9091, 9093, 9300, 9418, 9990, 10001, 25565,
+    28017, 32400, 50070, 61616, 4443, 4444, 4848, 5050, 5222, 5269, 5555, 5938, 6080, 7777, 8444, 8800, 49158, 49159,
+    49160, 49161, 49163, 49165, 49167, 49175, 49176,
+)
 
-class PortScanner:
-    """Core port scanning functionality"""
+# Local port -> service names, used to fill ports the built-in table leaves unnamed
+if os.name == 'nt':
+    SERVICES_FILE = os.path.join(os.environ.get('SystemRoot', r'C:\Windows'), 'System32', 'drivers', 'etc', 'services')
+else:
+    SERVICES_FILE = '/etc/services'
+
+# Precompiled service names, decoded by ServiceTable on the first lookup
+# BEGIN GENERATED SERVICE TABLE
+SERVICE_TABLE_DATA = (
+    'c-rmU2bd&Bb-?jzlS>4NjL11Q==OpTh$sYzAcRB^QB;TNX-%i?>Y3e@jWJGOf^z}`HnwrVIpA!-INLaZZ7^V)<cMvYv%#-=`c|vE'
+    'z1!K_nbFML|Mz{}UDMN{>eZ|2-n+ef?>S28Q4#w6rm1ujn|zeU8*#0RQugXHDoY(2YfTZ=Mh}KToW+f<O%S9_zV7Eq-sn6n;;=S7'
+    'DV0T1M#1=ERTgjRjkKt9KTB;B7jo5p)U$qJ^0+9YSevj(M{&Nc`=xE{nqOEw%#C(u`*juiah01&2bl>6*UBOlskAM#H1hMITsjU+'
+    'l-tJCjV?l|nV;ple|YV%yIN?nOjnguBe%Y7YH3(nBsyPj8f|S<=_u4`(JMF1D3<0#HV$>1rMd_<ee0Sp+bFH|rA<GsFOM7lvMc;U'
+    'Ix53~d^z6uR#$~z$LqsbS|@D_LODOmd}FNKwb%Gbczo+yn`voGC8urJYvQIK>8fw)(&|AS99=u2<vY3WXdJq*%ySn$KR0RNV%U=_'
+    '=Al$MGQLUTqS4ays7$meGreIWQ>9w2ZOg)B-2t)9$Av01#ny&2BaTdC<l4iq9|dw&Zi?~RYC9}^Temm2I<3Q@Ha&aTcTo&n<V_t`'
+    'x~xr@#m07rg+U{SMtQ17QeVFr7Db#%3Q08OK4l#RxgGbV$>hkQ8TzpVViZQH4YlOKxOzkDhZ1<%*m|TRU-CnjmCa*Gy2SNaWtzIo'
+    'd|Tv|yGmS-<EWcD9TjnNNE&Fjj%RQ$mz8n-k#4$Hjgv%z7)DVru8DN@u#WvU6{0Bho3L_S+m+UIXt&cfZZg*?X&C28t&>cW(xsiv'
+    '^=6(m(i+)F7iIeDJiDw4uZ)wcMxjKw+6s*XUUI>OVw`?@!&K7ul^#hLV=duI++Dh0mNxfY3e+P>FS&hMgi=$fPgoYcR1!DNLlgF6'
+    '-Agm6TH`koT&b@c2yxgi-ASRTBW<^2L`cKTR+HwjmP6am>tz$^P%=(pu6xoaZ7%d&#H32r_NC)8Iapg4!1mOQewoTWjNI2s%D1T)'
+    'l%=a}y9ssU&QHopa!cw}ByJG6PLRP7#4fi}Tl$TaQES55FJc+nRaqT&{o*2NhD~1=g`D7)@nDxK1ZipARB*f)CHZ#Q+Cryt+?sCF'
+    '!L9tJmh-|qt$dfzZDE{Qu4mTuW|T|r28kT)g0=42cirKOj$WYCYE#P$;m4zPm`Evcy>4XUFdMGl^>yu9>bh2yb>r$6mXUGwmNb!}'
+    'P|MU9>nw8f(x}eLP>*}l7L`mqX(%x$W&B4n$}5>fH>7)pL7rNhmTu6wDKoWZAT6mI>4sw6O78aj+SPbHUzdEB>tr%p#hWre1!=FR'
+    'vodj0g7moU$1=xBf6Fdi)$P!b?#c!dPPeYhVH4}b^<1TgL%HN&eDYv?X4DU>(J?ppT=Tn6uEBB{)2m9^N`kc=WOvlNZLZ{nWT>`j'
+    '7H;>pF9WU16PX%oHzr+z+3i%bU5?qd3vHVVa%GuJrCgU~FOoXDJT0rZ7*&O?^R$i=84dN8w7VJFqLdc734LAWgX4u<W`(4VB@8lA'
+    'xqIcYObwxnub<n*cU|WynWv3TBq-HJ>N;($=jQ!%XuFMXLK$+Q45QMwp=-EIx=Ar~gF*t4%g#d=9MOqQ6Vt?lICgVTQp*qtN4DzX'
+    'CYdA`Y}XRXHe1}R)@|J`c|^)sl{@v0`bky>CbOyQCY!c{sj`uDnZzv6sdUJi<VWGgQD|j)a-&z$dP`dE8ov=V$NQ@oHtn<_j|j<6'
+    'myLyVnd@`Ok9uA5E|n~IV@zT!Q%RG#`=|2glF$~79mJAqGBL`tS*8}9noXTIg^P^Lo#P1Fv~r6tQ=-g%RdqaZ+HzNouooASVbaQ|'
+    'aQ$l=*D+GtULD6_I?_gx+O})GdFYT^{PB9NT_0}ON80t#c73c}U+6kQk|#6n`EmV+x~Zi((r|5)*k8}viN7to0TYcw<x6gDZt1|t'
+    'yNi3aS%0X5z>c4AZaUr0dHGz`J3o!Gou3Bg2H%zL%W*j<yUPtLNx*nquJcBMuX|-N?k0JP=xQjBu14w-4yF3;1*0oU?sp|gfXzI&'
+    'Yw`*b>FeB!)@C=KbsyY(=W@@;bQc+yOr^Z{4CIw2@H6Y)Y$O3BpW5w4Q5@SIp+~MCt6iwZv(oYIlUETJESVqUs=rmY59F>G%7e2j'
+    '_GQ4eN7-T3hEI;_icyfbQSGiO!7tO=xI`Woy3lkVWL#@o8A(Sw7__r&<vLQvg@i5aC3;hOxLs|?eS_MJ>mmhRr&Z)uMItkWtz6`i'
+    'YFs=v-nh4+)TUC0o+NUAD>H7J4-1+6>MApm@^vN8MtNe&J7rOrZWe8GTV8eJamGuoNDs(l<h!BSjMJ#hi?pl*nf^mR7^Yby(_8EY'
+    '^`_*#%w37hGVUDrp5Wd)23<FeH)*sfC0RE{4zWq<hq+X<E!15h3A-IeT9y_A_dX*J9ygz^NpH)WSX+^%mqw*_E2Uy}y`C(IEPYv0'
+    'S+133AWNolRj5j>OSx9NvpdSoj`FbEj?`YRJ891ssxMNvy}_PWp62{7mgQBlJk}e3{u1?SS%2w{Bfe~p8hk~!eQme>Ds{U(YyCR)'
+    'di4hN#$CSo>h03ks>yuaF8jV-eS^aFzD0fOzK(yBdh<lby=97ZeCr<HzfFC+`i_aN^mg@~`?&9S?YpKwpngdGi2AX8o%1ePeyT0~'
+    'wECHD-_P&({v9Ws@eBK`)i3TSpL?3)zGvbqeqX!({_W52-sPBgp0wvZbIIuU&g81Uqz-v&?M!&YoAjKE<;chFIQj|R;*9(EO>oRb'
+    'Qr}-bOXk5}QNJqdUsJy>>)$xQb<R__Z?|`tORazNl;8Z8`t9xV@9cWS9rwKYW9E{tPu$}!@1MavpX@Da9$w--Wr}tC-Gv`_zqe%b'
+    '#GTspADngXi62lOY`1@ShUfp$Olo!Kc72xvUgfTHkLHKehZm@C@3!X==dVZ>|B1T$jPLM~17G1D>YnZPqv~EKd~<JgpY8I;Cb-g{'
+    '%JS&bJWc*=srv4|{II@H_fz-Z_c?!l#&`R;`h@zV`V?WG*r)eA;!^La-qXCNdzX37@Sf>C%X{{O?}mS|bg_8ALe}apCpzk{NaY*&'
+    '>$%<OfpfUW-z;#XAGEMF`^;SL_ID?Iez1DT)UN&aOEKpDVa4W<&oYhf;veUJ$A41)OxQ6+51rYS|K&z)*S{`#zx*4iIR*c@$M^r<'
+    'ZU19|>ijVE@I8+Buchyo%jGBM=Xm6&^S^}P3_W5lclp0L+~bP5j0OLsJ&&CFJszblIBDPK)aR#smqSaJt7`|nz)Um5o9flSVCLC;'
+    'cp>}vrf207?TEVB%-VhQ0OuZ?N)4{`uIgHMbMF=>wDWmqS%34ww#!^M!)srt9<44q&G)zTZslq39PifNZM@rhw_CXGxe4ik6P)Xv'
+    'cfdTo{f(UGk5PB<?&#fVK}Os2=TwgutjOg5SoOjKwB#;40x>gp^)6nRx;*Xx=iZl5f~E0zLVyMJ1VXUHo~WLrp1kApC8s#<DeCHp'
+    'pO}}PQB7{T>)uP$i@c|*r?us$%kpBW#btAd%l#&9?K37k?wJ!E^(<2ItnlnP-|zAjiQ98XorQA6g4gf4?fS~?&sVAEtxW7+vdc5-'
+    '`RWBzzt7F4c&!)ivhQm3BK2bRlI_ngm3F;U-QRnF_rRt9Dg9+Dl4~zNi{`YK?K|tP;X$y}9<-y!U(TNl;zsd`llB;OjTg-Pz7O#p'
+    'dd4~bFz*$f@dC!o6y2N<0GNpfGgo6~9=;OU71EIh@(AV_00000000000001h8My@^0002M4D|R7U|?nWjBfw{0000000000003Zx'
+    'J+l1`p-1t1LVLJ?2mt^90000inS?*l0RUh{-I5Rh00000T7CW;7{FQWR)hcm00000006Lyl)ps-0002a5}FWTg++t_0000000000'
+    '0000000000000000000000000000000000000000Fcaqx0ssI20000009MGY2>}2A0000000000000000000004%L*Jz@X=00000'
+    '0000M-M~{S<8L(p004jq+=dVU0000000000008E$Cri?m(;fRWS;{@mwWruW?6#xRoV%em)z(BceC58{^XgOV|MJtE^Ofo~`?|;L'
+    ')a%t7)EiIv{nt#XZ@zH_^X;3|H_!YYZ&Gho-!{Q<Z<*pf-@3>5Z=3i^Z=X_)zWWsWe^C9f`q8%Z<LW15{gV@1>s=>&{#o^NH~9RH'
+    'g~_k)J>@s=-euoAPulaIr5;^}yfyFe8U5z|;}`Jv{olvq8B5{)dwl;S{x!`~`+Y*N1U{fXIM@6A@k&SYL+ZmzRp0X&02BJi)UNc='
+    '(|-Fgb<{iNUC6T!3*zJI6Y7)dQv_mSpC$wV4&-kavR0p=V{ibUB?JHfteF2^n40_#odK+v&#BK71WdtA_#2jm^IZA_0I;WXz4Lfp'
+    'U@6_1%*71d&AV8g@7>+Ihj&lOw0n8?_U=Q*0RR91000000000000000000000000000000z>OmGA}{9ugaZHo000000000000000'
+    '0000000000000000001U(dU0b1ONa40000000000000000000000000000000000000000000000000000000000000000000000'
+    '000000000000000000000000000000000000000000000000000000000000003Ym{Xg)`@3{'
+)
+# END GENERATED SERVICE TABLE
+
+# File descriptors kept free for the GUI, logging and other sockets
+FD_RESERVE = 64
+
+
+def fd_budget(default=1024):
+    """Return how many sockets can safely be open at once under RLIMIT_NOFILE"""
+    if resource is None:
+        return default - FD_RESERVE
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft == resource.RLIM_INFINITY:
+        soft = 65536
+    return max(1, soft - FD_RESERVE)
+
+
+def raise_fd_limit(target=65536):
+    """
+    Raise the soft RLIMIT_NOFILE toward the hard limit (at most target) and return fd_budget()
     
-    def __init__(self, target_ip, start_port, end_port, timeout=0.3, randomize=False, scan_delay=0):
-        self.target_ip = target_ip
-        self.start_port = start_port
-        self.end_port = end_port
-        self.timeout = timeout
-        self.randomize = randomize
-        self.scan_delay = scan_delay
-        self.open_ports = []
-        self.queue = Queue()
+    Distributions default the soft limit to 1024, which would cap the
+    non-blocking engines at under a thousand connects however high the hard
+    limit is. Failures leave the limit as it was.
+    """
+    if resource is not None:
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        wanted = target if hard == resource.RLIM_INFINITY else min(hard, target)
+        if soft != resource.RLIM_INFINITY and soft < wanted:
+            try:
+                resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+            except (ValueError, OSError):
+                pass
+    return fd_budget()
+
+
+# Seconds a locally closed connection holds its ephemeral port (Linux TCP_TIMEWAIT_LEN)
+TIME_WAIT_SECONDS = 60
+
+# SO_LINGER on with a zero timeout: close() sends a RST and skips TIME_WAIT
+LINGER_RESET = struct.pack('ii', 1, 0)
+
+
+def ephemeral_port_range(path='/proc/sys/net/ipv4/ip_local_port_range'):
+    """Return the (low, high) local port range connects draw from, or the IANA range when unknown"""
+    try:
+        with open(path) as f:
+            low, high = (int(field) for field in f.read().split()[:2])
+        if 0 < low <= high <= 65535:
+            return low, high
+    except (OSError, ValueError):
+        pass
+    return 49152, 65535
+
+
+class EphemeralPortBudget:
+    """
+    Tracks the local ports held in TIME_WAIT by probes this process closed
+    
+    Only completed handshakes that we close leave TIME_WAIT behind, for
+    time_wait seconds each. Once the ports held reach the budget (the
+    ephemeral range less a reserve for other sockets), wait() holds new probes
+    until the oldest expire. When connects fail with EADDRNOTAVAIL anyway, for
+    instance because other processes use the range too, exhausted() makes
+    wait() back off exponentially up to max_backoff until connects succeed.
+    """
+    
+    def __init__(self, port_range=None, time_wait=TIME_WAIT_SECONDS, reserve=0.1, max_backoff=2.0,
+                 clock=time.monotonic, limit=None):
+        low, high = self.port_range = port_range or ephemeral_port_range()
+        self.size = high - low + 1
+        self.limit = limit or max(1, int(self.size * (1 - reserve)))
+        self.time_wait = time_wait
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self.closes = deque()  # Close times of connections still in TIME_WAIT
+        self.exhaustions = 0  # EADDRNOTAVAIL failures seen
+        self.backoff = 0.0
+        self.hold_until = 0.0
         self.lock = threading.Lock()
-        self.ports_scanned = 0
-        self.total_ports = 0
+    
+    def scaled(self, fraction):
+        """Return a fresh budget holding fraction of the ports this one has free (for splitting it across processes)"""
+        return EphemeralPortBudget(self.port_range, self.time_wait, max_backoff=self.max_backoff, clock=self.clock,
+                                   limit=max(1, int((self.limit - self.held) * fraction)))
+    
+    def _expire(self, now):
+        # Callers hold self.lock
+        while self.closes and self.closes[0] + self.time_wait <= now:
+            self.closes.popleft()
+    
+    @property
+    def held(self):
+        """Local ports currently believed to be in TIME_WAIT"""
+        with self.lock:
+            self._expire(self.clock())
+            return len(self.closes)
+    
+    def record_close(self):
+        """Account for a closed connection that enters TIME_WAIT"""
+        with self.lock:
+            self.closes.append(self.clock())
+    
+    def exhausted(self):
+        """Note a connect that failed with EADDRNOTAVAIL"""
+        with self.lock:
+            self.exhaustions += 1
+            now = self.clock()
+            # Probes already in flight when the hold started fail together; count them once
+            if now >= self.hold_until:
+                self.backoff = min(self.max_backoff, max(0.05, self.backoff * 2))
+                self.hold_until = now + self.backoff
+    
+    def recovered(self):
+        """Note a connect that got a local port again"""
+        if self.backoff:
+            with self.lock:
+                self.backoff = 0.0
+    
+    def delay(self):
+        """Return how long the next probe should wait for a local port"""
+        with self.lock:
+            now = self.clock()
+            self._expire(now)
+            wait = self.hold_until - now
+            if len(self.closes) >= self.limit:
+                wait = max(wait, self.closes[len(self.closes) - self.limit] + self.time_wait - now)
+            return max(0.0, wait)
+    
+    def wait(self, control=None):
+        """Block until a local port should be free; returns False if control was cancelled meanwhile"""
+        delay = self.delay()
+        while delay > 0:
+            if control and control.is_cancelled:
+                return False
+            time.sleep(min(delay, 0.1))
+            delay = self.delay()
+        return True
+
+
+_port_budget = EphemeralPortBudget()  # TIME_WAIT is per machine, so every scan shares one budget
+
+
+def usable_cpu_count():
+    """Return the number of CPUs this process may use, honouring affinity and cgroup quotas"""
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = os.cpu_count() or 1
+    
+    # cgroup v2 exposes "quota period", cgroup v1 splits them across two files
+    quota = period = None
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            fields = f.read().split()
+        if fields[0] != 'max':
+            quota, period = int(fields[0]), int(fields[1])
+    except (OSError, ValueError, IndexError):
+        try:
+            with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as f:
+                quota = int(f.read())
+            with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as f:
+                period = int(f.read())
+        except (OSError, ValueError):
+            quota = period = None
+    if quota and period and quota > 0:
+        count = min(count, max(1, math.ceil(quota / period)))
+    return max(1, count)
+
+
+# connect_ex codes meaning the local host ran out of sockets, buffers or ephemeral ports; the probe never left
+RESOURCE_ERRNOS = frozenset({errno.EMFILE, errno.ENFILE, errno.ENOBUFS, errno.ENOMEM, errno.EADDRNOTAVAIL})
+
+# connect_ex codes meaning the probe got no answer before the timeout
+TIMEOUT_ERRNOS = frozenset({errno.EAGAIN, errno.EWOULDBLOCK, errno.ETIMEDOUT, errno.EINPROGRESS})
+
+# connect_ex codes meaning a router or firewall rejected the probe (ICMP unreachable, local REJECT)
+UNREACHABLE_ERRNOS = frozenset({errno.EHOSTUNREACH, errno.ENETUNREACH, errno.EACCES, errno.EPERM})
+
+# Outcome of a single probe
+PORT_OPEN = 'open'
+PORT_CLOSED = 'closed'      # The host answered with a reset
+PORT_FILTERED = 'filtered'  # No answer, or an unreachable from something in the path
+PORT_ERROR = 'error'        # The probe failed locally
+PORT_STATES = (PORT_OPEN, PORT_CLOSED, PORT_FILTERED, PORT_ERROR)
+
+# A classified probe: state plus the raw connect_ex errno and seconds until the answer
+ProbeResult = namedtuple('ProbeResult', ['port', 'state', 'errno', 'elapsed'])
+
+
+def classify_errno(code):
+    """Map a connect_ex errno to one of PORT_STATES"""
+    if code == 0:
+        return PORT_OPEN
+    if code == errno.ECONNREFUSED:
+        return PORT_CLOSED
+    if code in TIMEOUT_ERRNOS or code in UNREACHABLE_ERRNOS:
+        return PORT_FILTERED
+    return PORT_ERROR
+
+
+def format_port_ranges(ports):
+    """Render ports compactly as sorted runs, e.g. '1-21,23,25-79'"""
+    runs = []
+    for port in sorted(ports):
+        if runs and port == runs[-1][1] + 1:
+            runs[-1][1] = port
+        else:
+            runs.append([port, port])
+    return ','.join(str(lo) if lo == hi else f"{lo}-{hi}" for lo, hi in runs)
+
+
+class ServiceTable:
+    """
+    O(1) port -> service name lookups for TCP and UDP
+    
+    SERVICE_TABLE_DATA holds the names and one uint16 name index per port and
+    protocol, compressed (regenerate it with build_service_table.py). Nothing is
+    decoded until the first lookup. Entries from the local services file fill the
+    ports the table leaves unnamed, and COMMON_SERVICES keeps its display names.
+    """
+    
+    PROTOCOLS = ('tcp', 'udp')
+    
+    def __init__(self, data=None, services_file=None):
+        self.data = SERVICE_TABLE_DATA if data is None else data
+        self.services_file = SERVICES_FILE if services_file is None else services_file
+        self.names = None
+        self.indexes = None  # protocol -> array of name indexes by port
+        self.lock = threading.Lock()
+    
+    def _decode(self):
+        empty = array('H', bytes(2 * 65536))
+        if not self.data:
+            return ["Unknown Service"], {protocol: array('H', empty) for protocol in self.PROTOCOLS}
+        payload = zlib.decompress(base64.b85decode(self.data))
+        names_length, = struct.unpack_from('<I', payload)
+        offset = 4 + names_length
+        names = payload[4:offset].decode('utf-8').split('\n')
+        names[0] = "Unknown Service"
+        indexes = {}
+        for protocol in self.PROTOCOLS:
+            index = array('H')
+            index.frombytes(payload[offset:offset + 2 * 65536])
+            if sys.byteorder == 'big':
+                index.byteswap()
+            indexes[protocol] = index
+            offset += 2 * 65536
+        return names, indexes
+    
+    def _read_services_file(self):
+        """Yield (protocol, port, name) from the local services file, if there is one"""
+        try:
+            with open(self.services_file, encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    fields = line.split('#', 1)[0].split()
+                    if len(fields) < 2 or '/' not in fields[1]:
+                        continue
+                    port, _, protocol = fields[1].partition('/')
+                    if protocol in self.PROTOCOLS and port.isdigit() and int(port) <= 65535:
+                        yield protocol, int(port), fields[0]
+        except OSError:
+            return
+    
+    def load(self):
+        """Decode the table and merge in local and display names; called by the first lookup"""
+        with self.lock:
+            if self.indexes is not None:
+                return
+            names, indexes = self._decode()
+            name_ids = {}
+            
+            def name_id(name):
+                if name not in name_ids:
+                    name_ids[name] = len(names)
+                    names.append(name)
+                return name_ids[name]
+            
+            for protocol, port, name in self._read_services_file():
+                if not indexes[protocol][port]:
+                    indexes[protocol][port] = name_id(name)
+            for port, name in COMMON_SERVICES.items():
+                indexes['tcp'][port] = name_id(name)
+            self.names = names
+            self.indexes = indexes
+    
+    def lookup(self, port, protocol='tcp'):
+        """Return the service name for port, or 'Unknown Service' when it has none"""
+        if self.indexes is None:
+            self.load()
+        if not 0 <= port <= 65535:
+            return self.names[0]
+        return self.names[self.indexes[protocol][port]]
+    
+    def __len__(self):
+        """Number of named (protocol, port) entries"""
+        if self.indexes is None:
+            self.load()
+        return sum(len(index) - index.count(0) for index in self.indexes.values())
+
+
+_service_table = ServiceTable()
+
+
+def service_name(port, protocol='tcp'):
+    """Return the service name for a port from the shared, lazily loaded ServiceTable"""
+    return _service_table.lookup(port, protocol)
+
+
+_port_ranking = None
+
+
+def top_ports(count, start_port=1, end_port=65535):
+    """
+    Return the count ports within start_port-end_port most likely to be open, most likely first
+    
+    TOP_PORTS leads the ranking. The remaining well-known ports follow, then the
+    other ports the service table names, then everything else in ascending order.
+    """
+    global _port_ranking
+    if _port_ranking is None:
+        ranked = list(dict.fromkeys(TOP_PORTS))
+        seen = set(ranked)
+        named = set(port for port in range(1, 65536) if service_name(port) != "Unknown Service")
+        for group in (range(1, 1025), sorted(named), range(1, 65536)):
+            for port in group:
+                if port not in seen:
+                    seen.add(port)
+                    ranked.append(port)
+        _port_ranking = ranked
+    if start_port <= 1 and end_port >= 65535:
+        return _port_ranking[:count]
+    return list(itertools.islice((port for port in _port_ranking if start_port <= port <= end_port), count))
+
+
+class ConcurrencyController:
+    """
+    AIMD controller for the number of probes allowed in flight
+    
+    The limit grows additively (doubling during the initial slow start) while
+    outcomes stay healthy, and is cut multiplicatively when local resource errors
+    appear or the timeout ratio of a window rises above its running baseline.
+    The baseline keeps mostly-filtered hosts from being mistaken for congestion.
+    """
+    
+    def __init__(self, ceiling, initial=32, minimum=4, increase=8, decrease=0.5, window=64, timeout_margin=0.2):
+        self.ceiling = max(1, min(ceiling, raise_fd_limit()))
+        self.minimum = min(minimum, self.ceiling)
+        self.limit = max(self.minimum, min(initial, self.ceiling))
+        self.increase = increase
+        self.decrease = decrease
+        self.window = window
+        self.timeout_margin = timeout_margin
+        self.slow_start = True
+        self.in_flight = 0
+        self.outcomes = 0
+        self.timeouts = 0
+        self.timeout_baseline = None
+        self.condition = threading.Condition()
+    
+    def acquire(self):
+        """Block until another probe may start"""
+        with self.condition:
+            while self.in_flight >= self.limit:
+                self.condition.wait()
+            self.in_flight += 1
+    
+    def release(self, code):
+        """Finish a probe with its connect_ex code and adjust the limit"""
+        with self.condition:
+            self.in_flight -= 1
+            if code in RESOURCE_ERRNOS:
+                self._back_off()
+            else:
+                self.outcomes += 1
+                if code in TIMEOUT_ERRNOS:
+                    self.timeouts += 1
+                if self.outcomes >= self.window:
+                    self._end_window()
+            self.condition.notify_all()
+    
+    def _end_window(self):
+        ratio = self.timeouts / self.outcomes
+        self.outcomes = self.timeouts = 0
+        if self.timeout_baseline is None:
+            self.timeout_baseline = ratio
+        if ratio > self.timeout_baseline + self.timeout_margin:
+            self._back_off()
+            return
+        self.timeout_baseline = 0.9 * self.timeout_baseline + 0.1 * ratio
+        if self.slow_start:
+            self.limit = min(self.ceiling, self.limit * 2)
+        else:
+            self.limit = min(self.ceiling, self.limit + self.increase)
+    
+    def _back_off(self):
+        self.slow_start = False
+        self.limit = max(self.minimum, int(self.limit * self.decrease))
+        self.outcomes = self.timeouts = 0
+
+
+class RttEstimator:
+    """
+    Per-host smoothed RTT and variance estimates, in the style of TCP's RTO (RFC 6298)
+    
+    Samples come from probes that got an answer (a completed handshake or a RST).
+    Each probe's timeout is SRTT + 4 * RTTVAR, clamped to [min_timeout, max_timeout];
+    hosts without samples yet use the initial timeout.
+    """
+    
+    ALPHA = 0.125
+    BETA = 0.25
+    K = 4
+    GRANULARITY = 0.01
+    
+    def __init__(self, initial_timeout, min_timeout=0.05, max_timeout=3.0):
+        self.initial_timeout = initial_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.estimates = {}  # host -> (srtt, rttvar)
+        self.lock = threading.Lock()
+    
+    def observe(self, host, rtt):
+        """Fold one measured round-trip time for host into its estimate"""
+        with self.lock:
+            estimate = self.estimates.get(host)
+            if estimate is None:
+                self.estimates[host] = (rtt, rtt / 2)
+                return
+            srtt, rttvar = estimate
+            rttvar = (1 - self.BETA) * rttvar + self.BETA * abs(srtt - rtt)
+            srtt = (1 - self.ALPHA) * srtt + self.ALPHA * rtt
+            self.estimates[host] = (srtt, rttvar)
+    
+    def timeout_for(self, host):
+        """Return the timeout to use for the next probe against host"""
+        estimate = self.estimates.get(host)
+        if estimate is None:
+            return self.initial_timeout
+        srtt, rttvar = estimate
+        rto = srtt + max(self.GRANULARITY, self.K * rttvar)
+        return min(self.max_timeout, max(self.min_timeout, rto))
+
+
+class TokenBucket:
+    """
+    Token bucket expressed as a theoretical arrival time (GCRA)
+    
+    Holding one timestamp instead of a token count makes it cheap to ask when the
+    next probe may go without consuming anything, and to book a future slot exactly.
+    """
+    
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tat = 0.0  # theoretical arrival time of the next conforming probe
+    
+    def allowed_at(self, interval_scale=1.0):
+        """Earliest time a probe conforms to this bucket"""
+        return self.tat - (self.burst - 1) * interval_scale / self.rate
+    
+    def consume(self, at, interval_scale=1.0):
+        """Book a probe sent at the given time"""
+        self.tat = max(self.tat, at) + interval_scale / self.rate
+
+
+class RateLimiter:
+    """
+    Shared, hierarchical probes-per-second budgets
+    
+    Every probe must conform to the global bucket, the bucket of its /24 and the
+    bucket of its host. reserve() books the next slot ahead of time, which paces a
+    single stream exactly no matter how many workers ask; try_acquire() only takes a
+    slot that is free now, so schedulers juggling many hosts can pick another host
+    instead of queueing behind a throttled one. acquire() blocks thread workers with
+    a single pacing thread per host. During ramp_time the rates climb
+    linearly from 10% to 100% instead of starting at full speed.
+    """
+    
+    RAMP_FLOOR = 0.1
+    
+    def __init__(self, global_rate=None, subnet_rate=None, host_rate=None, burst=1, ramp_time=0):
+        self.global_rate = global_rate
+        self.subnet_rate = subnet_rate
+        self.host_rate = host_rate
+        self.burst = burst
+        self.ramp_time = ramp_time
+        self.started = None
+        self.global_bucket = TokenBucket(global_rate, burst) if global_rate else None
+        self.subnet_buckets = {}
+        self.host_buckets = {}
+        self.lock = threading.Lock()
+        self.pacing = {}  # host -> deque of blocked acquire() calls; the first one paces
+        self.condition = threading.Condition()
+    
+    def scaled(self, fraction):
+        """Return a fresh limiter with every rate multiplied by fraction (for splitting a budget)"""
+        scale = lambda rate: rate * fraction if rate else rate
+        return RateLimiter(scale(self.global_rate), scale(self.subnet_rate), scale(self.host_rate),
+                           burst=self.burst, ramp_time=self.ramp_time)
+    
+    def _buckets(self, host):
+        buckets = []
+        if self.global_bucket:
+            buckets.append(self.global_bucket)
+        if self.subnet_rate:
+            subnet = host.rsplit('.', 1)[0]
+            if subnet not in self.subnet_buckets:
+                self.subnet_buckets[subnet] = TokenBucket(self.subnet_rate, self.burst)
+            buckets.append(self.subnet_buckets[subnet])
+        if self.host_rate:
+            if host not in self.host_buckets:
+                self.host_buckets[host] = TokenBucket(self.host_rate, self.burst)
+            buckets.append(self.host_buckets[host])
+        return buckets
+    
+    def _interval_scale(self, now):
+        if self.started is None:
+            self.started = now
+        if not self.ramp_time:
+            return 1.0
+        progress = (now - self.started) / self.ramp_time
+        return 1.0 / min(1.0, max(self.RAMP_FLOOR, progress))
+    
+    def try_acquire(self, host, now=None):
+        """
+        Take a slot for host if one is free now
+        
+        Returns 0 when the probe may go immediately, otherwise the number of seconds
+        until it would conform; nothing is consumed in that case.
+        """
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            scale = self._interval_scale(now)
+            buckets = self._buckets(host)
+            allowed = max((bucket.allowed_at(scale) for bucket in buckets), default=now)
+            if allowed > now:
+                return allowed - now
+            for bucket in buckets:
+                bucket.consume(now, scale)
+            return 0.0
+    
+    def reserve(self, host, now=None):
+        """Book the earliest conforming slot for host and return the seconds until it"""
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            scale = self._interval_scale(now)
+            buckets = self._buckets(host)
+            at = max([now] + [bucket.allowed_at(scale) for bucket in buckets])
+            for bucket in buckets:
+                bucket.consume(at, scale)
+            return at - now
+    
+    def acquire(self, host, cancelled=None):
+        """
+        Block the calling thread until a slot for host is free
+        
+        One thread per host paces on the buckets with try_acquire; the others wait
+        their turn in arrival order on a condition, so a pool of workers never
+        sits in sleeps booked ahead of time. Setting the cancelled Event wakes
+        them all at once; nothing is consumed and False is returned.
+        """
+        ticket = object()
+        with self.condition:
+            queue = self.pacing.setdefault(host, deque())
+            queue.append(ticket)
+        try:
+            with self.condition:
+                # First come, first paced: a thread that just took a slot can't barge ahead of the waiters
+                while queue[0] is not ticket:
+                    if cancelled is not None and cancelled.is_set():
+                        return False
+                    self.condition.wait()
+            while True:
+                delay = self.try_acquire(host)
+                if not delay:
+                    return True
+                if cancelled is None:
+                    time.sleep(delay)
+                elif cancelled.wait(delay):
+                    return False
+        finally:
+            with self.condition:
+                queue.remove(ticket)
+                if not queue:
+                    del self.pacing[host]
+                self.condition.notify_all()
+
+
+class ScanJournal:
+    """
+    Append-only checkpoint journal that lets an interrupted scan be resumed
+    
+    The file is JSON lines: a header describing the scan, then batches of completed
+    port ranges ({"h": host, "d": [[lo, hi], ...]}) and hits ({"h": host, "o": port}).
+    Records are buffered and flushed with fsync every fsync_interval seconds, so a
+    crash loses at most that much work. A torn final line is ignored on load.
+    """
+    
+    VERSION = 1
+    
+    def __init__(self, path, header, fsync_interval=1.0):
+        self.path = path
+        self.header = dict(header, journal=self.VERSION)
+        self.fsync_interval = fsync_interval
+        self.done = {}  # host -> bitmap of completed ports
+        self.hits = {}  # host -> list of open ports
+        self.completed_count = 0
+        self.finished = False
+        self.pending_done = {}
+        self.pending_lines = []
+        self.lock = threading.Lock()
+        
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        if exists:
+            self._load()
+        self.file = open(path, 'a')
+        if not exists:
+            self.file.write(json.dumps(self.header) + "\n")
+            self._sync()
+        self.last_flush = time.monotonic()
+    
+    @staticmethod
+    def read_header(path):
+        """Return the header of an existing journal"""
+        with open(path) as f:
+            return json.loads(f.readline())
+    
+    def _load(self):
+        with open(self.path) as f:
+            header = json.loads(f.readline())
+            for key in ('target', 'start_port', 'end_port', 'top_ports'):
+                if header.get(key) != self.header.get(key):
+                    raise ValueError(f"Journal {self.path} belongs to a different scan ({key} differs)")
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break  # Torn write from a crash; everything before it is intact
+                if 'd' in record:
+                    bitmap = self._bitmap(record['h'])
+                    for lo, hi in record['d']:
+                        for port in range(lo, hi + 1):
+                            if not bitmap[port >> 3] & (1 << (port & 7)):
+                                bitmap[port >> 3] |= 1 << (port & 7)
+                                self.completed_count += 1
+                elif 'o' in record:
+                    self.hits.setdefault(record['h'], []).append(record['o'])
+                elif record.get('complete'):
+                    self.finished = True
+    
+    def _bitmap(self, host):
+        if host not in self.done:
+            self.done[host] = bytearray(65536 // 8)
+        return self.done[host]
+    
+    def is_done(self, host, port):
+        """Return True if host:port was completed in an earlier run"""
+        bitmap = self.done.get(host)
+        return bool(bitmap and bitmap[port >> 3] & (1 << (port & 7)))
+    
+    def record(self, host, port, is_open):
+        """Note a finished probe; flushes to disk when the fsync interval has passed"""
+        with self.lock:
+            self.pending_done.setdefault(host, []).append(port)
+            if is_open:
+                self.pending_lines.append(json.dumps({'h': host, 'o': port}))
+            if time.monotonic() - self.last_flush >= self.fsync_interval:
+                self._flush()
+    
+    @staticmethod
+    def _ranges(ports):
+        """Coalesce ports into sorted [lo, hi] runs"""
+        ranges = []
+        for port in sorted(ports):
+            if ranges and port == ranges[-1][1] + 1:
+                ranges[-1][1] = port
+            else:
+                ranges.append([port, port])
+        return ranges
+    
+    def _flush(self):
+        # Hits go first so a torn write can only ever lose "done" marks, never results
+        lines = self.pending_lines
+        for host, ports in self.pending_done.items():
+            lines.append(json.dumps({'h': host, 'd': self._ranges(ports)}, separators=(',', ':')))
+        if lines:
+            self.file.write("\n".join(lines) + "\n")
+            self._sync()
+        self.pending_done = {}
+        self.pending_lines = []
+        self.last_flush = time.monotonic()
+    
+    def _sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+    
+    def flush(self):
+        """Write and fsync everything recorded so far"""
+        with self.lock:
+            self._flush()
+    
+    def close(self, complete=False):
+        """Flush outstanding records, marking the scan complete if it finished"""
+        with self.lock:
+            self._flush()
+            if complete:
+                self.file.write(json.dumps({'complete': True}) + "\n")
+                self._sync()
+            self.file.close()
+
+
+class ResultStream:
+    """
+    Appends one record per open port to NDJSON or CSV while the scan runs
+    
+    Records are buffered and written out every flush_interval seconds, or as
+    soon as buffer_size are waiting, by the writer or a background flusher, so
+    memory stays constant and a killed process loses at most flush_interval
+    seconds of results. With fsync they also survive a machine crash. A path of
+    '-' streams to stdout for piping.
+    """
+    
+    FORMATS = ('ndjson', 'csv')
+    CSV_COLUMNS = ('host', 'port', 'service', 'time')
+    
+    def __init__(self, path, file_format='ndjson', flush_interval=1.0, buffer_size=256, fsync=False, append=False):
+        if file_format not in self.FORMATS:
+            raise ValueError(f"Unsupported stream format: {file_format}")
+        self.path = path
+        self.file_format = file_format
+        self.flush_interval = flush_interval
+        self.buffer_size = buffer_size
+        self.fsync = fsync and path != '-'
+        self.count = 0
+        self.pending = []
+        self.lock = threading.Lock()
+        
+        if path == '-':
+            self.file = sys.stdout
+            needs_header = True
+        else:
+            needs_header = not (append and os.path.exists(path) and os.path.getsize(path) > 0)
+            self.file = open(path, 'a' if append else 'w', newline='')
+        self.csv_writer = csv.writer(self.file) if file_format == 'csv' else None
+        if self.csv_writer and needs_header:
+            self.csv_writer.writerow(self.CSV_COLUMNS)
+            self._sync()
+        self.last_flush = time.monotonic()
+        
+        self.stopped = threading.Event()
+        self.flusher = threading.Thread(target=self._flush_periodically)
+        self.flusher.daemon = True
+        self.flusher.start()
+    
+    def write(self, host, port, service):
+        """Queue a record for an open port"""
+        record = (host, port, service, datetime.now(timezone.utc).isoformat(timespec='seconds'))
+        with self.lock:
+            self.pending.append(record)
+            self.count += 1
+            if len(self.pending) >= self.buffer_size or time.monotonic() - self.last_flush >= self.flush_interval:
+                self._flush()
+    
+    def _flush_periodically(self):
+        # Results found just before a quiet spell still reach the file within flush_interval
+        while not self.stopped.wait(self.flush_interval):
+            self.flush()
+    
+    def _flush(self):
+        # Callers hold self.lock
+        if self.pending:
+            if self.csv_writer:
+                self.csv_writer.writerows(self.pending)
+            else:
+                self.file.write(''.join(json.dumps(dict(zip(self.CSV_COLUMNS, record))) + "\n"
+                                        for record in self.pending))
+            self._sync()
+        self.pending = []
+        self.last_flush = time.monotonic()
+    
+    def _sync(self):
+        self.file.flush()
+        if self.fsync:
+            os.fsync(self.file.fileno())
+    
+    def flush(self):
+        """Write out every queued record"""
+        with self.lock:
+            self._flush()
+    
+    def close(self):
+        """Flush outstanding records and close the file (stdout is left open)"""
+        self.stopped.set()
+        self.flusher.join()
+        with self.lock:
+            self._flush()
+            if self.file is not sys.stdout:
+                self.file.close()
+
+
+class ScanControl:
+    """
+    Cooperative cancel and pause/resume switch shared by a scan and its owner
+    
+    Workers check it before taking each probe. Cancelling also shuts down every
+    socket registered as in flight so blocked connects return immediately.
+    """
+    
+    def __init__(self):
+        self.cancelled = threading.Event()
+        self.running = threading.Event()
+        self.running.set()
+        self.sockets = set()
+        self.lock = threading.Lock()
+        self.started = False  # Set by the first reset(), i.e. once a run has begun
+    
+    @property
+    def is_cancelled(self):
+        return self.cancelled.is_set()
+    
+    @property
+    def is_paused(self):
+        return not self.running.is_set()
+    
+    def cancel(self):
+        """Stop handing out probes and abort the ones in flight"""
+        self.cancelled.set()
+        self.running.set()  # Release paused workers so they can exit
+        with self.lock:
+            for sock in self.sockets:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+    
+    def pause(self):
+        """Stop handing out new probes until resume() is called"""
+        self.running.clear()
+    
+    def resume(self):
+        """Continue handing out probes after pause()"""
+        self.running.set()
+    
+    def wait_if_paused(self):
+        """Block while paused; return False once the scan has been cancelled"""
+        if not self.running.is_set():  # is_set() takes no lock, keeping the common case cheap
+            self.running.wait()
+        return not self.cancelled.is_set()
+    
+    def reset(self):
+        """
+        Re-arm the control for another run
+        
+        A cancel or pause issued before the first run is kept, so a Stop that lands
+        between creating a scanner and starting it still stops that run.
+        """
+        if self.started:
+            self.cancelled.clear()
+            self.running.set()
+        self.started = True
+    
+    def register(self, sock):
+        """Track a socket so cancel() can abort it"""
+        with self.lock:
+            self.sockets.add(sock)
+    
+    def unregister(self, sock):
+        """Stop tracking a socket once its probe has finished"""
+        with self.lock:
+            self.sockets.discard(sock)
+
+
+class PortStateMatrix:
+    """
+    Bit-packed (host, port) state store, two bits per port
+    
+    Each host owns a 16 KiB row covering ports 0-65535, so a /16 x all-ports scan
+    needs 1 GiB. Codes are 0 = unknown (not scanned, or the probe failed locally),
+    1 = open, 2 = closed, 3 = filtered. With a path the matrix lives in an mmap'd
+    file that stays queryable after the scan via PortStateMatrix.open(path).
+    
+    Queries run over whole rows or columns with bytes.translate and a regex search
+    for non-zero bytes, so only bytes holding a match are visited in Python.
+    Writers must serialize set() calls themselves (scanners hold their lock).
+    """
+    
+    MAGIC = b'PSM1'
+    ROW_BYTES = 65536 // 4
+    CODES = {PORT_OPEN: 1, PORT_CLOSED: 2, PORT_FILTERED: 3}
+    STATES = {code: state for state, code in CODES.items()}
+    # byte -> bitmask of its four lanes holding each code, for row queries
+    ROW_TABLES = {code: bytes(sum(1 << lane for lane in range(4) if (byte >> 2 * lane) & 3 == code)
+                              for byte in range(256))
+                  for code in (1, 2, 3)}
+    # (lane, code) -> byte -> 1 if that lane holds the code, for column queries
+    COLUMN_TABLES = {(lane, code): bytes(int((byte >> 2 * lane) & 3 == code) for byte in range(256))
+                     for lane in range(4) for code in (1, 2, 3)}
+    
+    def __init__(self, hosts, path=None):
+        self.hosts = list(hosts)
+        self.rows = {host: row for row, host in enumerate(self.hosts)}
+        self.path = path
+        self.file = None
+        size = len(self.hosts) * self.ROW_BYTES
+        if path is None:
+            self.offset = 0
+            self.buffer = bytearray(size)
+            return
+        # Header: magic, host count, packed IPv4 addresses; the matrix follows
+        header = self.MAGIC + struct.pack('<I', len(self.hosts))
+        header += b''.join(ipaddress.IPv4Address(host).packed for host in self.hosts)
+        self.offset = len(header)
+        self.file = open(path, 'w+b')
+        self.file.write(header)
+        self.file.truncate(self.offset + size)
+        self.buffer = mmap.mmap(self.file.fileno(), self.offset + size)
+    
+    @classmethod
+    def open(cls, path):
+        """Map an existing matrix file, e.g. to query a finished scan"""
+        matrix = cls.__new__(cls)
+        matrix.path = path
+        matrix.file = open(path, 'r+b')
+        prefix = matrix.file.read(8)
+        if len(prefix) < 8 or prefix[:4] != cls.MAGIC:
+            matrix.file.close()
+            raise ValueError(f"{path} is not a port state matrix")
+        count = struct.unpack('<I', prefix[4:])[0]
+        packed = matrix.file.read(4 * count)
+        matrix.hosts = [str(ipaddress.IPv4Address(packed[i:i + 4])) for i in range(0, len(packed), 4)]
+        matrix.rows = {host: row for row, host in enumerate(matrix.hosts)}
+        matrix.offset = 8 + 4 * count
+        matrix.buffer = mmap.mmap(matrix.file.fileno(), matrix.offset + count * cls.ROW_BYTES)
+        return matrix
+    
+    def set(self, host, port, state):
+        """Store the state of one port; states without a code are stored as unknown"""
+        index = self.offset + self.rows[host] * self.ROW_BYTES + (port >> 2)
+        shift = (port & 3) * 2
+        self.buffer[index] = (self.buffer[index] & ~(3 << shift) & 0xFF) | (self.CODES.get(state, 0) << shift)
+    
+    def get(self, host, port):
+        """Return the stored state of one port, or None if unknown"""
+        byte = self.buffer[self.offset + self.rows[host] * self.ROW_BYTES + (port >> 2)]
+        return self.STATES.get((byte >> (port & 3) * 2) & 3)
+    
+    def ports(self, host, state=PORT_OPEN):
+        """Return the sorted ports of host in the given state"""
+        start = self.offset + self.rows[host] * self.ROW_BYTES
+        mask = self.buffer[start:start + self.ROW_BYTES].translate(self.ROW_TABLES[self.CODES[state]])
+        ports = []
+        for match in re.finditer(rb'[^\x00]', mask):
+            index = match.start()
+            lanes = mask[index]
+            ports.extend(4 * index + lane for lane in range(4) if lanes >> lane & 1)
+        return ports
+    
+    def hosts_with(self, port, state=PORT_OPEN):
+        """Return the hosts, in row order, whose port is in the given state"""
+        start = self.offset + (port >> 2)
+        column = self.buffer[start:self.offset + len(self.hosts) * self.ROW_BYTES:self.ROW_BYTES]
+        mask = column.translate(self.COLUMN_TABLES[(port & 3, self.CODES[state])])
+        return [self.hosts[match.start()] for match in re.finditer(b'\x01', mask)]
+    
+    def clear(self):
+        """Forget every stored state"""
+        zeros = bytes(self.ROW_BYTES)
+        for row in range(len(self.hosts)):
+            start = self.offset + row * self.ROW_BYTES
+            self.buffer[start:start + self.ROW_BYTES] = zeros
+    
+    def flush(self):
+        """Write a file-backed matrix out to disk"""
+        if self.file:
+            self.buffer.flush()
+    
+    def close(self):
+        if self.file:
+            self.buffer.flush()
+            self.buffer.close()
+            self.file.close()
+            self.file = None
+
+
+class ChunkedWork:
+    """
+    A port list split into one contiguous share per worker, claimed in chunks
+    
+    Workers take chunk_size ports at a time from their own share with a single lock
+    acquisition per chunk. A worker whose share runs dry steals the back half of the
+    largest remaining share, so a slow share never leaves the other workers idle.
+    """
+    
+    def __init__(self, ports, num_workers, chunk_size=64):
+        self.ports = ports
+        self.chunk_size = chunk_size
+        size, extra = divmod(len(ports), max(1, num_workers))
+        self.shares = []  # [next index, end index) per worker
+        start = 0
+        for i in range(max(1, num_workers)):
+            end = start + size + (1 if i < extra else 0)
+            self.shares.append([start, end])
+            start = end
+        self.steals = 0
+        self.lock = threading.Lock()
+    
+    def claim(self, worker):
+        """Return the next chunk of ports for worker, or an empty slice when all work is claimed"""
+        with self.lock:
+            share = self.shares[worker]
+            if share[0] >= share[1]:
+                victim = max(self.shares, key=lambda other: other[1] - other[0])
+                left = victim[1] - victim[0]
+                if left <= 0:
+                    return self.ports[0:0]
+                split = victim[1] - (left + 1) // 2
+                share[0], share[1] = split, victim[1]
+                victim[1] = split
+                self.steals += 1
+            start = share[0]
+            share[0] = min(share[1], start + self.chunk_size)
+            return self.ports[start:share[0]]
+    
+    def drain(self):
+        """Remove and return every port not yet claimed"""
+        with self.lock:
+            remaining = []
+            for share in self.shares:
+                remaining.extend(self.ports[share[0]:share[1]])
+                share[0] = share[1]
+            return remaining
+
+
+class EtaEstimator:
+    """
+    Time-remaining estimate from an exponentially weighted scan rate
+    
+    Each update() folds the rate since the previous sample into a time-weighted
+    moving average whose weight halves every half_life seconds, so a slow filtered
+    tail overtakes an early burst of fast answers within a few seconds. The
+    smoothed variance of the samples gives the bounds of the estimate.
+    """
+    
+    K = 2  # Standard deviations either side of the rate for the bounds
+    
+    def __init__(self, half_life=3.0):
+        self.half_life = half_life
+        self.rate = None  # Smoothed ports per second
+        self.variance = 0.0
+        self.last_sample = None  # (time, ports scanned)
+    
+    def update(self, now, scanned):
+        """Fold the throughput since the previous sample into the estimate"""
+        if self.last_sample is None:
+            self.last_sample = (now, scanned)
+            return
+        last_time, last_scanned = self.last_sample
+        elapsed = now - last_time
+        if elapsed <= 0:
+            return
+        self.last_sample = (now, scanned)
+        sample = (scanned - last_scanned) / elapsed
+        if self.rate is None:
+            self.rate = sample
+            return
+        alpha = 1 - 0.5 ** (elapsed / self.half_life)
+        difference = sample - self.rate
+        self.rate += alpha * difference
+        self.variance = (1 - alpha) * (self.variance + alpha * difference * difference)
+    
+    def estimate(self, remaining, in_flight=0, timeout=0.0):
+        """
+        Return (eta, low, high) in seconds for remaining unfinished probes
+        
+        in_flight of the remaining probes are already waiting on an answer; at
+        worst they run to their timeout, so the tail costs up to timeout seconds
+        on top of the queued probes. Returns None until there is a rate, and an
+        unbounded (infinite) value while the rate is zero.
+        """
+        if remaining <= 0:
+            return 0.0, 0.0, 0.0
+        if self.rate is None:
+            return None
+        in_flight = min(in_flight, remaining)
+        queued = remaining - in_flight
+        spread = self.K * math.sqrt(self.variance)
+        rate_low = self.rate - spread
+        rate_high = self.rate + spread
+        tail = min(in_flight / self.rate, timeout) if self.rate > 0 else timeout
+        eta = queued / self.rate + tail if self.rate > 0 else (tail if not queued else math.inf)
+        low = queued / rate_high if rate_high > 0 else (0.0 if not queued else math.inf)
+        high = queued / rate_low + timeout if rate_low > 0 else (timeout if not queued else math.inf)
+        return eta, low, max(high, eta)
+
+
+def format_duration(seconds):
+    """Format seconds as a short duration such as 45s, 3m 20s or 2h 5m"""
+    if seconds is None or math.isinf(seconds):
+        return "unknown"
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m {seconds % 60}s"
+    return f"{seconds // 3600}h {seconds % 3600 // 60}m"
+
+
+def format_eta(snapshot):
+    """Format a ProgressSnapshot's ETA with its range, e.g. '1m 5s (50s-1m 30s)'"""
+    eta = format_duration(snapshot.eta)
+    if snapshot.eta_low is None or math.isinf(snapshot.eta) or snapshot.eta_high - snapshot.eta_low < 2:
+        return eta
+    return f"{eta} ({format_duration(snapshot.eta_low)}-{format_duration(snapshot.eta_high)})"
+
+
+# Progress at one instant: counters, hits so far, recent ports/second and seconds since the scan started,
+# plus the ETA and its likely range
+ProgressSnapshot = namedtuple('ProgressSnapshot', ['ports_scanned', 'total_ports', 'open_ports', 'rate', 'elapsed',
+                                                   'eta', 'eta_low', 'eta_high'])
+
+
+class ProgressReporter:
+    """
+    Delivers a scanner's progress from one background thread at a fixed rate
+    
+    Engines only bump their counters. This thread samples them every interval
+    seconds and calls callback(ports_scanned, total_ports) when they changed, so
+    reporting costs the same at ten probes a second or ten thousand. The latest
+    ProgressSnapshot is kept on scanner.progress; its rate covers the last window seconds
+    and its ETA comes from an EtaEstimator fed on every sample.
+    """
+    
+    def __init__(self, scanner, callback=None, interval=0.1, window=1.0):
+        self.scanner = scanner
+        self.callback = callback
+        self.interval = interval
+        self.window = window
+        self.samples = deque()  # (time, ports scanned) within the rate window
+        self.eta = EtaEstimator()
+        self.started = time.monotonic()
+        self.last_reported = None
+        self.stopped = threading.Event()
+        self.thread = None
+    
+    def start(self):
+        self._report()  # Deliver the starting counters, e.g. the ports a resumed scan already finished
+        self.thread = threading.Thread(target=self._run)
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+    
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            self._report()
+    
+    def snapshot(self):
+        """Sample the scanner's counters into a ProgressSnapshot"""
+        now = time.monotonic()
+        scanned = self.scanner.ports_scanned
+        self.samples.append((now, scanned))
+        while len(self.samples) > 2 and now - self.samples[0][0] > self.window:
+            self.samples.popleft()
+        first_time, first_scanned = self.samples[0]
+        rate = (scanned - first_scanned) / (now - first_time) if now > first_time else 0.0
+        
+        # Probes still in flight may each run to their timeout
+        self.eta.update(now, scanned)
+        in_flight = self.scanner.probes_in_flight() if hasattr(self.scanner, 'probes_in_flight') else 0
+        total = self.scanner.total_ports
+        estimate = self.eta.estimate(total - scanned, in_flight, getattr(self.scanner, 'timeout', 0.0))
+        eta, eta_low, eta_high = estimate if estimate else (None, None, None)
+        return ProgressSnapshot(scanned, total, self.scanner.state_counts[PORT_OPEN], rate, now - self.started,
+                                eta, eta_low, eta_high)
+    
+    def _report(self):
+        snapshot = self.snapshot()
+        self.scanner.progress = snapshot
+        counters = (snapshot.ports_scanned, snapshot.total_ports)
+        if self.callback and counters != self.last_reported:
+            self.last_reported = counters
+            self.callback(*counters)
+    
+    def stop(self):
+        """Stop the reporter thread and deliver the final counters"""
+        self.stopped.set()
+        if self.thread:
+            self.thread.join()
+        self._report()
+
+
+class PortStage:
+    """
+    A pipeline stage that works on open ports beside the connect sweep
+    
+    Scan engines submit() open ports as they find them. A separate pool of
+    concurrency threads, started on the first submit, runs process() on each, so
+    slow stages never hold up the sweep. Non-empty results are kept in results,
+    keyed by (host, port), and passed to callback(host, port, result) from the
+    stage's thread when one is set. An exception from process() or the callback
+    is kept in errors under the same key; the thread carries on with the next port.
+    """
+    
+    def __init__(self, concurrency=16, callback=None):
+        self.concurrency = concurrency
+        self.callback = callback
+        self.results = {}
+        self.errors = {}
+        self.pending = Queue()
+        self.cancelled = threading.Event()
+        self.threads = []
+        self.lock = threading.Lock()
+    
+    def submit(self, host, port):
+        """Queue an open port for this stage; never blocks the caller"""
+        if not self.threads:
+            self._start()
+        self.pending.put((host, port))
+    
+    def _start(self):
+        with self.lock:
+            if self.threads:
+                return
+            for _ in range(self.concurrency):
+                thread = threading.Thread(target=self._run)
+                thread.daemon = True
+                thread.start()
+                self.threads.append(thread)
+    
+    def _thread_state(self):
+        """Per-thread scratch state handed to every process() call"""
+        return None
+    
+    def _run(self):
+        state = self._thread_state()
+        while True:
+            item = self.pending.get()
+            try:
+                if item is None:
+                    return
+                if not self.cancelled.is_set():
+                    result = self.process(*item, state)
+                    if result:
+                        self.results[item] = result
+                        if self.callback:
+                            self.callback(*item, result)
+            except Exception as e:
+                # One bad port or callback must not take the thread down and leave wait() hanging
+                self.errors[item] = e
+            finally:
+                self.pending.task_done()
+    
+    def process(self, host, port, state):
+        raise NotImplementedError
+    
+    def get(self, host, port, default=None):
+        """Return this stage's result for host:port"""
+        return self.results.get((host, port), default)
+    
+    def wait(self):
+        """Block until every submitted port has been processed, then re-arm after a cancel"""
+        if self.threads:
+            self.pending.join()
+        self.cancelled.clear()
+    
+    def cancel(self):
+        """Drop queued ports; the ones in progress finish within their timeouts"""
+        self.cancelled.set()
+    
+    def close(self):
+        """Stop the stage's threads"""
+        for _ in self.threads:
+            self.pending.put(None)
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+
+
+class BannerGrabber(PortStage):
+    """
+    Reads the greeting banner of each open port
+    
+    Each thread reconnects and reads up to max_bytes within read_timeout into a
+    buffer preallocated for that thread. Banners are stored as printable text.
+    """
+    
+    def __init__(self, concurrency=16, max_bytes=1024, read_timeout=1.0, connect_timeout=1.0, callback=None):
+        super().__init__(concurrency, callback)
+        self.max_bytes = max_bytes
+        self.read_timeout = read_timeout
+        self.connect_timeout = connect_timeout
+    
+    @property
+    def banners(self):
+        return self.results
+    
+    def _thread_state(self):
+        return bytearray(self.max_bytes)
+    
+    def process(self, host, port, buffer):
+        return self.grab(host, port, buffer)
+    
+    def grab(self, host, port, buffer):
+        """Connect to host:port and return its decoded banner, read into buffer"""
+        view = memoryview(buffer)
+        received = 0
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.connect_timeout)
+            sock.connect((host, port))
+            deadline = time.monotonic() + self.read_timeout
+            while received < len(buffer):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                sock.settimeout(remaining)
+                count = sock.recv_into(view[received:])
+                if not count:
+                    break
+                received += count
+        except OSError:
+            pass  # Timed out or reset; keep whatever arrived
+        finally:
+            sock.close()
+        text = bytes(view[:received]).decode('utf-8', 'replace')
+        return ' '.join(''.join(ch if ch.isprintable() else ' ' for ch in text).split())
+    
+    def get(self, host, port, default=''):
+        """Return the banner read from host:port, or an empty string"""
+        return self.results.get((host, port), default)
+
+
+# X.509 name attributes shown in certificate subjects and issuers, by DER-encoded OID
+X509_NAME_ATTRIBUTES = {
+    b'\x55\x04\x03': 'CN',
+    b'\x55\x04\x06': 'C',
+    b'\x55\x04\x07': 'L',
+    b'\x55\x04\x08': 'ST',
+    b'\x55\x04\x0a': 'O',
+    b'\x55\x04\x0b': 'OU',
+}
+X509_SUBJECT_ALT_NAME = b'\x55\x1d\x11'
+
+CertificateInfo = namedtuple('CertificateInfo', ['fingerprint', 'subject', 'issuer', 'not_before', 'not_after',
+                                                 'dns_names'])
+TlsResult = namedtuple('TlsResult', ['protocol', 'cipher', 'certificate', 'session_reused'])
+
+
+def _der_element(data, offset):
+    """Return (tag, value start, value end) of the DER element at offset"""
+    tag = data[offset]
+    length = data[offset + 1]
+    offset += 2
+    if length & 0x80:
+        size = length & 0x7f
+        length = int.from_bytes(data[offset:offset + size], 'big')
+        offset += size
+    return tag, offset, offset + length
+
+
+def _der_children(data, start, end):
+    """Yield (tag, value start, value end) for each element between start and end"""
+    while start < end:
+        element = _der_element(data, start)
+        yield element
+        start = element[2]
+
+
+def _der_name(data, start, end):
+    parts = []
+    for _, set_start, set_end in _der_children(data, start, end):
+        for _, seq_start, seq_end in _der_children(data, set_start, set_end):
+            (_, oid_start, oid_end), (_, value_start, value_end) = list(_der_children(data, seq_start, seq_end))[:2]
+            label = X509_NAME_ATTRIBUTES.get(bytes(data[oid_start:oid_end]))
+            if label:
+                parts.append(f"{label}={bytes(data[value_start:value_end]).decode('utf-8', 'replace')}")
+    return ', '.join(parts)
+
+
+def _der_time(data, tag, start, end):
+    text = bytes(data[start:end]).decode('ascii').rstrip('Z')
+    if tag == 0x17:  # UTCTime has a two-digit year
+        year = int(text[:2])
+        text = str(1900 + year if year >= 50 else 2000 + year) + text[2:]
+    return datetime.strptime(text[:14], '%Y%m%d%H%M%S').replace(tzinfo=timezone.utc)
+
+
+def parse_certificate(der):
+    """
+    Return a CertificateInfo for a DER-encoded X.509 certificate
+    
+    Only the fields the TLS stage reports are decoded: subject, issuer, validity
+    and DNS subject alternative names.
+    """
+    _, cert_start, cert_end = _der_element(der, 0)
+    _, tbs_start, tbs_end = _der_element(der, cert_start)
+    fields = list(_der_children(der, tbs_start, tbs_end))
+    if fields[0][0] == 0xa0:  # Explicit version; v1 certificates omit it
+        fields = fields[1:]
+    # serial, signature algorithm, issuer, validity, subject, subject public key, [extensions]
+    issuer = _der_name(der, fields[2][1], fields[2][2])
+    not_before, not_after = (_der_time(der, *element) for element in _der_children(der, fields[3][1], fields[3][2]))
+    subject = _der_name(der, fields[4][1], fields[4][2])
+    dns_names = []
+    for tag, start, end in fields[6:]:
+        if tag != 0xa3:
+            continue
+        _, ext_start, ext_end = _der_element(der, start)
+        for _, seq_start, seq_end in _der_children(der, ext_start, ext_end):
+            parts = list(_der_children(der, seq_start, seq_end))
+            if bytes(der[parts[0][1]:parts[0][2]]) != X509_SUBJECT_ALT_NAME:
+                continue
+            _, value_start, value_end = parts[-1]
+            _, names_start, names_end = _der_element(der, value_start)
+            dns_names = [bytes(der[name_start:name_end]).decode('ascii', 'replace')
+                         for name_tag, name_start, name_end in _der_children(der, names_start, names_end)
+                         if name_tag == 0x82]
+    return CertificateInfo(hashlib.sha256(der).hexdigest(), subject, issuer, not_before, not_after, dns_names)
+
+
+def format_tls(tls):
+    """One-line summary of a TlsResult, e.g. 'TLSv1.3 TLS_AES_256_GCM_SHA384, CN=example.com, expires 2027-01-31'"""
+    text = f"{tls.protocol} {tls.cipher}"
+    cert = tls.certificate
+    if cert and cert.subject:
+        text += f", {cert.subject}"
+    if cert and cert.not_after:
+        text += f", expires {cert.not_after:%Y-%m-%d}"
+    return text
+
+
+class TlsProber(PortStage):
+    """
+    Negotiates TLS on each open port and records the session and certificate
+    
+    Certificates are cached by SHA-256 fingerprint, so a fleet sharing one
+    wildcard certificate is parsed once. TLS sessions are kept per (host, port)
+    and offered again on the next probe of the same port. Nothing is verified:
+    the point is to see what a port presents, trusted or not. Ports that do not
+    speak TLS fail within handshake_timeout and record nothing.
+    """
+    
+    def __init__(self, concurrency=8, handshake_timeout=3.0, ports=None, callback=None):
+        super().__init__(concurrency, callback)
+        self.handshake_timeout = handshake_timeout
+        self.ports = ports  # Only these ports are probed when set; None tries every open port
+        self.certificates = {}  # fingerprint -> CertificateInfo
+        self.sessions = {}  # (host, port) -> ssl.SSLSession for resumption
+        self.parsed = 0
+        self.context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        self.context.check_hostname = False
+        self.context.verify_mode = ssl.CERT_NONE
+    
+    def submit(self, host, port):
+        if self.ports is None or port in self.ports:
+            super().submit(host, port)
+    
+    def process(self, host, port, state):
+        try:
+            with socket.create_connection((host, port), timeout=self.handshake_timeout) as sock:
+                with self.context.wrap_socket(sock, server_hostname=host,
+                                              session=self.sessions.get((host, port))) as tls:
+                    der = tls.getpeercert(binary_form=True)
+                    result = (tls.version(), tls.cipher()[0], tls.session_reused)
+                    if tls.session is not None:
+                        self.sessions[(host, port)] = tls.session
+        except (OSError, ValueError):
+            return None  # Refused, timed out or not TLS
+        certificate = self.certificate(der) if der else None
+        return TlsResult(*result[:2], certificate, result[2])
+    
+    def certificate(self, der):
+        """Return the CertificateInfo for a DER certificate, parsing each distinct one once"""
+        fingerprint = hashlib.sha256(der).hexdigest()
+        with self.lock:
+            info = self.certificates.get(fingerprint)
+            if info is None:
+                try:
+                    info = parse_certificate(der)
+                except (IndexError, ValueError):
+                    info = CertificateInfo(fingerprint, '', '', None, None, [])
+                self.certificates[fingerprint] = info
+                self.parsed += 1
+        return info
+
+
+class DnsCache:
+    """
+    Thread-safe TTL cache of DNS answers
+    
+    The system resolver does not report record TTLs, so answers live for ttl
+    seconds and failed lookups (stored as None) for negative_ttl seconds.
+    """
+    
+    def __init__(self, ttl=300.0, negative_ttl=30.0, clock=time.monotonic):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.clock = clock
+        self.entries = {}
+        self.lock = threading.Lock()
+    
+    def get(self, key):
+        """Return (True, answer) for a live entry, else (False, None)"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return False, None
+            if entry[1] <= self.clock():
+                del self.entries[key]
+                return False, None
+            return True, entry[0]
+    
+    def put(self, key, answer):
+        ttl = self.ttl if answer is not None else self.negative_ttl
+        with self.lock:
+            self.entries[key] = (answer, self.clock() + ttl)
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+    
+    def __len__(self):
+        return len(self.entries)
+
+
+def _system_forward(name):
+    """Resolve a name to its IPv4 addresses through the system resolver (hosts file, then DNS)"""
+    return [info[4][0] for info in socket.getaddrinfo(name, None, socket.AF_INET, socket.SOCK_STREAM)]
+
+
+def _system_reverse(address):
+    return socket.gethostbyaddr(address)[0]
+
+
+class DnsResolver:
+    """
+    Bulk forward and reverse lookups through a shared TTL cache
+    
+    resolve_many() spreads the names that are not cached over at most
+    concurrency threads. forward(name) and reverse(address) default to the
+    system resolver and may be replaced by a stub; either may raise OSError for
+    names that do not resolve.
+    """
+    
+    def __init__(self, concurrency=32, cache=None, forward=None, reverse=None):
+        self.concurrency = concurrency
+        self.cache = cache if cache is not None else DnsCache()
+        self.forward = forward or _system_forward
+        self.reverse_lookup = reverse or _system_reverse
+        self.lookups = 0  # Queries that missed the cache
+        self.lock = threading.Lock()
+    
+    def resolve(self, name):
+        """Return the IPv4 addresses of name, [] when it does not resolve"""
+        hit, addresses = self.cache.get(('A', name.lower()))
+        if hit:
+            return list(addresses or [])
+        try:
+            addresses = list(dict.fromkeys(self.forward(name)))
+        except (OSError, UnicodeError):
+            addresses = []
+        with self.lock:
+            self.lookups += 1
+        self.cache.put(('A', name.lower()), addresses or None)
+        for address in addresses:
+            # Remembered so results can be labelled with the name the user gave
+            self.cache.put(('name', address), name)
+        return addresses
+    
+    def resolve_many(self, names):
+        """Resolve names in parallel and return {name: [addresses]}"""
+        names = list(dict.fromkeys(names))
+        results = {}
+        work = deque()
+        for name in names:
+            hit, addresses = self.cache.get(('A', name.lower()))
+            if hit:
+                results[name] = list(addresses or [])
+            else:
+                work.append(name)
+        
+        def worker():
+            while True:
+                try:
+                    name = work.popleft()
+                except IndexError:
+                    return
+                results[name] = self.resolve(name)
+        
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(min(self.concurrency, len(work)))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return {name: results[name] for name in names}
+    
+    def reverse(self, address):
+        """Return the PTR name of address, or None"""
+        hit, name = self.cache.get(('PTR', address))
+        if hit:
+            return name
+        try:
+            name = self.reverse_lookup(address)
+        except (OSError, UnicodeError):
+            name = None
+        with self.lock:
+            self.lookups += 1
+        self.cache.put(('PTR', address), name)
+        return name
+    
+    def hostname(self, address):
+        """Return a cached PTR name or the name address was resolved from, without querying"""
+        for kind in ('PTR', 'name'):
+            hit, name = self.cache.get((kind, address))
+            if hit and name:
+                return name
+        return None
+
+
+_dns_resolver = DnsResolver()  # Shared by every scan so repeated targets hit the cache
+
+
+class ReverseDns(PortStage):
+    """
+    Looks up the PTR name of each host with an open port
+    
+    Only a host's first open port is queued, and lookups run on the stage's own
+    threads so probes never wait on DNS. Names are kept in hostnames.
+    """
+    
+    def __init__(self, resolver=None, concurrency=4, callback=None):
+        super().__init__(concurrency, callback)
+        self.resolver = resolver or _dns_resolver
+        self.seen = set()
+    
+    def submit(self, host, port):
+        with self.lock:
+            if host in self.seen:
+                return
+            self.seen.add(host)
+        super().submit(host, port)
+    
+    def process(self, host, port, state):
+        return self.resolver.reverse(host)
+    
+    @property
+    def hostnames(self):
+        return {host: name for (host, _), name in self.results.items()}
+
+
+HOSTNAME_LABEL = re.compile(r"[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?")
+
+
+def is_hostname(token):
+    """Return True if token is a DNS name rather than an address, block or range"""
+    # Label by label, so a mistyped name is rejected in linear time instead of backtracking
+    name = token[:-1] if token.endswith('.') else token
+    if not 0 < len(name) <= 253 or not re.search(r"[A-Za-z]", name):
+        return False
+    return all(HOSTNAME_LABEL.fullmatch(label) for label in name.split('.'))
+
+
+def resolve_host(name, resolver=None):
+    """Return the first IPv4 address of a single target, resolving it if it is a name"""
+    if not is_hostname(name):
+        return name
+    addresses = (resolver or _dns_resolver).resolve(name)
+    if not addresses:
+        raise ValueError(f"Could not resolve host: {name}")
+    return addresses[0]
+
+
+def parse_targets(spec, resolver=None, resolve=True):
+    """
+    Expand a target specification into a list of unique IPv4 addresses
+    
+    Args:
+        spec: A string or list of strings. Entries may be separated by commas or
+              whitespace and can be single addresses (10.0.0.5), CIDR blocks
+              (10.0.0.0/24), full dash ranges (10.0.0.1-10.0.0.20), last-octet
+              ranges (10.0.0.1-20) or hostnames.
+        resolver: DnsResolver for hostnames; the shared cached one by default.
+                  All names are resolved in one parallel batch and each scans
+                  its first address.
+        resolve: With False, hostnames are only syntax checked and returned as
+                 they are
+    
+    Raises:
+        ValueError: If any entry is not a valid address, block, range or
+                    resolvable name
+    """
+    if isinstance(spec, str):
+        spec = [spec]
+    tokens = [token for entry in spec for token in re.split(r"[,\s]+", entry) if token]
+    
+    names = [token for token in tokens if is_hostname(token)]
+    addresses = {}
+    if names and resolve:
+        addresses = (resolver or _dns_resolver).resolve_many(names)
+        unresolved = [name for name in names if not addresses[name]]
+        if unresolved:
+            shown = ', '.join(unresolved[:5]) + (f" and {len(unresolved) - 5} more" if len(unresolved) > 5 else "")
+            raise ValueError(f"Could not resolve host(s): {shown}")
+    
+    hosts = []
+    for token in tokens:
+        if is_hostname(token):
+            hosts.append(addresses[token][0] if resolve else token)
+        elif '/' in token:
+            network = ipaddress.IPv4Network(token, strict=False)
+            # /31 and /32 have no network/broadcast addresses to skip
+            if network.prefixlen >= 31:
+                hosts.extend(str(ip) for ip in network)
+            else:
+                hosts.extend(str(ip) for ip in network.hosts())
+        elif '-' in token:
+            first, last = token.split('-', 1)
+            first = ipaddress.IPv4Address(first)
+            if '.' not in last:
+                last = first.exploded.rsplit('.', 1)[0] + '.' + last
+            last = ipaddress.IPv4Address(last)
+            if last < first:
+                raise ValueError(f"Invalid address range: {token}")
+            hosts.extend(str(ipaddress.IPv4Address(value)) for value in range(int(first), int(last) + 1))
+        else:
+            hosts.append(str(ipaddress.IPv4Address(token)))
+    
+    if not hosts:
+        raise ValueError("No targets specified")
+    return list(dict.fromkeys(hosts))
+
+
+class PortScanner:
+    """Core port scanning functionality"""
+    
+    MAX_RESOURCE_BACKOFF = 0.5  # Longest a worker waits for descriptors or buffers before retrying
+    
+    def __init__(self, target_ip, start_port, end_port, timeout=0.3, randomize=False, scan_delay=0, adaptive=False,
+                 adaptive_timeout=False, min_timeout=0.05, max_timeout=3.0, rate_limiter=None, journal=None,
+                 record_states=False, state_file=None, progress_interval=0.1, top_ports=None, banner_grabber=None,
+                 tls_prober=None, reverse_dns=None, resolver=None, port_budget=None, linger_reset=False,
+                 stream=None):
+        self.resolver = resolver or _dns_resolver
+        if isinstance(target_ip, str) and is_hostname(target_ip):
+            self.target_ip = resolve_host(target_ip, self.resolver)
+        else:
+            self.target_ip = target_ip
+        self.start_port = start_port
+        self.end_port = end_port
+        self.top_ports = top_ports  # Scan only this many of the most commonly open ports in the range
+        # Optional PortStages fed every open port as it is found
+        self.banner_grabber = banner_grabber
+        self.tls_prober = tls_prober
+        self.reverse_dns = reverse_dns  # ReverseDns stage naming hosts with open ports
+        # Local ports in TIME_WAIT are budgeted; linger_reset closes open-port probes with a RST instead
+        self.port_budget = port_budget or _port_budget
+        self.linger_reset = linger_reset
+        self.stream = stream  # ResultStream every open port is written to as it is found
+        self.timeout = timeout
+        self.randomize = randomize
+        self.scan_delay = scan_delay
+        # scan_delay is the spacing between probes across all workers, not a per-thread sleep
+        if rate_limiter is None and scan_delay > 0:
+            rate_limiter = RateLimiter(global_rate=1 / scan_delay)
+        self.rate_limiter = rate_limiter
+        self.journal_path = journal
+        self.journal = None
+        self.control = ScanControl()
+        self.remaining_ports = []
+        self.adaptive = adaptive
+        self.controller = None
+        self.rtt = RttEstimator(timeout, min_timeout, max_timeout) if adaptive_timeout else None
+        self.open_ports = []
+        self.keep_results = True  # iter_scan turns this off so results are only streamed
+        # Per-state probe counts and seconds spent waiting
+        self.state_counts = dict.fromkeys(PORT_STATES, 0)
+        self.state_seconds = dict.fromkeys(PORT_STATES, 0.0)
+        # record_states keeps every port's state in a PortStateMatrix; state_file backs it with an mmap'd file
+        self.state_matrix = None
+        if record_states or state_file:
+            self.state_matrix = PortStateMatrix(self._state_hosts(), path=state_file)
+        self.progress_interval = progress_interval  # Seconds between progress callbacks
+        self.progress = None  # Latest ProgressSnapshot while a scan runs
+        self.chunk_size = 64  # Ports a worker claims at once
+        self.merge_interval = 0.1  # Longest a worker holds unmerged results, in seconds
+        self.lock = threading.Lock()
+        self.ports_scanned = 0
+        self.total_ports = 0
+        
+    def scan_port(self, port):
+        """Scan a single port"""
+        return self._scan_port(port)[0]
+    
+    def probe_port(self, port):
+        """Probe a single port and return its classified ProbeResult"""
+        # Wait for a rate limiter slot for stealth if configured
+        self.pace(self.target_ip)
+        
+        started = time.monotonic()
+        code = self.connect(self.target_ip, port)
+        return ProbeResult(port, classify_errno(code), code, time.monotonic() - started)
+    
+    def _scan_port(self, port):
+        """Scan a single port and return (result, ProbeResult)"""
+        probe = self.probe_port(port)
+        if probe.state == PORT_OPEN:
+            service = service_name(port)
+            if self.keep_results:
+                with self.lock:
+                    self.open_ports.append((port, service))
+            return (port, service), probe
+        return None, probe
+    
+    def record_state(self, host, probe):
+        """Add a finished probe to the per-state statistics"""
+        with self.lock:
+            self._store_state(host, probe)
+    
+    def _store_state(self, host, probe):
+        # Callers hold self.lock
+        self.state_counts[probe.state] += 1
+        self.state_seconds[probe.state] += probe.elapsed
+        if self.state_matrix is not None:
+            self.state_matrix.set(host, probe.port, probe.state)
+    
+    def _state_hosts(self):
+        """Hosts that get a row in the state matrix"""
+        return [self.target_ip]
+    
+    def _reset_states(self):
+        self.state_counts = dict.fromkeys(PORT_STATES, 0)
+        self.state_seconds = dict.fromkeys(PORT_STATES, 0.0)
+        # A resumed scan keeps the states stored by the run it continues
+        if self.state_matrix is not None and not self.journal_path:
+            self.state_matrix.clear()
+    
+    def state_summary(self):
+        """Describe the per-state counts, e.g. '2 open, 1020 closed, 2 filtered, 0 error'"""
+        return ', '.join(f"{self.state_counts[state]} {state}" for state in PORT_STATES)
+    
+    def connect(self, host, port):
+        """Attempt a TCP connect to host:port and return the connect_ex code (0 when open)"""
+        if self.control.is_cancelled or not self.port_budget.wait(self.control):
+            return errno.ECANCELED
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        except OSError as e:
+            return e.errno
+        self.control.register(sock)
+        code = errno.EIO
+        try:
+            sock.settimeout(self.probe_timeout(host))
+            started = time.monotonic()
+            code = sock.connect_ex((host, port))
+            self.observe_rtt(host, code, time.monotonic() - started)
+            return code
+        except socket.gaierror:
+            code = errno.EHOSTUNREACH
+            return code
+        except socket.error as e:
+            code = e.errno or errno.EIO
+            return code
+        finally:
+            self.control.unregister(sock)
+            self.release_socket(sock, code)
+    
+    def release_socket(self, sock, code):
+        """Close a probe socket, accounting for the local port its connect code used or failed to get"""
+        if code == errno.EADDRNOTAVAIL:
+            self.port_budget.exhausted()
+        else:
+            self.port_budget.recovered()
+            if code == 0:
+                if self.linger_reset:
+                    try:
+                        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, LINGER_RESET)
+                    except OSError:
+                        self.port_budget.record_close()
+                else:
+                    self.port_budget.record_close()
+        sock.close()
+    
+    def probe(self, host, port):
+        """Attempt a TCP connect to host:port and return True if it was accepted"""
+        return self.connect(host, port) == 0
+    
+    def pace(self, host):
+        """Block until the rate limiter, if any, allows another probe against host; False if cancelled"""
+        if self.rate_limiter:
+            return self.rate_limiter.acquire(host, self.control.cancelled)
+        return True
+    
+    def probe_timeout(self, host):
+        """Return the connect timeout for the next probe against host"""
+        return self.rtt.timeout_for(host) if self.rtt else self.timeout
+    
+    def observe_rtt(self, host, code, elapsed):
+        """Feed a probe's answer time to the RTT estimator when the host actually replied"""
+        if self.rtt and code in (0, errno.ECONNREFUSED):
+            self.rtt.observe(host, elapsed)
+    
+    def worker(self, work, index, callback=None):
+        """
+        Worker thread claiming chunks of ports from work
+        
+        Probe outcomes and hits are buffered locally and merged into the shared
+        results in batches, so self.lock is taken once per batch rather than per probe.
+        """
+        probes = []
+        hits = []
+        last_merge = time.monotonic()
+        backoff = 0.0  # Current wait after a local resource error, in seconds
+        try:
+            pending = deque(work.claim(index))
+            while pending:
+                port = pending.popleft()
+                if not self.control.wait_if_paused():
+                    pending.appendleft(port)
+                    break
+                code = None
+                if self.controller:
+                    self.controller.acquire()
+                try:
+                    probe = self.probe_port(port)
+                    code = probe.errno
+                finally:
+                    if self.controller:
+                        self.controller.release(code)
+                
+                if code in RESOURCE_ERRNOS:
+                    # The probe never left this host; try the port again instead of reporting it closed
+                    pending.append(port)
+                    if not self.controller and code != errno.EADDRNOTAVAIL:
+                        # Nothing else throttles this worker (the port budget paces EADDRNOTAVAIL), so back
+                        # off until descriptors or buffers free up instead of spinning on the error
+                        backoff = min(self.MAX_RESOURCE_BACKOFF, max(0.01, backoff * 2))
+                        self.control.cancelled.wait(backoff)
+                    continue
+                backoff = 0.0
+                
+                if self.control.is_cancelled and probe.state != PORT_OPEN:
+                    # Aborted mid-probe; hand it back as unfinished work
+                    pending.appendleft(port)
+                    break
+                
+                probes.append(probe)
+                if self.journal:
+                    self.journal.record(self.target_ip, port, probe.state == PORT_OPEN)
+                if probe.state == PORT_OPEN:
+                    service = service_name(port)
+                    hits.append((port, service))
+                    self.hand_off(self.target_ip, port)
+                    if callback:
+                        callback(port, service)
+                
+                now = time.monotonic()
+                if len(probes) >= work.chunk_size or now - last_merge >= self.merge_interval:
+                    self._merge(probes, hits)
+                    probes, hits, last_merge = [], [], now
+                if not pending:
+                    pending.extend(work.claim(index))
+        finally:
+            self._merge(probes, hits)
+            if pending:
+                with self.lock:
+                    self.remaining_ports.extend(pending)
+    
+    def _merge(self, probes, hits):
+        """Fold a worker's buffered probes and hits into the shared results"""
+        if not probes:
+            return
+        with self.lock:
+            for probe in probes:
+                self._store_state(self.target_ip, probe)
+            if self.keep_results:
+                self.open_ports.extend(hits)
+            self.ports_scanned += len(probes)
+    
+    def _build_port_list(self):
+        """Create the list of ports to scan, shuffled when randomize is enabled"""
+        if self.top_ports:
+            # Most likely open first, so early results cover most services
+            ports = top_ports(self.top_ports, self.start_port, self.end_port)
+        else:
+            ports = list(range(self.start_port, self.end_port + 1))
+        self.total_ports = len(ports)
+        
+        # Randomize port order for stealth if enabled
+        if self.randomize:
+            random.shuffle(ports)
+        return ports
+    
+    def scan(self, num_threads=200, callback=None, progress_callback=None):
+        """
+        Main scanning function with multi-threading
+        
+        With adaptive enabled, num_threads is the concurrency budget: a
+        ConcurrencyController decides how many of those threads may probe at once,
+        capped by RLIMIT_NOFILE.
+        """
+        self.open_ports = []
+        self.ports_scanned = 0
+        self._reset_states()
+        self.control.reset()
+        
+        ports = self._build_port_list()
+        self._open_journal()
+        if self.journal:
+            # Skip everything an earlier run already finished
+            ports = [port for port in ports if not self.journal.is_done(self.target_ip, port)]
+            for port in self.journal.hits.get(self.target_ip, []):
+                self.open_ports.append((port, service_name(port)))
+                if self.state_matrix is not None:
+                    self.state_matrix.set(self.target_ip, port, PORT_OPEN)
+        
+        return self._run_ports(ports, num_threads, callback, progress_callback)
+    
+    def continue_scan(self, num_threads=200, callback=None, progress_callback=None):
+        """Scan the work left over by a cancelled scan, keeping the results found so far"""
+        self.control.reset()
+        if self.journal_path:
+            self._open_journal()
+        return self._run_ports(self.remaining_ports, num_threads, callback, progress_callback)
+    
+    def _run_ports(self, ports, num_threads, callback, progress_callback):
+        """Probe the given ports on worker threads until done or cancelled"""
+        self.remaining_ports = []
+        if self.adaptive:
+            self.controller = ConcurrencyController(num_threads)
+            num_threads = self.controller.ceiling
+        
+        # Split the ports into one share per worker; idle workers steal from the others
+        num_workers = min(num_threads, len(ports))
+        work = ChunkedWork(ports, num_workers, self.chunk_size)
+        
+        # Start worker threads
+        reporter = ProgressReporter(self, progress_callback, self.progress_interval).start()
+        threads = []
+        for index in range(num_workers):
+            thread = threading.Thread(target=self.worker, args=(work, index, callback))
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+        
+        # Wait for all threads to complete
+        for thread in threads:
+            thread.join()
+        reporter.stop()
+        self.wait_for_stages()
+        
+        # Anything never claimed because of a cancel is returned as remaining work
+        self.remaining_ports.extend(work.drain())
+        
+        if self.journal:
+            self.journal.close(complete=not self.remaining_ports)
+        return sorted(self.open_ports, key=lambda x: x[0])
+    
+    def iter_scan(self, num_threads=200, buffer_size=1024, keep_results=False, progress_callback=None):
+        """
+        Run the scan in the background and yield results as probes finish
+        
+        Yields the same tuples the scan callback receives: (port, service), or
+        (host, port, service) for multi-target scans. At most buffer_size results
+        wait to be consumed; beyond that the probing workers block until the caller
+        catches up. Closing the generator early cancels the scan.
+        
+        Args:
+            num_threads: Concurrency passed on to scan()
+            buffer_size: Maximum number of unconsumed results held in memory
+            keep_results: Also collect results in open_ports as scan() does
+            progress_callback: Optional callable(ports_scanned, total_ports)
+        """
+        results = Queue(maxsize=buffer_size)
+        finished = object()
+        self.keep_results = keep_results
+        
+        def run():
+            try:
+                self.scan(num_threads=num_threads, callback=lambda *result: results.put(result),
+                          progress_callback=progress_callback)
+            except Exception as e:
+                results.put(e)
+            finally:
+                results.put(finished)
+        
+        thread = threading.Thread(target=run)
+        thread.daemon = True
+        thread.start()
+        try:
+            while True:
+                item = results.get()
+                if item is finished:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            if thread.is_alive():
+                # Abandoned early: stop probing and unblock workers waiting on the full buffer
+                self.cancel()
+                while results.get() is not finished:
+                    pass
+            thread.join()
+            self.keep_results = True
+    
+    def cancel(self):
+        """Cancel a running scan; scan() returns partial results and remaining_ports"""
+        self.control.cancel()
+        for stage in self.stages:
+            stage.cancel()
+    
+    @property
+    def stages(self):
+        """The configured PortStages open ports are handed to"""
+        return [stage for stage in (self.banner_grabber, self.tls_prober, self.reverse_dns) if stage]
+    
+    def hand_off(self, host, port):
+        """Stream an open port and hand it to every configured stage"""
+        if self.stream:
+            self.stream.write(host, port, service_name(port))
+        for stage in self.stages:
+            stage.submit(host, port)
+    
+    def wait_for_stages(self):
+        """Wait for the stages to finish the ports found by this run"""
+        for stage in self.stages:
+            stage.wait()
+    
+    def banner(self, host, port):
+        """Return the banner grabbed from an open port, or an empty string"""
+        return self.banner_grabber.get(host, port) if self.banner_grabber else ''
+    
+    def tls_info(self, host, port):
+        """Return the TlsResult for an open port, or None"""
+        return self.tls_prober.get(host, port) if self.tls_prober else None
+    
+    def hostname(self, host):
+        """Return the name of a scanned address (PTR or the name it was given as), or an empty string"""
+        if self.reverse_dns and host in self.reverse_dns.hostnames:
+            return self.reverse_dns.hostnames[host]
+        return self.resolver.hostname(host) or ''
+    
+    def pause(self):
+        """Pause a running scan after the probes already in flight"""
+        self.control.pause()
+    
+    def resume(self):
+        """Resume a paused scan"""
+        self.control.resume()
+    
+    def probes_in_flight(self):
+        """Number of connects started but not yet answered; the ETA allows each up to a timeout"""
+        return len(self.control.sockets)
+    
+    def _journal_header(self):
+        return {
+            'target': self.target_ip,
+            'start_port': self.start_port,
+            'end_port': self.end_port,
+            'timeout': self.timeout,
+            'randomize': self.randomize,
+            'scan_delay': self.scan_delay,
+            'top_ports': self.top_ports,
+        }
+    
+    def _open_journal(self):
+        """Open the checkpoint journal, if configured, and count work done by earlier runs"""
+        if self.journal_path:
+            self.journal = ScanJournal(self.journal_path, self._journal_header())
+            self.ports_scanned = self.journal.completed_count
+    
+    def export_results(self, filename, file_format='json', scan_metadata=None, include_closed=False):
+        """
+        Export scan results to a file
+        
+        Args:
+            filename: Output file path
+            file_format: Format to export ('json', 'csv', or 'txt')
+            scan_metadata: Optional dictionary with scan metadata (timestamp, duration, etc.)
+            include_closed: Also list closed and filtered ports as compact ranges
+                            (needs a scanner created with record_states or state_file).
+                            The state matrix keeps local probe errors as unknown, so
+                            they only appear in the state counts
+        """
+        if file_format == 'json':
+            self._export_json(filename, scan_metadata, include_closed)
+        elif file_format == 'csv':
+            self._export_csv(filename, scan_metadata, include_closed)
+        elif file_format == 'txt':
+            self._export_txt(filename, scan_metadata, include_closed)
+        else:
+            raise ValueError(f"Unsupported file format: {file_format}")
+    
+    def _result_entry(self, host, port, service):
+        """JSON export entry for one open port, with what the stages found on it"""
+        entry = {'port': port, 'service': service}
+        banner = self.banner(host, port)
+        if banner:
+            entry['banner'] = banner
+        tls = self.tls_info(host, port)
+        if tls:
+            entry['tls'] = {'protocol': tls.protocol, 'cipher': tls.cipher}
+            if tls.certificate:
+                cert = tls.certificate
+                entry['tls'].update({
+                    'subject': cert.subject,
+                    'issuer': cert.issuer,
+                    'not_before': cert.not_before.isoformat() if cert.not_before else None,
+                    'not_after': cert.not_after.isoformat() if cert.not_after else None,
+                    'dns_names': cert.dns_names,
+                    'sha256': cert.fingerprint,
+                })
+        return entry
+    
+    def _stage_columns(self):
+        """Extra CSV columns for the configured stages"""
+        columns = []
+        if self.reverse_dns:
+            columns.append('Hostname')
+        if self.banner_grabber:
+            columns.append('Banner')
+        if self.tls_prober:
+            columns.extend(['TLS Protocol', 'TLS Cipher', 'Cert Subject', 'Cert Expires', 'Cert SHA256'])
+        return columns
+    
+    def _stage_values(self, host, port):
+        """Values for the _stage_columns() of one open port"""
+        values = []
+        if self.reverse_dns:
+            values.append(self.hostname(host))
+        if self.banner_grabber:
+            values.append(self.banner(host, port))
+        if self.tls_prober:
+            tls = self.tls_info(host, port)
+            cert = tls.certificate if tls else None
+            values.extend([tls.protocol if tls else '', tls.cipher if tls else '', cert.subject if cert else '',
+                           cert.not_after.isoformat() if cert and cert.not_after else '',
+                           cert.fingerprint if cert else ''])
+        return values
+    
+    def _stage_text(self, host, port):
+        """Text export suffix with the banner and TLS details of one open port"""
+        text = ''
+        banner = self.banner(host, port)
+        if banner:
+            text += f" [{banner}]"
+        tls = self.tls_info(host, port)
+        if tls:
+            text += f" {{{format_tls(tls)}}}"
+        return text
+    
+    def _port_range_label(self):
+        """Describe the scanned ports for exports, e.g. '1-65535 (top 1000)'"""
+        label = f"{self.start_port}-{self.end_port}"
+        return f"{label} (top {self.top_ports})" if self.top_ports else label
+    
+    def _compact_states(self, host):
+        """Return {state: port ranges} for the closed and filtered ports stored for host"""
+        if self.state_matrix is None:
+            return {}
+        ranges = {}
+        for state in (PORT_CLOSED, PORT_FILTERED):
+            ports = self.state_matrix.ports(host, state)
+            if ports:
+                ranges[state] = format_port_ranges(ports)
+        return ranges
+    
+    def _open_results(self):
+        """Open (port, service) results, read from the state matrix when there is one"""
+        if self.state_matrix is None:
+            return self.open_ports
+        return [(port, service_name(port))
+                for port in self.state_matrix.ports(self.target_ip)]
+    
+    def _export_json(self, filename, scan_metadata, include_closed=False):
+        """Export results as JSON"""
+        results = self._open_results()
+        data = {
+            'scan_info': {
+                'target_ip': self.target_ip,
+                'start_port': self.start_port,
+                'end_port': self.end_port,
+                'top_ports': self.top_ports,
+                'timeout': self.timeout,
+                'total_open_ports': len(results),
+                'state_counts': dict(self.state_counts)
+            },
+            'results': [
+                self._result_entry(self.target_ip, port, service)
+                for port, service in results
+            ]
+        }
+        hostname = self.hostname(self.target_ip)
+        if hostname:
+            data['scan_info']['hostname'] = hostname
+        if include_closed:
+            data['port_states'] = self._compact_states(self.target_ip)
+        
+        if scan_metadata:
+            data['scan_info'].update(scan_metadata)
+        
+        with open(filename, 'w') as f:
+            json.dump(data, f, indent=2)
+    
+    def _export_csv(self, filename, scan_metadata, include_closed=False):
+        """Export results as CSV"""
+        results = self._open_results()
+        with open(filename, 'w', newline='') as f:
+            writer = csv.writer(f)
+            
+            # Write metadata as comments
+            if scan_metadata:
+                writer.writerow(['# Scan Metadata'])
+                for key, value in scan_metadata.items():
+                    writer.writerow([f'# {key}', value])
+            
+            writer.writerow(['# Target IP', self.target_ip])
+            writer.writerow(['# Port Range', self._port_range_label()])
+            writer.writerow(['# Total Open Ports', len(results)])
+            writer.writerow(['# Port States', self.state_summary()])
+            writer.writerow([])  # Empty row
+            
+            # Write header and results
+            writer.writerow(['Port', 'Service'] + self._stage_columns())
+            for port, service in results:
+                writer.writerow([port, service] + self._stage_values(self.target_ip, port))
+            
+            if include_closed:
+                writer.writerow([])
+                writer.writerow(['State', 'Ports'])
+                for state, ranges in self._compact_states(self.target_ip).items():
+                    writer.writerow([state, ranges])
+    
+    def _export_txt(self, filename, scan_metadata, include_closed=False):
+        """Export results as plain text"""
+        results = self._open_results()
+        with open(filename, 'w') as f:
+            f.write("IP Port Scanner - Scan Results\n")
+            f.write("=" * 60 + "\n\n")
+            
+            if scan_metadata:
+                f.write("Scan Metadata:\n")
+                for key, value in scan_metadata.items():
+                    f.write(f"  {key}: {value}\n")
+                f.write("\n")
+            
+            f.write(f"Target IP: {self.target_ip}\n")
+            f.write(f"Port Range: {self._port_range_label()}\n")
+            f.write(f"Total Open Ports: {len(results)}\n")
+            f.write(f"Port States: {self.state_summary()}\n\n")
+            
+            if results:
+                f.write("Open Ports:\n")
+                f.write("-" * 60 + "\n")
+                for port, service in results:
+                    f.write(f"Port {port:5d}: OPEN - {service}{self._stage_text(self.target_ip, port)}\n")
+            else:
+                f.write("No open ports found.\n")
+            
+            if include_closed:
+                f.write("\nOther Ports:\n")
+                f.write("-" * 60 + "\n")
+                for state, ranges in self._compact_states(self.target_ip).items():
+                    f.write(f"{state.upper()}: {ranges}\n")
+
+
+class AsyncPortScanner(PortScanner):
+    """Port scanner running non-blocking connects on a single asyncio event loop"""
+    
+    def __init__(self, target_ip, start_port, end_port, timeout=0.3, randomize=False, scan_delay=0, concurrency=500,
+                 **options):
+        super().__init__(target_ip, start_port, end_port, timeout=timeout, randomize=randomize, scan_delay=scan_delay,
+                         **options)
+        self.concurrency = concurrency
+        self.connecting = 0  # Connects awaiting an answer; only the event loop thread changes it
+    
+    def probes_in_flight(self):
+        return self.connecting
+    
+    async def scan_port_async(self, port):
+        """Scan a single port without blocking the event loop"""
+        if self.rate_limiter:
+            delay = self.rate_limiter.reserve(self.target_ip)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        
+        loop = asyncio.get_running_loop()
+        while True:
+            delay = self.port_budget.delay()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            sock = None
+            started = time.monotonic()
+            code = 0
+            try:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sock.setblocking(False)
+                self.connecting += 1
+                try:
+                    await asyncio.wait_for(loop.sock_connect(sock, (self.target_ip, port)),
+                                           self.probe_timeout(self.target_ip))
+                finally:
+                    self.connecting -= 1
+            except asyncio.TimeoutError:
+                code = errno.ETIMEDOUT
+            except OSError as e:
+                code = e.errno or errno.EIO
+            finally:
+                if sock is not None:
+                    self.release_socket(sock, code)
+            # Out of descriptors or local ports: the probe never left, so try again once others finish
+            if code not in RESOURCE_ERRNOS or self.control.is_cancelled:
+                break
+            if code != errno.EADDRNOTAVAIL:
+                await asyncio.sleep(0.01)
+        elapsed = time.monotonic() - started
+        self.observe_rtt(self.target_ip, code, elapsed)
+        self.record_state(self.target_ip, ProbeResult(port, classify_errno(code), code, elapsed))
+        if code:
+            return None
+        
+        service = service_name(port)
+        if self.keep_results:
+            self.open_ports.append((port, service))
+        self.hand_off(self.target_ip, port)
+        return port, service
+    
+    async def iter_results(self, progress_callback=None):
+        """
+        Async generator yielding (port, service) tuples as open ports are found
+        
+        Args:
+            progress_callback: Optional callable(ports_scanned, total_ports), called from a
+                               ProgressReporter thread every progress_interval seconds
+        """
+        self.open_ports = []
+        self.ports_scanned = 0
+        self.remaining_ports = []
+        self._reset_states()
+        self.control.reset()
+        ports = iter(self._build_port_list())
+        found = asyncio.Queue()
+        
+        async def probe_worker():
+            # All workers share one iterator; the event loop is single-threaded so no lock is needed
+            while True:
+                while self.control.is_paused:
+                    await asyncio.sleep(0.05)
+                if self.control.is_cancelled:
+                    break
+                port = next(ports, None)
+                if port is None:
+                    break
+                result = await self.scan_port_async(port)
+                if result:
+                    found.put_nowait(result)
+                self.ports_scanned += 1
+        
+        reporter = ProgressReporter(self, progress_callback, self.progress_interval).start()
+        # Never more connects in flight than descriptors to hold them
+        workers = min(self.concurrency, raise_fd_limit(), self.total_ports)
+        tasks = [asyncio.create_task(probe_worker()) for _ in range(workers)]
+        done_marker = asyncio.ensure_future(asyncio.gather(*tasks))
+        try:
+            while True:
+                getter = asyncio.ensure_future(found.get())
+                await asyncio.wait({getter, done_marker}, return_when=asyncio.FIRST_COMPLETED)
+                if getter.done():
+                    yield getter.result()
+                    continue
+                getter.cancel()
+                break
+            # Drain anything queued after the last wait
+            while not found.empty():
+                yield found.get_nowait()
+            await done_marker
+            if self.control.is_cancelled:
+                self.remaining_ports = list(ports)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            reporter.stop()
+    
+    def __aiter__(self):
+        return self.iter_results()
+    
+    async def scan_async(self, callback=None, progress_callback=None):
+        """Scan all ports on the running event loop and return sorted results"""
+        async for port, service in self.iter_results(progress_callback):
+            if callback:
+                callback(port, service)
+        return sorted(self.open_ports, key=lambda x: x[0])
+    
+    def scan(self, num_threads=None, callback=None, progress_callback=None):
+        """
+        Drop-in replacement for PortScanner.scan using an event loop
+        
+        Args:
+            num_threads: Optional override for the number of concurrent connects
+            callback: Optional callable(port, service) invoked for each open port
+            progress_callback: Optional callable(ports_scanned, total_ports)
+        """
+        if num_threads:
+            self.concurrency = num_threads
+        results = asyncio.run(self.scan_async(callback, progress_callback))
+        self.wait_for_stages()
+        return results
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel for expiring large numbers of pending connects
+    
+    Timers are hashed into a fixed ring of slots by their deadline tick, so adding,
+    cancelling and expiring a timer are all O(1) regardless of how many are pending.
+    """
+    
+    def __init__(self, tick=0.01, num_slots=512):
+        self.tick = tick
+        self.num_slots = num_slots
+        self.slots = [{} for _ in range(num_slots)]
+        self.locations = {}  # key -> slot index, for O(1) cancel
+        self.cursor = 0
+        self.last_tick_time = time.monotonic()
+    
+    def __len__(self):
+        return len(self.locations)
+    
+    def add(self, key, timeout):
+        """Schedule key to expire after timeout seconds"""
+        ticks = max(1, math.ceil(timeout / self.tick))
+        slot = (self.cursor + ticks) % self.num_slots
+        # Timers further out than one revolution wait out whole turns of the wheel
+        self.slots[slot][key] = (ticks - 1) // self.num_slots
+        self.locations[key] = slot
+    
+    def cancel(self, key):
+        """Remove a pending timer; unknown keys are ignored"""
+        slot = self.locations.pop(key, None)
+        if slot is not None:
+            del self.slots[slot][key]
+    
+    def advance(self, now=None):
+        """Advance the wheel to the current time and return the keys that expired"""
+        now = time.monotonic() if now is None else now
+        expired = []
+        while now - self.last_tick_time >= self.tick:
+            self.last_tick_time += self.tick
+            self.cursor = (self.cursor + 1) % self.num_slots
+            bucket = self.slots[self.cursor]
+            for key, rounds in list(bucket.items()):
+                if rounds == 0:
+                    del bucket[key]
+                    del self.locations[key]
+                    expired.append(key)
+                else:
+                    bucket[key] = rounds - 1
+        return expired
+
+
+class SelectorPortScanner(PortScanner):
+    """
+    Single-threaded port scanner built on selectors (epoll on Linux)
+    
+    Every probe is a non-blocking connect; completion is detected when the socket
+    becomes writable and the outcome is read from SO_ERROR. Timeouts are handled by
+    a TimerWheel instead of per-socket settimeout calls.
+    """
+    
+    # connect_ex codes meaning the handshake is still in progress
+    IN_PROGRESS = (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY)
+    
+    def __init__(self, target_ip, start_port, end_port, timeout=0.3, randomize=False, scan_delay=0,
+                 max_in_flight=None, tick=0.005, **options):
+        super().__init__(target_ip, start_port, end_port, timeout=timeout, randomize=randomize, scan_delay=scan_delay,
+                         **options)
+        self.max_in_flight = max_in_flight  # None: as many as the descriptor limit allows
+        self.tick = tick
+        self.pending = {}  # fd -> (socket, port, launch time) of each connect in flight
+    
+    def probes_in_flight(self):
+        return len(self.pending)
+    
+    def scan(self, num_threads=None, callback=None, progress_callback=None):
+        """
+        Scan all ports from a single thread and return sorted (port, service) results
+        
+        Args:
+            num_threads: Optional override for the maximum number of connects in flight
+            callback: Optional callable(port, service) invoked for each open port
+            progress_callback: Optional callable(ports_scanned, total_ports)
+        """
+        self.open_ports = []
+        self.ports_scanned = 0
+        self.remaining_ports = []
+        self._reset_states()
+        self.control.reset()
+        ports = iter(self._build_port_list())
+        budget = raise_fd_limit()
+        max_in_flight = min(num_threads or self.max_in_flight or budget, budget)
+        
+        selector = selectors.DefaultSelector()
+        wheel = TimerWheel(tick=self.tick)
+        pending = self.pending = {}
+        next_launch = time.monotonic()
+        exhausted = False
+        
+        def finish(fd, code):
+            sock, port, started = pending.pop(fd)
+            selector.unregister(sock)
+            self.release_socket(sock, code)
+            elapsed = time.monotonic() - started
+            self.observe_rtt(self.target_ip, code, elapsed)
+            self._complete(ProbeResult(port, classify_errno(code), code, elapsed), callback)
+        
+        reporter = ProgressReporter(self, progress_callback, self.progress_interval).start()
+        try:
+            while pending or not exhausted:
+                if self.control.is_cancelled:
+                    # Abandon in-flight connects; they and the unlaunched ports are remaining work
+                    self.remaining_ports = [port for _, port, _ in pending.values()] + list(ports)
+                    break
+                
+                # Launch new connects up to the in-flight budget, holding off while paused
+                while not exhausted and not self.control.is_paused and len(pending) < max_in_flight:
+                    if self.rate_limiter:
+                        # Never sleep here: come back once the slot is due and keep servicing completions
+                        wait = self.rate_limiter.try_acquire(self.target_ip)
+                        if wait > 0:
+                            next_launch = time.monotonic() + wait
+                            break
+                    wait = self.port_budget.delay()
+                    if wait > 0:
+                        next_launch = time.monotonic() + wait
+                        break
+                    port = next(ports, None)
+                    if port is None:
+                        exhausted = True
+                        break
+                    try:
+                        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                    except OSError as e:
+                        if e.errno in RESOURCE_ERRNOS:
+                            # Out of descriptors; retry once in-flight probes drain
+                            ports = self._requeue(port, ports)
+                            max_in_flight = max(1, len(pending))
+                            break
+                        raise
+                    sock.setblocking(False)
+                    result = sock.connect_ex((self.target_ip, port))
+                    if result in RESOURCE_ERRNOS:
+                        # No local port or buffer; retry once the budget's backoff has passed
+                        self.release_socket(sock, result)
+                        ports = self._requeue(port, ports)
+                        next_launch = time.monotonic() + self.port_budget.delay()
+                        break
+                    if result == 0 or result not in self.IN_PROGRESS:
+                        self.release_socket(sock, result)
+                        self._complete(ProbeResult(port, classify_errno(result), result, 0.0), callback)
+                        continue
+                    fd = sock.fileno()
+                    pending[fd] = (sock, port, time.monotonic())
+                    selector.register(sock, selectors.EVENT_WRITE)
+                    wheel.add(fd, self.probe_timeout(self.target_ip))
+                
+                if not pending:
+                    if self.control.is_paused:
+                        self.control.wait_if_paused()
+                    elif not exhausted:
+                        time.sleep(max(0, next_launch - time.monotonic()))
+                    continue
+                
+                select_timeout = self.tick
+                if not exhausted and len(pending) < max_in_flight:
+                    select_timeout = min(self.tick, max(0, next_launch - time.monotonic()))
+                for key, _ in selector.select(timeout=select_timeout):
+                    fd = key.fd
+                    wheel.cancel(fd)
+                    finish(fd, key.fileobj.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR))
+                
+                for fd in wheel.advance():
+                    finish(fd, errno.ETIMEDOUT)
+        finally:
+            for sock, _, _ in pending.values():
+                sock.close()
+            pending.clear()
+            selector.close()
+            reporter.stop()
+        self.wait_for_stages()
+        
+        return sorted(self.open_ports, key=lambda x: x[0])
+    
+    @staticmethod
+    def _requeue(port, ports):
+        """Put a port back in front of the remaining port iterator"""
+        yield port
+        yield from ports
+    
+    def _complete(self, probe, callback):
+        """Record the outcome of one probe and fire callbacks"""
+        self.record_state(self.target_ip, probe)
+        port = probe.port
+        if probe.state == PORT_OPEN:
+            service = service_name(port)
+            if self.keep_results:
+                self.open_ports.append((port, service))
+            self.hand_off(self.target_ip, port)
+            if callback:
+                callback(port, service)
+        self.ports_scanned += 1
+
+
+# uint32 counters each shard publishes: ports scanned, hits, closed/filtered/error counts, probes in flight
+SHARD_COUNTERS = 6
+
+
+def _scan_shard(shm, num_shards, shard_index, hits_offset, target_ip, start_port, end_port, options):
+    """
+    Scan one contiguous shard of ports inside a child process
+    
+    Progress and hits are written straight into shared memory: the shard owns the
+    counters counters[6*i:6*i+6] (ports scanned, hits, closed, filtered, error, in flight) and
+    a uint16 hit array starting at hits_offset, so nothing crosses processes under a
+    lock or gets pickled. A thread lock only orders the shard's own workers.
+    """
+    counters = shm.buf[:4 * SHARD_COUNTERS * num_shards].cast('I')
+    hits = shm.buf[hits_offset:hits_offset + 2 * (end_port - start_port + 1)].cast('H')
+    base = SHARD_COUNTERS * shard_index
+    hit_lock = threading.Lock()  # The threads engine reports hits from many workers at once
+    try:
+        def record_hit(port, service):
+            with hit_lock:
+                # Publish the port before bumping the count so the parent never reads a stale slot
+                hits[counters[base + 1]] = port
+                counters[base + 1] += 1
+        
+        def record_progress(ports_scanned, total_ports):
+            for i, state in enumerate(PORT_STATES[1:]):
+                counters[base + 2 + i] = scanner.state_counts[state]
+            counters[base + 5] = scanner.probes_in_flight()
+            counters[base] = ports_scanned
+        
+        engine = options.pop('engine')
+        num_threads = options.pop('num_threads')
+        scan_kwargs = {'num_threads': num_threads} if num_threads else {}
+        scanner = SCAN_ENGINES[engine](target_ip, start_port, end_port, **options)
+        scanner.scan(callback=record_hit, progress_callback=record_progress, **scan_kwargs)
+    finally:
+        counters.release()
+        hits.release()
+
+
+class ProcessPortScanner(PortScanner):
+    """
+    Port scanner that shards the port range across one process per usable CPU
+    
+    Each shard runs its own engine (selectors by default) in a child process and
+    reports hits through a shared memory block. The parent polls that block to
+    deliver live callbacks and combined progress.
+    """
+    
+    def __init__(self, target_ip, start_port, end_port, timeout=0.3, randomize=False, scan_delay=0,
+                 processes=None, shard_engine='selectors', poll_interval=0.05, **options):
+        if options.get('top_ports'):
+            raise ValueError("top_ports is not supported by the process engine; its shards are contiguous ranges")
+        super().__init__(target_ip, start_port, end_port, timeout=timeout, randomize=randomize, scan_delay=scan_delay,
+                         **options)
+        # Engine options (adaptive, adaptive_timeout, ...) are forwarded to every shard. Shards only
+        # report hits and per-state counts back, so the state matrix here holds open ports only
+        self.shard_options = {key: value for key, value in options.items()
+                              if key not in ('rate_limiter', 'record_states', 'state_file', 'banner_grabber',
+                                             'tls_prober', 'reverse_dns', 'resolver', 'port_budget', 'stream')}
+        self.processes = processes or usable_cpu_count()
+        self.shard_engine = shard_engine
+        self.poll_interval = poll_interval
+        self.shards_in_flight = 0  # Sum of the in-flight counts the shards last published
+    
+    def probes_in_flight(self):
+        return self.shards_in_flight
+    
+    def _build_shards(self):
+        """Split the port range into one contiguous (start, end) shard per process"""
+        self.total_ports = self.end_port - self.start_port + 1
+        num_shards = max(1, min(self.processes, self.total_ports))
+        size, extra = divmod(self.total_ports, num_shards)
+        shards = []
+        start = self.start_port
+        for i in range(num_shards):
+            end = start + size + (1 if i < extra else 0) - 1
+            shards.append((start, end))
+            start = end + 1
+        return shards
+    
+    def scan(self, num_threads=None, callback=None, progress_callback=None):
+        """
+        Scan all ports across worker processes and return sorted (port, service) results
+        
+        Args:
+            num_threads: Optional per-process concurrency passed on to each shard's engine
+            callback: Optional callable(port, service), invoked in this process for each open port
+            progress_callback: Optional callable(ports_scanned, total_ports) with combined progress
+        """
+        self.open_ports = []
+        self.ports_scanned = 0
+        self.remaining_ports = []
+        self._reset_states()
+        self.control.reset()
+        shards = self._build_shards()
+        num_shards = len(shards)
+        
+        # Layout: SHARD_COUNTERS uint32 counters per shard, then a uint16 hit array per shard
+        hits_offsets = []
+        offset = 4 * SHARD_COUNTERS * num_shards
+        for start, end in shards:
+            hits_offsets.append(offset)
+            offset += 2 * (end - start + 1)
+        shm = shared_memory.SharedMemory(create=True, size=offset)
+        
+        options = {
+            'timeout': self.timeout,
+            'randomize': self.randomize,
+            'engine': self.shard_engine,
+            'num_threads': num_threads,
+            **self.shard_options,
+        }
+        if self.rate_limiter:
+            # Each shard gets an equal slice of the rate budget
+            options['rate_limiter'] = self.rate_limiter.scaled(1 / num_shards)
+        # TIME_WAIT is per machine, so the shards split the local port budget the same way
+        options['port_budget'] = self.port_budget.scaled(1 / num_shards)
+        
+        workers = []
+        counters = shm.buf[:4 * SHARD_COUNTERS * num_shards].cast('I')
+        hit_views = [shm.buf[hits_offsets[i]:hits_offsets[i] + 2 * (end - start + 1)].cast('H')
+                     for i, (start, end) in enumerate(shards)]
+        seen = [0] * num_shards
         
-    def scan_port(self, port):
-        """Scan a single port"""
-        # Add scan delay for stealth if configured
-        if self.scan_delay > 0:
-            time.sleep(self.scan_delay)
+        def collect():
+            """Deliver hits and progress published since the last poll"""
+            for i in range(num_shards):
+                count = counters[SHARD_COUNTERS * i + 1]
+                for port in hit_views[i][seen[i]:count]:
+                    service = service_name(port)
+                    if self.keep_results:
+                        self.open_ports.append((port, service))
+                    if self.state_matrix is not None:
+                        self.state_matrix.set(self.target_ip, port, PORT_OPEN)
+                    self.hand_off(self.target_ip, port)
+                    if callback:
+                        callback(port, service)
+                seen[i] = count
+            # Shards only publish counts, so time per state is not tracked for this engine
+            self.state_counts[PORT_OPEN] = sum(counters[1::SHARD_COUNTERS])
+            for j, state in enumerate(PORT_STATES[1:]):
+                self.state_counts[state] = sum(counters[2 + j::SHARD_COUNTERS])
+            self.shards_in_flight = sum(counters[5::SHARD_COUNTERS])
+            self.ports_scanned = sum(counters[0::SHARD_COUNTERS])
         
+        reporter = ProgressReporter(self, progress_callback, self.progress_interval).start()
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(self.timeout)
-            result = sock.connect_ex((self.target_ip, port))
-            sock.close()
+            for i, (start, end) in enumerate(shards):
+                process = multiprocessing.Process(
+                    target=_scan_shard,
+                    args=(shm, num_shards, i, hits_offsets[i], self.target_ip, start, end, dict(options))
+                )
+                process.daemon = True
+                process.start()
+                workers.append(process)
             
-            if result == 0:
-                service = COMMON_SERVICES.get(port, "Unknown Service")
-                with self.lock:
-                    self.open_ports.append((port, service))
-                return port, service
-        except socket.gaierror:
-            return None
-        except socket.error:
+            stopped = False
+            while any(process.is_alive() for process in workers):
+                if self.control.is_cancelled:
+                    # Shards only publish counts, so unfinished ports are not tracked for this engine
+                    for process in workers:
+                        process.terminate()
+                    break
+                if self.control.is_paused != stopped:
+                    # Freeze or thaw the shard processes to follow pause()/resume()
+                    stopped = self.control.is_paused
+                    for process in workers:
+                        if process.is_alive():
+                            try:
+                                os.kill(process.pid, signal.SIGSTOP if stopped else signal.SIGCONT)
+                            except ProcessLookupError:
+                                pass
+                time.sleep(self.poll_interval)
+                collect()
+            collect()
+            
+            failed = [i for i, process in enumerate(workers) if process.exitcode != 0]
+            if failed and not self.control.is_cancelled:
+                raise RuntimeError(f"Scan shard(s) {failed} exited abnormally")
+        finally:
+            for process in workers:
+                if process.is_alive():
+                    process.terminate()
+                    try:
+                        os.kill(process.pid, signal.SIGCONT)  # A stopped process cannot act on SIGTERM
+                    except ProcessLookupError:
+                        pass
+                process.join()
+            reporter.stop()
+            self.wait_for_stages()
+            counters.release()
+            for view in hit_views:
+                view.release()
+            shm.close()
+            shm.unlink()
+        
+        return sorted(self.open_ports, key=lambda x: x[0])
+
+
+# Available scan engines, selectable by name
+SCAN_ENGINES = {
+    'threads': PortScanner,
+    'asyncio': AsyncPortScanner,
+    'selectors': SelectorPortScanner,
+    'process': ProcessPortScanner,
+}
+
+
+def create_scanner(target_ip, start_port, end_port, engine='threads', **kwargs):
+    """Create a scanner using the named engine (see SCAN_ENGINES)"""
+    try:
+        scanner_class = SCAN_ENGINES[engine]
+    except KeyError:
+        raise ValueError(f"Unsupported scan engine: {engine}")
+    return scanner_class(target_ip, start_port, end_port, **kwargs)
+
+
+class HostScheduler:
+    """
+    Hands out (host, port) probes interleaved across hosts
+    
+    Hosts are visited round-robin so every host makes progress at the same rate,
+    and a host already at per_host_limit in-flight probes is skipped until one of
+    its probes is released. With a rate limiter, hosts whose budgets are exhausted
+    are skipped too, so one throttled host or subnet never holds up the others.
+    The global cap is the number of threads calling acquire.
+    """
+    
+    def __init__(self, hosts, ports, per_host_limit=16, stagger=False, rate_limiter=None, skip=None):
+        self.per_host_limit = per_host_limit
+        self.rate_limiter = rate_limiter
+        self.hosts = deque()
+        for host in hosts:
+            # All hosts share one port list; stagger starts each host at a random offset
+            offset = random.randrange(len(ports)) if stagger and ports else 0
+            ordered = itertools.chain(itertools.islice(ports, offset, None), itertools.islice(ports, offset))
+            if skip:
+                # Drop probes already completed, e.g. by an earlier run recorded in a journal
+                ordered = itertools.filterfalse(functools.partial(skip, host), ordered)
+            self.hosts.append([host, ordered, None])  # host, remaining ports, peeked port
+        self.in_flight = {host: 0 for host in hosts}
+        self.pacing = False  # True while one thread sleeps until the next rate limiter slot
+        self.condition = threading.Condition()
+    
+    def acquire(self):
+        """Block until a probe is available and return (host, port), or None when all work is handed out"""
+        with self.condition:
+            while self.hosts:
+                wait = None
+                for _ in range(len(self.hosts)):
+                    entry = self.hosts[0]
+                    host = entry[0]
+                    if self.in_flight[host] >= self.per_host_limit:
+                        self.hosts.rotate(-1)
+                        continue
+                    if entry[2] is None:
+                        entry[2] = next(entry[1], None)
+                        if entry[2] is None:
+                            self.hosts.popleft()
+                            continue
+                    if self.rate_limiter:
+                        host_wait = self.rate_limiter.try_acquire(host)
+                        if host_wait > 0:
+                            wait = host_wait if wait is None else min(wait, host_wait)
+                            self.hosts.rotate(-1)
+                            continue
+                    port, entry[2] = entry[2], None
+                    self.hosts.rotate(-1)
+                    self.in_flight[host] += 1
+                    return host, port
+                if not self.hosts:
+                    break
+                if wait is not None and not self.pacing:
+                    # One thread times the next slot; the rest wait to be handed the baton
+                    self.pacing = True
+                    self.condition.wait(wait)
+                    self.pacing = False
+                    self.condition.notify()
+                else:
+                    # Every remaining host is at its limit; wait for a release
+                    self.condition.wait()
+            self.condition.notify_all()
             return None
-        return None
     
-    def worker(self, callback=None, progress_callback=None):
-        """Worker thread for scanning ports"""
-        while not self.queue.empty():
-            port = self.queue.get()
-            result = self.scan_port(port)
-            if result and callback:
-                callback(result[0], result[1])
+    def retry(self, host, port):
+        """Queue a probe against host to be handed out again"""
+        with self.condition:
+            for entry in self.hosts:
+                if entry[0] == host:
+                    entry[1] = itertools.chain([port], entry[1])
+                    break
+            else:
+                self.hosts.append([host, iter([port]), None])
+            self.condition.notify()
+    
+    def release(self, host):
+        """Mark one in-flight probe against host as finished"""
+        with self.condition:
+            self.in_flight[host] -= 1
+            self.condition.notify()
+    
+    def drain(self):
+        """Remove and return every probe not yet handed out as (host, port) pairs"""
+        with self.condition:
+            remaining = []
+            for host, ports, peeked in self.hosts:
+                if peeked is not None:
+                    remaining.append((host, peeked))
+                remaining.extend((host, port) for port in ports)
+            self.hosts.clear()
+            self.condition.notify_all()
+            return remaining
+
+
+class HostDiscovery:
+    """
+    Liveness pre-stage for multi-host scans
+    
+    Probes a few ports on every host in parallel, spreading the first probes
+    across all hosts. A host that completes a handshake or answers with a RST is
+    alive, and its remaining discovery probes are skipped. Hosts where every
+    probe went unanswered are reported as down.
+    """
+    
+    MAX_RETRIES = 3
+    
+    def __init__(self, ports, concurrency=64):
+        self.ports = list(ports)
+        self.concurrency = concurrency
+    
+    def run(self, hosts, probe, skip=None):
+        """
+        Return the hosts that answered, in their original order
+        
+        probe(host, port) must return the connect_ex code; skip(host, port) may
+        exclude probes already known. Probes that never left this machine
+        (RESOURCE_ERRNOS) are retried a few times, after which the host is kept
+        rather than dropped on no evidence. So is a host with nothing left to
+        probe, e.g. one an earlier run already covered.
+        """
+        # Port-major order reaches every host once before any host is probed twice
+        work = deque((host, port) for port in self.ports for host in hosts if not (skip and skip(host, port)))
+        probed = {host for host, _ in work}
+        alive = {host for host in hosts if host not in probed}
+        retries = {}
+        lock = threading.Lock()
+        
+        def worker():
+            while True:
+                with lock:
+                    while work and work[0][0] in alive:
+                        work.popleft()
+                    if not work:
+                        return
+                    host, port = work.popleft()
+                code = probe(host, port)
+                if code == errno.ECANCELED:
+                    return
+                if code in RESOURCE_ERRNOS:
+                    with lock:
+                        retries[host, port] = retries.get((host, port), 0) + 1
+                        if retries[host, port] > self.MAX_RETRIES:
+                            alive.add(host)
+                        else:
+                            work.append((host, port))
+                    time.sleep(0.05)
+                elif code in (0, errno.ECONNREFUSED):
+                    with lock:
+                        alive.add(host)
+        
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(min(self.concurrency, len(work)))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return [host for host in hosts if host in alive]
+
+
+class MultiTargetScanner(PortScanner):
+    """
+    Scans the same port range on many hosts as one interleaved work set
+    
+    A HostDiscovery pre-stage first probes discovery_ports ports on every host
+    (an int takes that many of the most commonly open ports in the range; a list
+    names them). Only hosts that answer get the full sweep unless force_scan is
+    set. Discovery probes of ports in the sweep count as sweep results, so a
+    live host costs no extra probes.
+    """
+    
+    def __init__(self, targets, start_port, end_port, timeout=0.3, randomize=False, scan_delay=0, per_host_limit=16,
+                 discovery_ports=4, force_scan=False, **options):
+        self.targets = parse_targets(targets, options.get('resolver'))
+        target_spec = targets if isinstance(targets, str) else ', '.join(targets)
+        super().__init__(target_spec, start_port, end_port, timeout=timeout, randomize=randomize, scan_delay=scan_delay,
+                         **options)
+        self.per_host_limit = per_host_limit
+        self.discovery_ports = discovery_ports
+        self.force_scan = force_scan
+        self.down_hosts = []  # Hosts the discovery stage found no sign of
+        self.results_by_host = {}
+    
+    def worker(self, scheduler, callback=None):
+        """Worker thread pulling (host, port) probes from the scheduler"""
+        backoff = 0.0  # Current wait after a local resource error, in seconds
+        while True:
+            item = scheduler.acquire()
+            if item is None:
+                return
+            host, port = item
+            if not self.control.wait_if_paused():
+                scheduler.release(host)
+                with self.lock:
+                    self.remaining_ports.append(item)
+                return
+            code = None
+            if self.controller:
+                self.controller.acquire()
+            started = time.monotonic()
+            try:
+                code = self.connect(host, port)
+            finally:
+                if self.controller:
+                    self.controller.release(code)
+                scheduler.release(host)
             
-            # Update progress counter
-            with self.lock:
-                self.ports_scanned += 1
-                if progress_callback:
-                    progress_callback(self.ports_scanned, self.total_ports)
+            if code in RESOURCE_ERRNOS:
+                # Nothing was sent; hand the probe back to the scheduler
+                scheduler.retry(host, port)
+                if not self.controller and code != errno.EADDRNOTAVAIL:
+                    backoff = min(self.MAX_RESOURCE_BACKOFF, max(0.01, backoff * 2))
+                    self.control.cancelled.wait(backoff)
+                continue
+            backoff = 0.0
+            
+            if self.control.is_cancelled and code != 0:
+                # Aborted mid-probe; hand it back as unfinished work
+                with self.lock:
+                    self.remaining_ports.append(item)
+                return
             
-            self.queue.task_done()
+            self._finish_probe(host, port, code, time.monotonic() - started, callback)
+    
+    def _finish_probe(self, host, port, code, elapsed, callback=None):
+        """Record one completed probe and report it when the port is open"""
+        self.record_state(host, ProbeResult(port, classify_errno(code), code, elapsed))
+        if self.journal:
+            self.journal.record(host, port, code == 0)
+        
+        if code == 0:
+            service = service_name(port)
+            if self.keep_results:
+                with self.lock:
+                    self.open_ports.append((host, port, service))
+                    self.results_by_host.setdefault(host, []).append((port, service))
+            self.hand_off(host, port)
+            if callback:
+                callback(host, port, service)
+        
+        with self.lock:
+            self.ports_scanned += 1
+    
+    def discover(self, hosts, ports, num_threads, callback=None, skip=None):
+        """
+        Run the discovery stage and return (live hosts, probes already done)
+        
+        Discovery probes of ports in the sweep are recorded like sweep probes and
+        returned as a set of (host, port) so the sweep can skip them.
+        """
+        sweep_ports = set(ports)
+        if isinstance(self.discovery_ports, int):
+            candidates = top_ports(self.discovery_ports * 4, self.start_port, self.end_port)
+            if self.top_ports:
+                candidates = [port for port in candidates if port in sweep_ports]
+            discovery_ports = candidates[:self.discovery_ports]
+        else:
+            discovery_ports = list(self.discovery_ports)
+        done = set()
+        
+        def probe(host, port):
+            self.pace(host)
+            started = time.monotonic()
+            code = self.connect(host, port)
+            if port in sweep_ports and code not in RESOURCE_ERRNOS and code != errno.ECANCELED:
+                with self.lock:
+                    done.add((host, port))
+                self._finish_probe(host, port, code, time.monotonic() - started, callback)
+            return code
+        
+        live = HostDiscovery(discovery_ports, concurrency=num_threads).run(hosts, probe, skip)
+        return live, done
     
     def scan(self, num_threads=200, callback=None, progress_callback=None):
-        """Main scanning function with multi-threading"""
+        """
+        Scan every target and return {host: sorted [(port, service)]} for hosts with open ports
+        
+        Args:
+            num_threads: Global cap on concurrent probes across all hosts
+            callback: Optional callable(host, port, service) invoked for each open port
+            progress_callback: Optional callable(ports_scanned, total_ports) over all hosts
+        """
         self.open_ports = []
+        self.results_by_host = {}
         self.ports_scanned = 0
+        self._reset_states()
+        self.control.reset()
         
-        # Create list of ports to scan
-        ports = list(range(self.start_port, self.end_port + 1))
-        self.total_ports = len(ports)
-        
-        # Randomize port order for stealth if enabled
+        hosts = list(self.targets)
+        ports = self._build_port_list()
         if self.randomize:
-            random.shuffle(ports)
+            random.shuffle(hosts)
+        self.total_ports = len(hosts) * len(ports)
+        self._open_journal()
+        skip = None
+        if self.journal:
+            skip = self.journal.is_done
+            for host, done_ports in self.journal.hits.items():
+                for port in done_ports:
+                    service = service_name(port)
+                    self.open_ports.append((host, port, service))
+                    self.results_by_host.setdefault(host, []).append((port, service))
+                    if self.state_matrix is not None:
+                        self.state_matrix.set(host, port, PORT_OPEN)
         
-        # Fill the queue with ports to scan
-        for port in ports:
-            self.queue.put(port)
+        self.down_hosts = []
+        if not self.force_scan and self.discovery_ports:
+            reporter = ProgressReporter(self, progress_callback, self.progress_interval).start()
+            live, done = self.discover(hosts, ports, num_threads, callback, skip)
+            reporter.stop()
+            if self.control.is_cancelled:
+                self.wait_for_stages()
+                # Stopped during discovery; the sweep is handed back as remaining work
+                self.remaining_ports = [(host, port) for host in hosts for port in ports
+                                        if (host, port) not in done and not (skip and skip(host, port))]
+                if self.journal:
+                    self.journal.close(complete=False)
+                return self.sorted_results()
+            self.down_hosts = [host for host in hosts if host not in set(live)]
+            # Down hosts keep only the probes discovery already made
+            self.total_ports -= sum(1 for host in self.down_hosts for port in ports if (host, port) not in done)
+            hosts = live
+            journal_skip = skip
+            skip = lambda host, port: (host, port) in done or bool(journal_skip and journal_skip(host, port))
+        scheduler = HostScheduler(hosts, ports, self.per_host_limit, stagger=self.randomize,
+                                  rate_limiter=self.rate_limiter, skip=skip)
+        return self._run_scheduler(scheduler, num_threads, callback, progress_callback)
+    
+    def continue_scan(self, num_threads=200, callback=None, progress_callback=None):
+        """Scan the (host, port) probes left over by a cancelled scan, keeping the results found so far"""
+        self.control.reset()
+        pending = set(self.remaining_ports)
+        hosts = list(dict.fromkeys(host for host, _ in self.remaining_ports))
+        ports = sorted({port for _, port in self.remaining_ports})
+        if self.journal_path:
+            self._open_journal()
+        scheduler = HostScheduler(hosts, ports, self.per_host_limit, rate_limiter=self.rate_limiter,
+                                  skip=lambda host, port: (host, port) not in pending)
+        return self._run_scheduler(scheduler, num_threads, callback, progress_callback)
+    
+    def _run_scheduler(self, scheduler, num_threads, callback, progress_callback):
+        """Run worker threads over the scheduler until it is exhausted or the scan is cancelled"""
+        self.remaining_ports = []
+        if self.adaptive:
+            self.controller = ConcurrencyController(num_threads)
+            num_threads = self.controller.ceiling
         
-        # Start worker threads
+        reporter = ProgressReporter(self, progress_callback, self.progress_interval).start()
         threads = []
-        for _ in range(min(num_threads, self.queue.qsize())):
-            thread = threading.Thread(target=self.worker, args=(callback, progress_callback))
+        for _ in range(min(num_threads, self.total_ports)):
+            thread = threading.Thread(target=self.worker, args=(scheduler, callback))
             thread.daemon = True
             thread.start()
             threads.append(thread)
         
-        # Wait for all threads to complete
         for thread in threads:
             thread.join()
+        reporter.stop()
+        self.wait_for_stages()
         
-        return sorted(self.open_ports, key=lambda x: x[0])
-    
-    def export_results(self, filename, file_format='json', scan_metadata=None):
-        """
-        Export scan results to a file
+        # Probes never handed out because of a cancel are remaining work
+        self.remaining_ports.extend(scheduler.drain())
         
-        Args:
-            filename: Output file path
-            file_format: Format to export ('json', 'csv', or 'txt')
-            scan_metadata: Optional dictionary with scan metadata (timestamp, duration, etc.)
-        """
-        if file_format == 'json':
-            self._export_json(filename, scan_metadata)
-        elif file_format == 'csv':
-            self._export_csv(filename, scan_metadata)
-        elif file_format == 'txt':
-            self._export_txt(filename, scan_metadata)
-        else:
-            raise ValueError(f"Unsupported file format: {file_format}")
+        if self.journal:
+            self.journal.close(complete=not self.remaining_ports)
+        return self.sorted_results()
     
-    def _export_json(self, filename, scan_metadata):
-        """Export results as JSON"""
+    def _journal_header(self):
+        header = super()._journal_header()
+        header['target'] = self.targets
+        return header
+    
+    def _state_hosts(self):
+        return self.targets
+    
+    def sorted_results(self):
+        """Return results keyed by host, hosts in address order and ports ascending"""
+        if self.state_matrix is not None:
+            results = {}
+            for host in sorted(self.targets, key=ipaddress.IPv4Address):
+                ports = self.state_matrix.ports(host)
+                if ports:
+                    results[host] = [(port, service_name(port)) for port in ports]
+            return results
+        return {
+            host: sorted(self.results_by_host[host])
+            for host in sorted(self.results_by_host, key=ipaddress.IPv4Address)
+        }
+    
+    def _compact_states_by_host(self):
+        """Return {host: {state: port ranges}} for hosts with closed or filtered ports stored"""
+        states = {}
+        for host in sorted(self.targets, key=ipaddress.IPv4Address):
+            ranges = self._compact_states(host)
+            if ranges:
+                states[host] = ranges
+        return states
+    
+    def _export_json(self, filename, scan_metadata, include_closed=False):
+        """Export results as JSON, keyed by host"""
+        results = self.sorted_results()
         data = {
             'scan_info': {
-                'target_ip': self.target_ip,
+                'targets': self.target_ip,
+                'total_hosts': len(self.targets),
+                'down_hosts': self.down_hosts,
                 'start_port': self.start_port,
                 'end_port': self.end_port,
+                'top_ports': self.top_ports,
                 'timeout': self.timeout,
-                'total_open_ports': len(self.open_ports)
+                'total_open_ports': sum(len(ports) for ports in results.values()),
+                'state_counts': dict(self.state_counts)
             },
-            'results': [
-                {'port': port, 'service': service}
-                for port, service in self.open_ports
-            ]
+            'results': {
+                host: [self._result_entry(host, port, service) for port, service in ports]
+                for host, ports in results.items()
+            }
         }
+        hostnames = {host: self.hostname(host) for host in self.targets}
+        data['scan_info']['hostnames'] = {host: name for host, name in hostnames.items() if name}
+        if include_closed:
+            data['port_states'] = self._compact_states_by_host()
         
         if scan_metadata:
             data['scan_info'].update(scan_metadata)
@@ -165,29 +3498,40 @@ class PortScanner:
         with open(filename, 'w') as f:
             json.dump(data, f, indent=2)
     
-    def _export_csv(self, filename, scan_metadata):
-        """Export results as CSV"""
+    def _export_csv(self, filename, scan_metadata, include_closed=False):
+        """Export results as CSV with one row per host and port"""
+        results = self.sorted_results()
         with open(filename, 'w', newline='') as f:
             writer = csv.writer(f)
             
-            # Write metadata as comments
             if scan_metadata:
                 writer.writerow(['# Scan Metadata'])
                 for key, value in scan_metadata.items():
                     writer.writerow([f'# {key}', value])
             
-            writer.writerow(['# Target IP', self.target_ip])
-            writer.writerow(['# Port Range', f'{self.start_port}-{self.end_port}'])
-            writer.writerow(['# Total Open Ports', len(self.open_ports)])
+            writer.writerow(['# Targets', self.target_ip])
+            writer.writerow(['# Total Hosts', len(self.targets)])
+            writer.writerow(['# Port Range', self._port_range_label()])
+            writer.writerow(['# Total Open Ports', sum(len(ports) for ports in results.values())])
+            writer.writerow(['# Port States', self.state_summary()])
             writer.writerow([])  # Empty row
             
-            # Write header and results
-            writer.writerow(['Port', 'Service'])
-            for port, service in self.open_ports:
-                writer.writerow([port, service])
+            writer.writerow(['Host', 'Port', 'Service'] + self._stage_columns())
+            for host, ports in results.items():
+                for port, service in ports:
+                    writer.writerow([host, port, service] + self._stage_values(host, port))
+            
+            if include_closed:
+                writer.writerow([])
+                writer.writerow(['Host', 'State', 'Ports'])
+                for host, states in self._compact_states_by_host().items():
+                    for state, ranges in states.items():
+                        writer.writerow([host, state, ranges])
     
-    def _export_txt(self, filename, scan_metadata):
-        """Export results as plain text"""
+    def _export_txt(self, filename, scan_metadata, include_closed=False):
+        """Export results as plain text, grouped by host"""
+        results = self.sorted_results()
+        other_states = self._compact_states_by_host() if include_closed else {}
         with open(filename, 'w') as f:
             f.write("IP Port Scanner - Scan Results\n")
             f.write("=" * 60 + "\n\n")
@@ -198,17 +3542,348 @@ class PortScanner:
                     f.write(f"  {key}: {value}\n")
                 f.write("\n")
             
-            f.write(f"Target IP: {self.target_ip}\n")
-            f.write(f"Port Range: {self.start_port}-{self.end_port}\n")
-            f.write(f"Total Open Ports: {len(self.open_ports)}\n\n")
+            f.write(f"Targets: {self.target_ip}\n")
+            f.write(f"Total Hosts: {len(self.targets)}\n")
+            f.write(f"Port Range: {self._port_range_label()}\n")
+            f.write(f"Total Open Ports: {sum(len(ports) for ports in results.values())}\n")
+            f.write(f"Port States: {self.state_summary()}\n\n")
             
-            if self.open_ports:
-                f.write("Open Ports:\n")
-                f.write("-" * 60 + "\n")
-                for port, service in self.open_ports:
-                    f.write(f"Port {port:5d}: OPEN - {service}\n")
-            else:
+            if not results:
                 f.write("No open ports found.\n")
+            for host in sorted(set(results) | set(other_states), key=ipaddress.IPv4Address):
+                f.write(f"Host {host}:\n")
+                f.write("-" * 60 + "\n")
+                for port, service in results.get(host, []):
+                    f.write(f"Port {port:5d}: OPEN - {service}{self._stage_text(host, port)}\n")
+                for state, ranges in other_states.get(host, {}).items():
+                    f.write(f"{state.upper()}: {ranges}\n")
+                f.write("\n")
+
+
+def resume_scan(path, **options):
+    """
+    Rebuild the scanner for an interrupted scan from its journal
+    
+    Calling scan() on the returned scanner skips every probe the journal marks as
+    completed and reports earlier hits alongside new ones.
+    """
+    header = ScanJournal.read_header(path)
+    settings = {
+        'timeout': header['timeout'],
+        'randomize': header['randomize'],
+        'scan_delay': header['scan_delay'],
+        'top_ports': header.get('top_ports'),
+        'journal': path,
+    }
+    settings.update(options)
+    if isinstance(header['target'], list):
+        return MultiTargetScanner(header['target'], header['start_port'], header['end_port'], **settings)
+    return PortScanner(header['target'], header['start_port'], header['end_port'], **settings)
+
+
+class _CoordinatorHandler(socketserver.StreamRequestHandler):
+    """Serves one worker connection for a ScanCoordinator"""
+    
+    def handle(self):
+        coordinator = self.server.coordinator
+        connection_id = id(self)
+        try:
+            for line in self.rfile:
+                message = json.loads(line)
+                reply = coordinator.handle_message(connection_id, message)
+                if reply is not None:
+                    self.wfile.write(json.dumps(reply).encode() + b"\n")
+                    self.wfile.flush()
+        except (OSError, ValueError):
+            pass
+        finally:
+            # A dead worker's leases go straight back to the pending pool
+            coordinator.release_connection(connection_id)
+
+
+class ScanCoordinator(MultiTargetScanner):
+    """
+    Leases chunks of the target x port space to remote ScanWorker processes
+    
+    Workers talk newline-delimited JSON over TCP:
+      worker -> {"type": "lease"}
+      coordinator -> {"type": "lease", "lease_id": ..., "host": ..., "start_port": ..., ...}
+                   | {"type": "wait", "retry": seconds} | {"type": "done"}
+      worker -> {"type": "result", "lease_id": ..., "host": ..., "port": ...}
+      worker -> {"type": "complete", "lease_id": ..., "scanned": n, "states": {state: count}}
+    
+    A lease that is not completed within lease_timeout seconds, or whose worker
+    disconnects, is re-issued. Results are merged into the usual host-keyed result set.
+    """
+    
+    def __init__(self, targets, start_port, end_port, timeout=0.3, randomize=False, scan_delay=0,
+                 chunk_size=1024, lease_timeout=60, bind_host='127.0.0.1', bind_port=0, stream=None):
+        super().__init__(targets, start_port, end_port, timeout=timeout, randomize=randomize, scan_delay=scan_delay,
+                         stream=stream)
+        self.chunk_size = chunk_size
+        self.lease_timeout = lease_timeout
+        self.bind_address = (bind_host, bind_port)
+        self.server = None
+        self.address = None
+        self.finished = threading.Event()
+        self.callback = None
+        self._reset_work()
+    
+    def _reset_work(self):
+        """Split the target x port space into chunks waiting to be leased"""
+        self.chunks = [
+            (host, lo, min(lo + self.chunk_size - 1, self.end_port))
+            for host in self.targets
+            for lo in range(self.start_port, self.end_port + 1, self.chunk_size)
+        ]
+        if self.randomize:
+            random.shuffle(self.chunks)
+        self.pending = deque(range(len(self.chunks)))
+        self.leases = {}  # lease_id -> (chunk index, deadline, connection id)
+        self.completed = set()
+        self.next_lease_id = 0
+        self.open_ports = []
+        self.results_by_host = {}
+        self.ports_scanned = 0
+        self._reset_states()
+        self.total_ports = len(self.targets) * (self.end_port - self.start_port + 1)
+        self.finished.clear()
+    
+    def start(self):
+        """Start accepting workers in the background and return the (host, port) bound"""
+        if self.server is None:
+            self.server = socketserver.ThreadingTCPServer(self.bind_address, _CoordinatorHandler)
+            self.server.daemon_threads = True
+            self.server.coordinator = self
+            self.address = self.server.server_address
+            thread = threading.Thread(target=self.server.serve_forever)
+            thread.daemon = True
+            thread.start()
+        return self.address
+    
+    def stop(self):
+        """Stop accepting workers"""
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+    
+    def handle_message(self, connection_id, message):
+        """Process one worker message and return the reply, if any"""
+        kind = message.get('type')
+        if kind == 'lease':
+            return self._issue_lease(connection_id)
+        if kind == 'result':
+            self._record_result(message['host'], message['port'])
+        elif kind == 'complete':
+            self._complete_lease(message['lease_id'], message.get('states'))
+        return None
+    
+    def _issue_lease(self, connection_id):
+        with self.lock:
+            now = time.monotonic()
+            for lease_id, (index, deadline, _) in list(self.leases.items()):
+                if deadline < now:
+                    del self.leases[lease_id]
+                    self.pending.append(index)
+            
+            while self.pending:
+                index = self.pending.popleft()
+                if index in self.completed:
+                    continue
+                lease_id = self.next_lease_id
+                self.next_lease_id += 1
+                self.leases[lease_id] = (index, now + self.lease_timeout, connection_id)
+                host, start_port, end_port = self.chunks[index]
+                return {
+                    'type': 'lease',
+                    'lease_id': lease_id,
+                    'host': host,
+                    'start_port': start_port,
+                    'end_port': end_port,
+                    'timeout': self.timeout,
+                    'randomize': self.randomize,
+                    'scan_delay': self.scan_delay,
+                }
+            if self.leases:
+                return {'type': 'wait', 'retry': 0.2}
+            return {'type': 'done'}
+    
+    def _record_result(self, host, port):
+        with self.lock:
+            # A re-issued lease can report the same port twice
+            if port in (p for p, _ in self.results_by_host.get(host, ())):
+                return
+            service = service_name(port)
+            self.open_ports.append((host, port, service))
+            self.results_by_host.setdefault(host, []).append((port, service))
+            self.state_counts[PORT_OPEN] += 1
+        self.hand_off(host, port)
+        if self.callback:
+            self.callback(host, port, service)
+    
+    def _complete_lease(self, lease_id, states=None):
+        with self.lock:
+            lease = self.leases.pop(lease_id, None)
+            if lease is None or lease[0] in self.completed:
+                return
+            index = lease[0]
+            self.completed.add(index)
+            for state, count in (states or {}).items():
+                # Open ports are counted as their results arrive, without duplicates
+                if state in self.state_counts and state != PORT_OPEN:
+                    self.state_counts[state] += count
+            _, start_port, end_port = self.chunks[index]
+            self.ports_scanned += end_port - start_port + 1
+            if len(self.completed) == len(self.chunks):
+                self.finished.set()
+    
+    def release_connection(self, connection_id):
+        """Return every lease held by a disconnected worker to the pending pool"""
+        with self.lock:
+            for lease_id, (index, _, owner) in list(self.leases.items()):
+                if owner == connection_id:
+                    del self.leases[lease_id]
+                    self.pending.appendleft(index)
+    
+    def scan(self, num_threads=None, callback=None, progress_callback=None):
+        """
+        Serve leases until every chunk is complete and return host-keyed results
+        
+        Args:
+            num_threads: Unused; concurrency is decided by each worker
+            callback: Optional callable(host, port, service) invoked for each open port
+            progress_callback: Optional callable(ports_scanned, total_ports) as chunks complete
+        """
+        # Workers may already hold leases handed out after start(); only reset a finished scan
+        if self.finished.is_set():
+            self._reset_work()
+        self.callback = callback
+        self.start()
+        reporter = ProgressReporter(self, progress_callback, self.progress_interval).start()
+        try:
+            self.finished.wait()
+        finally:
+            self.stop()
+            reporter.stop()
+        return self.sorted_results()
+
+
+class ScanWorker:
+    """Leases chunks from a ScanCoordinator, scans them locally and streams results back"""
+    
+    def __init__(self, coordinator_host, coordinator_port, engine='selectors', num_threads=None):
+        self.coordinator_address = (coordinator_host, coordinator_port)
+        self.engine = engine
+        self.num_threads = num_threads
+        self.send_lock = threading.Lock()
+        self.chunks_scanned = 0
+    
+    def _send(self, sock, message):
+        with self.send_lock:
+            sock.sendall(json.dumps(message).encode() + b"\n")
+    
+    def run(self):
+        """Process leases until the coordinator reports the scan is done or goes away"""
+        try:
+            sock = socket.create_connection(self.coordinator_address)
+        except OSError:
+            return self.chunks_scanned
+        try:
+            replies = sock.makefile('rb')
+            while True:
+                self._send(sock, {'type': 'lease'})
+                line = replies.readline()
+                if not line:
+                    break
+                lease = json.loads(line)
+                if lease['type'] == 'done':
+                    break
+                if lease['type'] == 'wait':
+                    time.sleep(lease['retry'])
+                    continue
+                
+                lease_id = lease['lease_id']
+                host = lease['host']
+                scanner = create_scanner(host, lease['start_port'], lease['end_port'], engine=self.engine,
+                                         timeout=lease['timeout'], randomize=lease['randomize'],
+                                         scan_delay=lease['scan_delay'])
+                scan_kwargs = {'num_threads': self.num_threads} if self.num_threads else {}
+                scanner.scan(
+                    callback=lambda port, service: self._send(
+                        sock, {'type': 'result', 'lease_id': lease_id, 'host': host, 'port': port}),
+                    **scan_kwargs
+                )
+                self._send(sock, {'type': 'complete', 'lease_id': lease_id, 'scanned': scanner.ports_scanned,
+                                  'states': scanner.state_counts})
+                self.chunks_scanned += 1
+        except (OSError, ValueError):
+            pass
+        finally:
+            sock.close()
+        return self.chunks_scanned
+
+
+class ResultView:
+    """
+    Filtered, sortable window over a growing list of result rows
+    
+    This is the model behind the GUI's virtualized results table. Every row lives
+    here and the widget only asks for the slice it can show, so 100k+ rows cost no
+    more Tk work than twenty.
+    """
+    
+    def __init__(self, sort_keys=None):
+        self.sort_keys = sort_keys or {}  # column index -> key function
+        self.rows = []
+        self.view = []  # Rows passing the filter, in display order
+        self.filter_text = ''
+        self.sort_column = None
+        self.sort_reverse = False
+        self.needs_sort = False
+    
+    def __len__(self):
+        return len(self.view)
+    
+    def _matches(self, row):
+        return not self.filter_text or any(self.filter_text in str(value).lower() for value in row)
+    
+    def add(self, rows):
+        """Append rows, keeping the ones that pass the filter in view"""
+        self.rows.extend(rows)
+        matching = [row for row in rows if self._matches(row)]
+        self.view.extend(matching)
+        if matching and self.sort_column is not None:
+            self.needs_sort = True
+    
+    def set_filter(self, text):
+        """Show only rows with a value containing text, case-insensitively"""
+        self.filter_text = text.strip().lower()
+        self.view = [row for row in self.rows if self._matches(row)]
+        self.needs_sort = self.sort_column is not None
+    
+    def sort_by(self, column):
+        """Sort on column; sorting on the same column again reverses the order"""
+        if column == self.sort_column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column = column
+            self.sort_reverse = False
+        self.needs_sort = True
+    
+    def window(self, offset, count):
+        """Return up to count rows of the view starting at offset"""
+        if self.needs_sort:
+            key = self.sort_keys.get(self.sort_column, lambda value: value)
+            column = self.sort_column
+            self.view.sort(key=lambda row: key(row[column]), reverse=self.sort_reverse)
+            self.needs_sort = False
+        return self.view[offset:offset + count]
+    
+    def clear(self):
+        self.rows = []
+        self.view = []
+        self.needs_sort = False
 
 
 class PortScannerGUI:
@@ -226,8 +3901,11 @@ class PortScannerGUI:
         self.scan_duration = None
         self.total_ports = 0
         self.ports_scanned = 0
+        self.result_queue = Queue()  # Row batches from scan threads, drained on the Tk thread
+        self.detail_queue = Queue()  # (host, port, text) from the banner and TLS stages
         
         self.create_widgets()
+        self.drain_results()
         
     def create_widgets(self):
         """Create GUI widgets"""
@@ -239,10 +3917,10 @@ class PortScannerGUI:
         self.root.columnconfigure(0, weight=1)
         self.root.rowconfigure(0, weight=1)
         main_frame.columnconfigure(1, weight=1)
-        main_frame.rowconfigure(5, weight=1)
+        main_frame.rowconfigure(8, weight=1)
         
         # IP Address input
-        ttk.Label(main_frame, text="Target IP Address:").grid(row=0, column=0, sticky=tk.W, pady=5)
+        ttk.Label(main_frame, text="Target(s):").grid(row=0, column=0, sticky=tk.W, pady=5)
         self.ip_entry = ttk.Entry(main_frame, width=30)
         self.ip_entry.grid(row=0, column=1, sticky=(tk.W, tk.E), pady=5, padx=5)
         self.ip_entry.insert(0, "127.0.0.1")
@@ -259,9 +3937,22 @@ class PortScannerGUI:
         self.end_port_entry.grid(row=2, column=1, sticky=(tk.W, tk.E), pady=5, padx=5)
         self.end_port_entry.insert(0, "1024")
         
+        # Top ports: only the N most commonly open ports within the range, most likely first
+        ttk.Label(main_frame, text="Top Ports:").grid(row=3, column=0, sticky=tk.W, pady=5)
+        top_frame = ttk.Frame(main_frame)
+        top_frame.grid(row=3, column=1, sticky=(tk.W, tk.E), pady=5, padx=5)
+        self.top_ports_entry = ttk.Entry(top_frame, width=10)
+        self.top_ports_entry.pack(side=tk.LEFT)
+        self.top_ports_entry.insert(0, "0")
+        ttk.Label(top_frame, text="(0 = whole range, N = the N most common ports in it)").pack(side=tk.LEFT, padx=(5, 0))
+        # Multi-host scans skip hosts that answer none of the discovery probes unless forced
+        self.force_scan_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(top_frame, text="Scan hosts that look down",
+                        variable=self.force_scan_var).pack(side=tk.RIGHT)
+        
         # Stealth options frame
         stealth_frame = ttk.LabelFrame(main_frame, text="Stealth Options", padding="10")
-        stealth_frame.grid(row=3, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=10, padx=5)
+        stealth_frame.grid(row=4, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=10, padx=5)
         
         # Randomize scan order
         self.randomize_var = tk.BooleanVar(value=False)
@@ -284,7 +3975,7 @@ class PortScannerGUI:
         
         # Buttons frame
         button_frame = ttk.Frame(main_frame)
-        button_frame.grid(row=4, column=0, columnspan=2, pady=10)
+        button_frame.grid(row=5, column=0, columnspan=2, pady=10)
         
         self.scan_button = ttk.Button(button_frame, text="Start Scan", command=self.start_scan)
         self.scan_button.grid(row=0, column=0, padx=5)
@@ -292,15 +3983,18 @@ class PortScannerGUI:
         self.stop_button = ttk.Button(button_frame, text="Stop Scan", command=self.stop_scan, state=tk.DISABLED)
         self.stop_button.grid(row=0, column=1, padx=5)
         
+        self.pause_button = ttk.Button(button_frame, text="Pause", command=self.toggle_pause, state=tk.DISABLED)
+        self.pause_button.grid(row=0, column=2, padx=5)
+        
         self.clear_button = ttk.Button(button_frame, text="Clear Results", command=self.clear_results)
-        self.clear_button.grid(row=0, column=2, padx=5)
+        self.clear_button.grid(row=0, column=3, padx=5)
         
         self.export_button = ttk.Button(button_frame, text="Export Results", command=self.export_results)
-        self.export_button.grid(row=0, column=3, padx=5)
+        self.export_button.grid(row=0, column=4, padx=5)
         
         # Progress bar and ETA frame
         progress_frame = ttk.Frame(main_frame)
-        progress_frame.grid(row=5, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=5, padx=5)
+        progress_frame.grid(row=6, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=5, padx=5)
         progress_frame.columnconfigure(0, weight=1)
         
         self.progress = ttk.Progressbar(progress_frame, mode='determinate')
@@ -311,22 +4005,39 @@ class PortScannerGUI:
         self.eta_label.grid(row=1, column=0, sticky=(tk.W, tk.E))
         
         # Results area
-        ttk.Label(main_frame, text="Scan Results:").grid(row=6, column=0, columnspan=2, sticky=tk.W, pady=(10, 5))
+        results_bar = ttk.Frame(main_frame)
+        results_bar.grid(row=7, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(10, 5))
+        ttk.Label(results_bar, text="Scan Results:").pack(side=tk.LEFT)
+        
+        self.include_closed_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(results_bar, text="Include closed/filtered",
+                        variable=self.include_closed_var).pack(side=tk.RIGHT)
+        
+        self.banners_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(results_bar, text="Grab banners", variable=self.banners_var).pack(side=tk.RIGHT, padx=5)
         
-        self.results_text = scrolledtext.ScrolledText(main_frame, width=80, height=20, wrap=tk.WORD)
-        self.results_text.grid(row=7, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=5, padx=5)
+        self.tls_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(results_bar, text="Probe TLS", variable=self.tls_var).pack(side=tk.RIGHT, padx=5)
+        
+        self.filter_var = tk.StringVar()
+        self.filter_var.trace_add('write', lambda *args: self.results_table.set_filter(self.filter_var.get()))
+        ttk.Entry(results_bar, textvariable=self.filter_var, width=20).pack(side=tk.RIGHT, padx=5)
+        ttk.Label(results_bar, text="Filter:").pack(side=tk.RIGHT)
+        
+        self.results_table = ResultsTable(main_frame)
+        self.results_table.grid(row=8, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=5, padx=5)
         
         # Status bar
         self.status_label = ttk.Label(main_frame, text="Ready to scan", relief=tk.SUNKEN, anchor=tk.W)
-        self.status_label.grid(row=8, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=5)
-        
-    def validate_ip(self, ip):
-        """Validate IP address format"""
-        pattern = re.compile(r"^(\d{1,3}\.){3}\d{1,3}$")
-        if pattern.match(ip):
-            parts = ip.split('.')
-            return all(0 <= int(part) <= 255 for part in parts)
-        return False
+        self.status_label.grid(row=9, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=5)
+        
+    def validate_targets(self, targets):
+        """Validate a target specification (addresses, CIDR blocks, ranges, hostnames or lists)"""
+        try:
+            parse_targets(targets, resolve=False)
+        except ValueError:
+            return False
+        return True
     
     def validate_port(self, port):
         """Validate port number"""
@@ -340,13 +4051,32 @@ class PortScannerGUI:
         """Update status label"""
         self.status_label.config(text=message)
     
-    def append_result(self, port, service):
-        """Append scan result to results text"""
-        self.results_text.insert(tk.END, f"Port {port}: OPEN - {service}\n")
-        self.results_text.see(tk.END)
+    def append_result(self, port, service, host=None):
+        """Queue an open port for the results table; safe to call from scan threads"""
+        self.result_queue.put([(host, port, PORT_OPEN, service, '')])
+    
+    def drain_results(self, max_batches=5000):
+        """Move queued rows into the results table in one update, then reschedule"""
+        rows = []
+        for _ in range(max_batches):
+            try:
+                rows.extend(self.result_queue.get_nowait())
+            except Empty:
+                break
+        if rows:
+            self.results_table.add_rows(rows)
+        details = []
+        while True:
+            try:
+                details.append(self.detail_queue.get_nowait())
+            except Empty:
+                break
+        if details:
+            self.results_table.add_details(details)
+        self.root.after(100, self.drain_results)
     
     def update_progress(self, ports_scanned, total_ports):
-        """Update progress bar and ETA"""
+        """Update progress bar and ETA; the engine calls this about ten times a second"""
         if total_ports == 0:
             return
         
@@ -356,35 +4086,32 @@ class PortScannerGUI:
         # Calculate progress percentage
         progress_percent = (ports_scanned / total_ports) * 100
         
-        # Update progress bar
-        self.root.after(0, lambda: self.progress.config(value=progress_percent))
+        # Throughput and hits from the engine's latest progress snapshot
+        snapshot = self.scanner.progress if self.scanner else None
+        rate_text = f" | {snapshot.rate:.0f} ports/s | {snapshot.open_ports} open" if snapshot else ""
         
-        # Calculate ETA
-        if ports_scanned > 0 and self.scan_start_time:
-            elapsed_time = (datetime.now() - self.scan_start_time).total_seconds()
-            avg_time_per_port = elapsed_time / ports_scanned
-            remaining_ports = total_ports - ports_scanned
-            estimated_remaining_time = avg_time_per_port * remaining_ports
-            
-            # Format ETA
-            if estimated_remaining_time < 60:
-                eta_str = f"{int(estimated_remaining_time)}s"
-            elif estimated_remaining_time < 3600:
-                minutes = int(estimated_remaining_time / 60)
-                seconds = int(estimated_remaining_time % 60)
-                eta_str = f"{minutes}m {seconds}s"
-            else:
-                hours = int(estimated_remaining_time / 3600)
-                minutes = int((estimated_remaining_time % 3600) / 60)
-                eta_str = f"{hours}h {minutes}m"
-            
-            # Update ETA label
-            status_text = f"Progress: {ports_scanned}/{total_ports} ports ({progress_percent:.1f}%) | ETA: {eta_str}"
-            self.root.after(0, lambda: self.eta_label.config(text=status_text))
+        # The engine's ETA follows the recent rate rather than the whole-scan average
+        status_text = None
+        if ports_scanned > 0 and snapshot and snapshot.eta is not None:
+            status_text = (f"Progress: {ports_scanned}/{total_ports} ports ({progress_percent:.1f}%)"
+                           f"{rate_text} | ETA: {format_eta(snapshot)}")
+        
+        # Update the progress bar and ETA label in one Tk event
+        def refresh():
+            self.progress.config(value=progress_percent)
+            if status_text:
+                self.eta_label.config(text=status_text)
+        self.root.after(0, refresh)
     
     def clear_results(self):
-        """Clear results text area"""
-        self.results_text.delete(1.0, tk.END)
+        """Clear the results table"""
+        for queue in (self.result_queue, self.detail_queue):
+            while True:
+                try:
+                    queue.get_nowait()
+                except Empty:
+                    break
+        self.results_table.clear()
         self.eta_label.config(text="")
         self.progress.config(value=0)
         self.update_status("Results cleared")
@@ -393,8 +4120,8 @@ class PortScannerGUI:
         """Start the port scanning process"""
         # Validate inputs
         target_ip = self.ip_entry.get().strip()
-        if not self.validate_ip(target_ip):
-            messagebox.showerror("Invalid IP", "Please enter a valid IP address")
+        if not self.validate_targets(target_ip):
+            messagebox.showerror("Invalid Target", "Please enter a valid IP address, CIDR block, range, hostname or list")
             return
         
         start_port = self.start_port_entry.get().strip()
@@ -414,6 +4141,12 @@ class PortScannerGUI:
             messagebox.showerror("Invalid Range", "Start port must be less than or equal to end port")
             return
         
+        top_ports_text = self.top_ports_entry.get().strip() or "0"
+        if not top_ports_text.isdigit() or int(top_ports_text) > 65535:
+            messagebox.showerror("Invalid Top Ports", "Top ports must be a number from 0 to 65535")
+            return
+        top_ports_count = int(top_ports_text)
+        
         # Validate scan delay
         scan_delay = 0
         try:
@@ -428,7 +4161,9 @@ class PortScannerGUI:
         # Disable scan button and enable stop button
         self.scan_button.config(state=tk.DISABLED)
         self.stop_button.config(state=tk.NORMAL)
+        self.pause_button.config(state=tk.NORMAL, text="Pause")
         self.scanning = True
+        self.scanner = None  # Detaches a stopped scan that is still winding down
         
         # Clear previous results
         self.clear_results()
@@ -445,44 +4180,92 @@ class PortScannerGUI:
             stealth_msg = f" [Stealth: {', '.join(features)}]"
         
         # Update status and start progress bar
-        self.update_status(f"Scanning {target_ip} ports {start_port}-{end_port}...{stealth_msg}")
+        port_desc = f"top {top_ports_count} ports in {start_port}-{end_port}" if top_ports_count else \
+            f"ports {start_port}-{end_port}"
+        self.update_status(f"Scanning {target_ip} {port_desc}...{stealth_msg}")
         self.progress.config(value=0)
         self.eta_label.config(text="Initializing scan...")
         
         # Run scan in separate thread
-        scan_thread = threading.Thread(target=self.run_scan, args=(target_ip, start_port, end_port, scan_delay))
+        options = {'randomize': self.randomize_var.get(), 'include_closed': self.include_closed_var.get(),
+                   'top_ports_count': top_ports_count, 'grab_banners': self.banners_var.get(),
+                   'probe_tls': self.tls_var.get(), 'force_scan': self.force_scan_var.get()}
+        scan_thread = threading.Thread(target=self.run_scan, args=(target_ip, start_port, end_port, scan_delay),
+                                       kwargs=options)
         scan_thread.daemon = True
         scan_thread.start()
     
-    def run_scan(self, target_ip, start_port, end_port, scan_delay=0):
+    def run_scan(self, target_ip, start_port, end_port, scan_delay=0, randomize=False, include_closed=False,
+                 top_ports_count=0, grab_banners=False, probe_tls=False, force_scan=False):
         """Run the actual scan"""
+        scanner = None
         try:
             self.scan_start_time = datetime.now()
             self.ports_scanned = 0
-            self.total_ports = end_port - start_port + 1
-            randomize = self.randomize_var.get()
-            self.scanner = PortScanner(target_ip, start_port, end_port, timeout=0.3, randomize=randomize, scan_delay=scan_delay)
-            results = self.scanner.scan(num_threads=200, callback=self.append_result, progress_callback=self.update_progress)
+            hosts = parse_targets(target_ip)
+            port_count = end_port - start_port + 1
+            if top_ports_count:
+                port_count = min(port_count, top_ports_count)
+            self.total_ports = len(hosts) * port_count
+            options = {'timeout': 0.3, 'randomize': randomize, 'scan_delay': scan_delay, 'adaptive': True,
+                       'adaptive_timeout': True, 'record_states': include_closed, 'top_ports': top_ports_count or None}
+            # A stopped scan may still be draining its stages after the next one starts;
+            # only the scanner in self.scanner may touch the UI
+            current = lambda: self.scanner is scanner and self.scanning
+            if grab_banners:
+                options['banner_grabber'] = BannerGrabber(
+                    callback=lambda *banner: current() and self.detail_queue.put(banner))
+            if probe_tls:
+                options['tls_prober'] = TlsProber(
+                    callback=lambda host, port, tls: current() and self.detail_queue.put((host, port, format_tls(tls))))
+            if len(hosts) > 1:
+                scanner = MultiTargetScanner(hosts, start_port, end_port, force_scan=force_scan, **options)
+                callback = lambda host, port, service: current() and self.append_result(port, service, host)
+            else:
+                scanner = PortScanner(hosts[0], start_port, end_port, **options)
+                callback = lambda port, service: current() and self.append_result(port, service, hosts[0])
+            self.scanner = scanner
+            if not self.scanning:
+                return  # Stopped before the scanner existed; a later Stop cancels it and scan() keeps that
+            # Concurrency budget; the adaptive controller finds the usable level within it
+            scanner.scan(num_threads=500, callback=callback,
+                         progress_callback=lambda *progress: current() and self.update_progress(*progress))
             
-            if self.scanning:
+            matrix = scanner.state_matrix
+            if matrix is not None and current():
+                # Closed and filtered ports go in as one batch per host and state
+                for host in matrix.hosts:
+                    for state in (PORT_CLOSED, PORT_FILTERED):
+                        ports = matrix.ports(host, state)
+                        if ports:
+                            self.result_queue.put([(host, port, state, '', '') for port in ports])
+            
+            if current():
                 self.scan_duration = (datetime.now() - self.scan_start_time).total_seconds()
-                self.root.after(0, self.scan_complete, len(results))
+                self.root.after(0, self.scan_complete, scanner)
         except Exception as e:
-            self.root.after(0, self.scan_error, str(e))
+            if self.scanner is scanner:
+                self.root.after(0, self.scan_error, str(e))
     
-    def scan_complete(self, num_open_ports):
+    def scan_complete(self, scanner):
         """Handle scan completion"""
+        if self.scanner is not scanner or not self.scanning:
+            return  # Stopped, or superseded by a newer scan, before this ran on the Tk thread
+        num_open_ports = len(scanner.open_ports)
         self.progress.config(value=100)
-        self.eta_label.config(text=f"Scan complete! Scanned {self.total_ports} ports in {self.scan_duration:.2f}s")
+        self.eta_label.config(text=f"Scan complete! Scanned {self.total_ports} ports in {self.scan_duration:.2f}s "
+                                   f"({scanner.state_summary()})")
         self.scan_button.config(state=tk.NORMAL)
         self.stop_button.config(state=tk.DISABLED)
+        self.pause_button.config(state=tk.DISABLED, text="Pause")
         self.scanning = False
         
+        down_hosts = getattr(scanner, 'down_hosts', None)
+        skipped = f", skipped {len(down_hosts)} host(s) that look down" if down_hosts else ""
         if num_open_ports > 0:
-            self.update_status(f"Scan complete - Found {num_open_ports} open port(s)")
+            self.update_status(f"Scan complete - Found {num_open_ports} open port(s){skipped}")
         else:
-            self.update_status("Scan complete - No open ports found")
-            self.results_text.insert(tk.END, "No open ports found in the specified range.\n")
+            self.update_status(f"Scan complete - No open ports found{skipped}")
     
     def scan_error(self, error_msg):
         """Handle scan errors"""
@@ -490,6 +4273,7 @@ class PortScannerGUI:
         self.eta_label.config(text="")
         self.scan_button.config(state=tk.NORMAL)
         self.stop_button.config(state=tk.DISABLED)
+        self.pause_button.config(state=tk.DISABLED, text="Pause")
         self.scanning = False
         self.update_status("Scan failed")
         messagebox.showerror("Scan Error", f"An error occurred: {error_msg}")
@@ -497,12 +4281,29 @@ class PortScannerGUI:
     def stop_scan(self):
         """Stop the scanning process"""
         self.scanning = False
+        if self.scanner:
+            # Aborts in-flight probes so the scan thread exits promptly
+            self.scanner.cancel()
         self.progress.config(value=0)
         self.eta_label.config(text="")
         self.scan_button.config(state=tk.NORMAL)
         self.stop_button.config(state=tk.DISABLED)
+        self.pause_button.config(state=tk.DISABLED, text="Pause")
         self.update_status("Scan stopped by user")
     
+    def toggle_pause(self):
+        """Pause or resume the running scan"""
+        if not self.scanner:
+            return
+        if self.scanner.control.is_paused:
+            self.scanner.resume()
+            self.pause_button.config(text="Pause")
+            self.update_status("Scan resumed")
+        else:
+            self.scanner.pause()
+            self.pause_button.config(text="Resume")
+            self.update_status("Scan paused")
+    
     def export_results(self):
         """Export scan results to a file"""
         if not self.scanner or not self.scanner.open_ports:
@@ -550,7 +4351,8 @@ class PortScannerGUI:
                     }
                     
                     # Export the results
-                    self.scanner.export_results(filename, file_format, scan_metadata)
+                    self.scanner.export_results(filename, file_format, scan_metadata,
+                                                include_closed=self.scanner.state_matrix is not None)
                     
                     messagebox.showinfo("Export Successful", f"Results exported successfully to:\n{filename}")
                     self.update_status(f"Results exported to {filename}")
@@ -568,8 +4370,375 @@ class PortScannerGUI:
         format_window.geometry(f"+{x}+{y}")
 
 
-def main():
+class ResultsTable(ttk.Frame):
+    """
+    Virtualized results table
+    
+    Rows live in a ResultView; the Treeview only ever holds the rows that fit on
+    screen, and the scrollbar is driven by hand over the full row count.
+    """
+    
+    COLUMNS = ('Host', 'Port', 'State', 'Service', 'Details')
+    ROW_HEIGHT = 20
+    
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+        
+        self.model = ResultView(sort_keys={0: self._host_key})
+        self.open_rows = {}  # (host, port) -> row, so details arriving later can fill it in
+        self.offset = 0
+        self.visible_rows = 20
+        self.follow = True  # Keep the newest rows in view until the user scrolls or sorts
+        
+        self.tree = ttk.Treeview(self, columns=self.COLUMNS, show='headings', height=self.visible_rows)
+        for index, column in enumerate(self.COLUMNS):
+            self.tree.heading(column, text=column, command=functools.partial(self.sort_by, index))
+            self.tree.column(column, width=80 if column in ('Port', 'State') else 160, anchor=tk.W)
+        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        
+        self.tree.bind('<Configure>', self._on_resize)
+        self.tree.bind('<MouseWheel>', lambda event: self.scroll(-1 if event.delta > 0 else 1) or 'break')
+        self.tree.bind('<Button-4>', lambda event: self.scroll(-1) or 'break')
+        self.tree.bind('<Button-5>', lambda event: self.scroll(1) or 'break')
+    
+    @staticmethod
+    def _host_key(host):
+        try:
+            return (0, struct.unpack('!I', socket.inet_aton(host))[0], '')
+        except (OSError, TypeError):
+            return (1, 0, str(host))
+    
+    def add_rows(self, rows):
+        rows = [list(row) for row in rows]
+        for row in rows:
+            if row[2] == PORT_OPEN:
+                self.open_rows[(row[0], row[1])] = row
+        self.model.add(rows)
+        self.refresh()
+    
+    def add_details(self, details):
+        """Add (host, port, text) banner and TLS details to the Details column"""
+        for host, port, text in details:
+            row = self.open_rows.get((host, port))
+            if row is not None:
+                row[4] = f"{row[4]} | {text}" if row[4] else text
+        self.refresh()
+    
+    def clear(self):
+        self.open_rows = {}
+        self.model.clear()
+        self.offset = 0
+        self.follow = True
+        self.refresh()
+    
+    def set_filter(self, text):
+        self.model.set_filter(text)
+        self.offset = 0
+        self.refresh()
+    
+    def sort_by(self, column):
+        self.model.sort_by(column)
+        self.offset = 0
+        self.follow = False
+        self.refresh()
+    
+    def scroll(self, rows):
+        self.offset += rows
+        self.follow = self.offset + self.visible_rows >= len(self.model)
+        self.refresh()
+    
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == 'moveto':
+            self.offset = int(float(amount) * len(self.model))
+            self.follow = self.offset + self.visible_rows >= len(self.model)
+            self.refresh()
+        elif action == 'scroll':
+            step = self.visible_rows if unit == 'pages' else 1
+            self.scroll(int(amount) * step)
+    
+    def _on_resize(self, event):
+        visible_rows = max(1, (event.height - self.ROW_HEIGHT) // self.ROW_HEIGHT)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self.refresh()
+    
+    def refresh(self):
+        """Redraw just the visible window of rows"""
+        total = len(self.model)
+        last_offset = max(0, total - self.visible_rows)
+        self.offset = last_offset if self.follow else min(max(0, self.offset), last_offset)
+        
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        for row in self.model.window(self.offset, self.visible_rows):
+            self.tree.insert('', tk.END, values=row)
+        
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.visible_rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+
+def _add_stream_arguments(parser):
+    parser.add_argument('--stream', metavar='PATH',
+                        help="Write each open port to this file as it is found ('-' for stdout)")
+    parser.add_argument('--stream-format', choices=ResultStream.FORMATS,
+                        help="Stream record format (default csv for .csv paths, else ndjson)")
+    parser.add_argument('--flush-interval', type=float, default=1.0, help="Seconds between stream flushes")
+
+
+def _open_stream(args, append=False):
+    """Return the ResultStream requested on the command line, or None"""
+    if not args.stream:
+        return None
+    file_format = args.stream_format or ('csv' if args.stream.lower().endswith('.csv') else 'ndjson')
+    return ResultStream(args.stream, file_format, flush_interval=args.flush_interval, append=append)
+
+
+def build_arg_parser():
+    """Build the command line parser; running without a command starts the GUI"""
+    parser = argparse.ArgumentParser(description="IP Port Scanner")
+    commands = parser.add_subparsers(dest='command')
+    
+    scan = commands.add_parser('scan', help="Scan from the command line")
+    scan.add_argument('targets', help="Addresses, CIDR blocks, ranges or hostnames, comma separated")
+    scan.add_argument('--ports', help="Port range, e.g. 1-65535 (default 1-1024, or all ports with --top-ports)")
+    scan.add_argument('--top-ports', type=int, metavar='N',
+                      help="Scan only the N most commonly open ports in the range, most likely first")
+    scan.add_argument('--discovery-ports', type=_parse_port_list, default=4, metavar='N|PORTS',
+                      help="With several targets, probe this many common ports (or these ports, e.g. 22,80,443) "
+                           "per host first and sweep only hosts that answer (default 4)")
+    scan.add_argument('--force-scan', action='store_true', help="Sweep every target, even hosts that look down")
+    scan.add_argument('--engine', default='threads', choices=sorted(SCAN_ENGINES))
+    scan.add_argument('--threads', type=int, default=200, help="Concurrency budget")
+    scan.add_argument('--timeout', type=float, default=0.3)
+    scan.add_argument('--delay', type=float, default=0, help="Seconds between probes")
+    scan.add_argument('--randomize', action='store_true')
+    scan.add_argument('--journal', help="Checkpoint journal for resuming (threads engine only)")
+    scan.add_argument('--output', help="Export results to this file when done")
+    scan.add_argument('--format', default='json', choices=['json', 'csv', 'txt'])
+    _add_stream_arguments(scan)
+    scan.add_argument('--include-closed', action='store_true',
+                      help="Also export closed/filtered ports as compact ranges")
+    scan.add_argument('--state-file', help="Keep every port's state in this memory-mapped file")
+    scan.add_argument('--banners', action='store_true', help="Read the greeting banner of every open port")
+    scan.add_argument('--banner-concurrency', type=int, default=16, help="Parallel banner reads")
+    scan.add_argument('--tls', action='store_true', help="Negotiate TLS on open ports and record their certificates")
+    scan.add_argument('--tls-concurrency', type=int, default=8, help="Parallel TLS handshakes")
+    scan.add_argument('--linger-reset', action='store_true',
+                      help="Close connections to open ports with a RST (SO_LINGER 0) so they leave no TIME_WAIT")
+    scan.add_argument('--dns-concurrency', type=int, default=32, help="Parallel lookups when resolving hostnames")
+    scan.add_argument('--reverse-dns', action='store_true', help="Look up the PTR name of every host with open ports")
+    
+    resume = commands.add_parser('resume', help="Resume an interrupted scan from its journal")
+    resume.add_argument('journal')
+    resume.add_argument('--threads', type=int, default=200, help="Concurrency budget")
+    resume.add_argument('--output', help="Export results to this file when done")
+    resume.add_argument('--format', default='json', choices=['json', 'csv', 'txt'])
+    _add_stream_arguments(resume)
+    
+    coordinator = commands.add_parser('coordinator', help="Lease a scan out to remote workers")
+    coordinator.add_argument('targets', help="Addresses, CIDR blocks or ranges, comma separated")
+    coordinator.add_argument('--ports', default='1-1024', help="Port range, e.g. 1-65535")
+    coordinator.add_argument('--bind', default='127.0.0.1:9700', help="Address to accept workers on")
+    coordinator.add_argument('--timeout', type=float, default=0.3)
+    coordinator.add_argument('--chunk-size', type=int, default=1024)
+    coordinator.add_argument('--lease-timeout', type=float, default=60)
+    coordinator.add_argument('--randomize', action='store_true')
+    coordinator.add_argument('--output', help="Export results to this file when done")
+    coordinator.add_argument('--format', default='json', choices=['json', 'csv', 'txt'])
+    _add_stream_arguments(coordinator)
+    
+    worker = commands.add_parser('worker', help="Scan chunks leased by a coordinator")
+    worker.add_argument('coordinator', help="Coordinator address as host:port")
+    worker.add_argument('--engine', default='selectors', choices=sorted(SCAN_ENGINES))
+    worker.add_argument('--threads', type=int, default=None, help="Concurrency per chunk")
+    return parser
+
+
+def _split_address(address):
+    host, _, port = address.rpartition(':')
+    return host, int(port)
+
+
+def _parse_port_range(ports):
+    start, _, end = ports.partition('-')
+    return int(start), int(end or start)
+
+
+def _parse_port_list(value):
+    """A bare number is a count of common ports; anything else is a comma-separated port list"""
+    if value.isdigit():
+        return int(value)
+    return [int(port) for port in value.split(',') if port.strip()]
+
+
+def _report_file(args):
+    """Where human-readable lines go: stderr when stdout carries the result stream"""
+    return sys.stderr if getattr(args, 'stream', None) == '-' else sys.stdout
+
+
+def _print_result(port, service, host=None, file=None):
+    prefix = f"{host} " if host else ""
+    print(f"{prefix}Port {port}: OPEN - {service}", file=file or sys.stdout, flush=True)
+
+
+def _print_banner(host, port, banner, file=None):
+    print(f"{host} Port {port}: BANNER - {banner}", file=file or sys.stdout, flush=True)
+
+
+def _print_hostname(host, port, name, file=None):
+    print(f"{host}: HOSTNAME - {name}", file=file or sys.stdout, flush=True)
+
+
+def _print_tls(host, port, tls, file=None):
+    print(f"{host} Port {port}: TLS - {format_tls(tls)}", file=file or sys.stdout, flush=True)
+
+
+def _print_progress(scanner):
+    """Return a progress callback redrawing one status line on stderr"""
+    def progress(ports_scanned, total_ports):
+        snapshot = scanner.progress
+        if snapshot is None or snapshot.eta is None:
+            return
+        line = (f"{ports_scanned}/{total_ports} ports | {snapshot.rate:.0f} ports/s | "
+                f"ETA {format_eta(snapshot)}")
+        end = "\n" if ports_scanned >= total_ports else ""
+        print(f"\r{line:<70}", end=end, file=sys.stderr, flush=True)
+    return progress
+
+
+def _run_cli_scan(scanner, num_threads, args):
+    """Run a scan, print hits as they arrive and export when requested"""
+    report = _report_file(args)
+    if isinstance(scanner, MultiTargetScanner):
+        callback = lambda host, port, service: _print_result(port, service, host, file=report)
+    else:
+        callback = lambda port, service: _print_result(port, service, file=report)
+    if scanner.stream and not args.output:
+        # Results live in the stream only, so memory stays flat however many are found
+        scanner.keep_results = False
+    # A live progress line only makes sense on a terminal
+    progress_callback = _print_progress(scanner) if sys.stderr.isatty() else None
+    started = time.time()
+    # Ctrl+C cancels cooperatively so partial results are still printed and exported
+    previous_handler = signal.signal(signal.SIGINT, lambda signum, frame: scanner.cancel())
+    try:
+        scanner.scan(num_threads=num_threads, callback=callback, progress_callback=progress_callback)
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+    duration = time.time() - started
+    if scanner.control.is_cancelled:
+        print(f"Scan cancelled - {len(scanner.remaining_ports)} probe(s) left unscanned", file=sys.stderr)
+    if scanner.stream:
+        scanner.stream.close()
+    found = len(scanner.open_ports) if scanner.keep_results else scanner.state_counts[PORT_OPEN]
+    print(f"Scan complete - {found} open port(s) in {duration:.2f}s", file=sys.stderr)
+    if getattr(scanner, 'down_hosts', None):
+        print(f"Skipped {len(scanner.down_hosts)} host(s) that look down: {', '.join(scanner.down_hosts)}",
+              file=sys.stderr)
+    print(f"Port states: {scanner.state_summary()}", file=sys.stderr)
+    if scanner.port_budget.exhaustions:
+        print(f"Ran out of local ports {scanner.port_budget.exhaustions} time(s); those probes were slowed down "
+              f"and retried (see --linger-reset)", file=sys.stderr)
+    if args.output:
+        scanner.export_results(args.output, args.format, {
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'scan_duration_seconds': round(duration, 2)
+        }, include_closed=getattr(args, 'include_closed', False))
+    if scanner.state_matrix is not None:
+        scanner.state_matrix.close()
+
+
+def run_scan_command(args):
+    """Run a scan from parsed command line arguments"""
+    start_port, end_port = _parse_port_range(args.ports or ('1-65535' if args.top_ports else '1-1024'))
+    resolver = DnsResolver(concurrency=args.dns_concurrency, cache=_dns_resolver.cache)
+    try:
+        hosts = parse_targets(args.targets, resolver)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    options = {'timeout': args.timeout, 'randomize': args.randomize, 'scan_delay': args.delay,
+               'record_states': args.include_closed, 'state_file': args.state_file, 'resolver': resolver,
+               'linger_reset': args.linger_reset, 'stream': _open_stream(args)}
+    report = _report_file(args)
+    if args.reverse_dns:
+        options['reverse_dns'] = ReverseDns(resolver, callback=functools.partial(_print_hostname, file=report))
+    if args.banners:
+        options['banner_grabber'] = BannerGrabber(concurrency=args.banner_concurrency,
+                                                  callback=functools.partial(_print_banner, file=report))
+    if args.tls:
+        options['tls_prober'] = TlsProber(concurrency=args.tls_concurrency,
+                                          callback=functools.partial(_print_tls, file=report))
+    if args.top_ports:
+        if args.engine == 'process':
+            raise SystemExit("--top-ports is not supported by the process engine")
+        options['top_ports'] = args.top_ports
+    if args.journal:
+        if args.engine != 'threads':
+            raise SystemExit("--journal is only supported by the threads engine")
+        options['journal'] = args.journal
+    if len(hosts) > 1:
+        scanner = MultiTargetScanner(hosts, start_port, end_port, discovery_ports=args.discovery_ports,
+                                     force_scan=args.force_scan, **options)
+    else:
+        scanner = create_scanner(hosts[0], start_port, end_port, engine=args.engine, **options)
+    _run_cli_scan(scanner, args.threads, args)
+
+
+def run_resume_command(args):
+    """Resume a journaled scan from parsed command line arguments"""
+    scanner = resume_scan(args.journal, stream=_open_stream(args, append=True))
+    print(f"Resuming scan of {scanner.target_ip} ports {scanner.start_port}-{scanner.end_port}", file=sys.stderr)
+    _run_cli_scan(scanner, args.threads, args)
+
+
+def run_coordinator(args):
+    """Run a coordinator from parsed command line arguments"""
+    start_port, end_port = _parse_port_range(args.ports)
+    bind_host, bind_port = _split_address(args.bind)
+    coordinator = ScanCoordinator(args.targets, start_port, end_port, timeout=args.timeout,
+                                  randomize=args.randomize, chunk_size=args.chunk_size,
+                                  lease_timeout=args.lease_timeout, bind_host=bind_host, bind_port=bind_port,
+                                  stream=_open_stream(args))
+    address = coordinator.start()
+    print(f"Coordinator listening on {address[0]}:{address[1]}", file=sys.stderr)
+    started = time.time()
+    report = _report_file(args)
+    results = coordinator.scan(callback=lambda host, port, service: _print_result(port, service, host, file=report))
+    duration = time.time() - started
+    if coordinator.stream:
+        coordinator.stream.close()
+    print(f"Scan complete - {sum(len(p) for p in results.values())} open port(s) in {duration:.2f}s", file=sys.stderr)
+    if args.output:
+        coordinator.export_results(args.output, args.format, {'scan_duration_seconds': round(duration, 2)})
+
+
+def run_worker(args):
+    """Run a worker from parsed command line arguments"""
+    host, port = _split_address(args.coordinator)
+    chunks = ScanWorker(host, port, engine=args.engine, num_threads=args.threads).run()
+    print(f"Worker finished after {chunks} chunk(s)", file=sys.stderr)
+
+
+def main(argv=None):
     """Main application entry point"""
+    args = build_arg_parser().parse_args(argv)
+    if args.command == 'scan':
+        return run_scan_command(args)
+    if args.command == 'resume':
+        return run_resume_command(args)
+    if args.command == 'coordinator':
+        return run_coordinator(args)
+    if args.command == 'worker':
+        return run_worker(args)
+    
     root = tk.Tk()
     app = PortScannerGUI(root)
     root.mainloop()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Test script for the adaptive (AIMD) concurrency controller
+"""
+
+import socket
+import time
+import errno
+import sys
+import os
+
+def test_adaptive_concurrency():
+    """Test AIMD growth, back-off and adaptive scanning"""
+    print("=" * 60)
+    print("IP Port Scanner - Adaptive Concurrency Tests")
+    print("=" * 60)
+    
+    # Add the script directory to path for imports
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, script_dir)
+    
+    # Import scanner components by reading only what's needed
+    scanner_file = os.path.join(script_dir, 'port_scanner.py')
+    with open(scanner_file, 'r') as f:
+        lines = f.readlines()
+    
+    # Extract non-GUI code (imports, constants, scanner classes)
+    scanner_code = []
+    gui_started = False
+    
+    for line in lines:
+        # Skip GUI-related imports
+        if 'import tkinter' in line or 'from tkinter' in line:
+            continue
+        # Stop before GUI class definition
+        if 'class PortScannerGUI:' in line:
+            gui_started = True
+            break
+        if not gui_started:
+            scanner_code.append(line)
+    
+    # Load the scanner code into globals
+    exec(''.join(scanner_code), globals())
+    
+    print("\n1. Testing slow start and additive increase...")
+    controller = ConcurrencyController(ceiling=200, initial=8, window=10)
+    limits = [controller.limit]
+    for _ in range(5):
+        for _ in range(10):
+            controller.acquire()
+            controller.release(errno.ECONNREFUSED)
+        limits.append(controller.limit)
+    if limits == [8, 16, 32, 64, 128, 200]:
+        print(f"  ✓ Limit doubles on healthy windows up to the ceiling: {limits}")
+    else:
+        print(f"  ✗ Unexpected growth: {limits}")
+    
+    print("\n2. Testing back-off on local resource errors...")
+    controller.acquire()
+    controller.release(errno.EMFILE)
+    after_emfile = controller.limit
+    for _ in range(10):
+        controller.acquire()
+        controller.release(0)
+    if after_emfile == 100 and controller.limit == 108:
+        print(f"  ✓ EMFILE halves the limit (200 -> {after_emfile}), then growth is additive ({controller.limit})")
+    else:
+        print(f"  ✗ Expected 100 then 108, got {after_emfile} then {controller.limit}")
+    
+    print("\n3. Testing back-off when timeouts rise above the baseline...")
+    controller = ConcurrencyController(ceiling=200, initial=64, window=10)
+    for code in [errno.EAGAIN] * 5 + [0] * 5:
+        controller.acquire()
+        controller.release(code)
+    baseline_limit = controller.limit
+    for code in [errno.EAGAIN] * 10:
+        controller.acquire()
+        controller.release(code)
+    if baseline_limit == 128 and controller.limit == 64:
+        print(f"  ✓ 50% timeouts set the baseline ({baseline_limit}); a jump to 100% backs off ({controller.limit})")
+    else:
+        print(f"  ✗ Expected 128 then 64, got {baseline_limit} then {controller.limit}")
+    
+    print("\n4. Testing the RLIMIT_NOFILE ceiling...")
+    controller = ConcurrencyController(ceiling=10 ** 9)
+    if controller.ceiling == fd_budget():
+        print(f"  ✓ Ceiling clamped to the file descriptor budget ({controller.ceiling})")
+    else:
+        print(f"  ✗ Ceiling {controller.ceiling} exceeds budget {fd_budget()}")
+    
+    test_ports = [9876, 9877, 9878]
+    server_sockets = []
+    
+    try:
+        for port in test_ports:
+            server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            server_socket.bind(('127.0.0.1', port))
+            server_socket.listen(5)
+            server_sockets.append(server_socket)
+        print(f"\n  Started test servers on ports {test_ports}")
+        
+        print("\n5. Testing adaptive scan...")
+        scanner = PortScanner('127.0.0.1', 9000, 9999, timeout=0.3, adaptive=True)
+        start_time = time.time()
+        results = scanner.scan(num_threads=500)
+        duration = time.time() - start_time
+        if [port for port, _ in results] == test_ports and scanner.ports_scanned == 1000:
+            print(f"  ✓ Adaptive scan found {[port for port, _ in results]} in {duration:.2f}s "
+                  f"(final limit {scanner.controller.limit})")
+        else:
+            print(f"  ✗ Unexpected results {results} after {scanner.ports_scanned} ports")
+        
+        print("\n6. Testing that resource errors are retried, not reported closed...")
+        
+        class FlakyScanner(PortScanner):
+            failures = 0
+            
+            def connect(self, host, port):
+                with self.lock:
+                    if self.failures < 50:
+                        self.failures += 1
+                        return errno.EMFILE
+                return PortScanner.connect(self, host, port)
+        
+        scanner = FlakyScanner('127.0.0.1', 9870, 9885, timeout=0.3, adaptive=True)
+        results = scanner.scan(num_threads=20)
+        if [port for port, _ in results] == test_ports and scanner.ports_scanned == 16:
+            print(f"  ✓ 50 EMFILE failures retried; all ports still found (limit now {scanner.controller.limit})")
+        else:
+            print(f"  ✗ Lost results under EMFILE: {results} after {scanner.ports_scanned} ports")
+        
+    except Exception as e:
+        print(f"  ✗ Error during test: {e}")
+    finally:
+        for server_socket in server_sockets:
+            server_socket.close()
+        print(f"\n  Closed all test servers")
+    
+    print("\n" + "=" * 60)
+    print("Adaptive concurrency tests completed!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    test_adaptive_concurrency()
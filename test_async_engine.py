@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test script for the asyncio scan engine (AsyncPortScanner)
+"""
+
+import socket
+import asyncio
+import time
+import subprocess
+import sys
+import os
+
+def test_async_engine():
+    """Test the asyncio-based scanning engine"""
+    print("=" * 60)
+    print("IP Port Scanner - Asyncio Engine Tests")
+    print("=" * 60)
+    
+    # Add the script directory to path for imports
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, script_dir)
+    
+    # Import scanner components by reading only what's needed
+    scanner_file = os.path.join(script_dir, 'port_scanner.py')
+    with open(scanner_file, 'r') as f:
+        lines = f.readlines()
+    
+    # Extract non-GUI code (imports, constants, scanner classes)
+    scanner_code = []
+    gui_started = False
+    
+    for line in lines:
+        # Skip GUI-related imports
+        if 'import tkinter' in line or 'from tkinter' in line:
+            continue
+        # Stop before GUI class definition
+        if 'class PortScannerGUI:' in line:
+            gui_started = True
+            break
+        if not gui_started:
+            scanner_code.append(line)
+    
+    # Load the scanner code into globals
+    exec(''.join(scanner_code), globals())
+    
+    test_ports = [9876, 9877, 9878]
+    server_sockets = []
+    
+    try:
+        for port in test_ports:
+            server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            server_socket.bind(('127.0.0.1', port))
+            server_socket.listen(5)
+            server_sockets.append(server_socket)
+        print(f"  Started test servers on ports {test_ports}")
+        
+        print("\n1. Testing drop-in scan() with callbacks...")
+        found = []
+        progress_updates = []
+        scanner = AsyncPortScanner('127.0.0.1', 9870, 9885, timeout=0.3)
+        start_time = time.time()
+        results = scanner.scan(
+            callback=lambda port, service: found.append(port),
+            progress_callback=lambda scanned, total: progress_updates.append((scanned, total))
+        )
+        duration = time.time() - start_time
+        found_ports = [port for port, _ in results]
+        
+        if found_ports == test_ports:
+            print(f"  ✓ Found all test ports in {duration:.2f}s: {found_ports}")
+        else:
+            print(f"  ✗ Expected {test_ports}, found {found_ports}")
+        
+        if sorted(found) == test_ports:
+            print(f"  ✓ Result callback fired for every open port")
+        else:
+            print(f"  ✗ Result callback mismatch: {found}")
+        
+        if progress_updates and progress_updates[-1] == (16, 16):
+            print(f"  ✓ Progress callback reached {progress_updates[-1][0]}/{progress_updates[-1][1]}")
+        else:
+            print(f"  ✗ Progress callback ended at {progress_updates[-1:]} (expected (16, 16))")
+        
+        print("\n2. Testing async for iteration...")
+        
+        async def collect():
+            scanner = AsyncPortScanner('127.0.0.1', 9870, 9885, timeout=0.3, randomize=True)
+            return [port async for port, _ in scanner]
+        
+        iterated = asyncio.run(collect())
+        if sorted(iterated) == test_ports:
+            print(f"  ✓ async for yielded all open ports: {sorted(iterated)}")
+        else:
+            print(f"  ✗ async for yielded {iterated}")
+        
+        print("\n3. Testing high concurrency on a wider range...")
+        scanner = AsyncPortScanner('127.0.0.1', 9000, 9999, timeout=0.3, concurrency=1000)
+        start_time = time.time()
+        results = scanner.scan()
+        duration = time.time() - start_time
+        if [port for port, _ in results] == test_ports and scanner.ports_scanned == 1000:
+            print(f"  ✓ Scanned 1000 ports in {duration:.2f}s ({1000 / duration:.0f} ports/s)")
+        else:
+            print(f"  ✗ Unexpected results {results} after {scanner.ports_scanned} ports")
+        
+        print("\n4. Testing a low descriptor limit...")
+        # A child process under ulimit -n 200 that already holds 100 sockets, so connects hit EMFILE
+        child = (
+            "import resource, socket\n"
+            "resource.setrlimit(resource.RLIMIT_NOFILE, (200, 200))\n"
+            "held = [socket.socket() for _ in range(100)]\n"
+            f"exec({''.join(scanner_code)!r})\n"
+            "scanner = AsyncPortScanner('127.0.0.1', 9000, 12000, timeout=0.3)\n"
+            "results = scanner.scan()\n"
+            "print(scanner.ports_scanned, scanner.state_counts['error'], [port for port, _ in results])\n"
+        )
+        output = subprocess.run([sys.executable, '-'], input=child, capture_output=True, text=True, timeout=120)
+        if output.stdout.strip() == f"3001 0 {test_ports}":
+            print("  ✓ 3001 ports scanned under ulimit -n 200 with no errors")
+        else:
+            print(f"  ✗ Child output {output.stdout.strip()!r} {output.stderr.strip()[-200:]!r}")
+        
+    except Exception as e:
+        print(f"  ✗ Error during test: {e}")
+    finally:
+        for server_socket in server_sockets:
+            server_socket.close()
+        print(f"\n  Closed all test servers")
+    
+    print("\n" + "=" * 60)
+    print("Asyncio engine tests completed!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    test_async_engine()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Test script for the pipelined banner-grabbing stage
+"""
+
+import socket
+import threading
+import tempfile
+import json
+import time
+import sys
+import os
+
+def test_banners():
+    """Test banner reads, byte budgets, engine integration and exports"""
+    print("=" * 60)
+    print("IP Port Scanner - Banner Grabbing Tests")
+    print("=" * 60)
+    
+    # Add the script directory to path for imports
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, script_dir)
+    
+    # Import scanner components by reading only what's needed
+    scanner_file = os.path.join(script_dir, 'port_scanner.py')
+    with open(scanner_file, 'r') as f:
+        lines = f.readlines()
+    
+    # Extract non-GUI code (imports, constants, scanner classes)
+    scanner_code = []
+    gui_started = False
+    
+    for line in lines:
+        # Skip GUI-related imports
+        if 'import tkinter' in line or 'from tkinter' in line:
+            continue
+        # Stop before GUI class definition
+        if 'class PortScannerGUI:' in line:
+            gui_started = True
+            break
+        if not gui_started:
+            scanner_code.append(line)
+    
+    # Load the scanner code into globals
+    exec(''.join(scanner_code), globals())
+    
+    test_ports = [9876, 9877, 9878]
+    greetings = {9876: b"SSH-2.0-TestServer_1.0\r\n", 9877: None, 9878: b"x" * 5000}
+    server_sockets = []
+    work_dir = tempfile.mkdtemp()
+    
+    def serve(server_socket, greeting):
+        # Greet every connection (or stay silent) and hang up shortly after
+        while True:
+            try:
+                conn, _ = server_socket.accept()
+            except OSError:
+                return
+            try:
+                if greeting:
+                    conn.sendall(greeting)
+                time.sleep(0.05)
+            except OSError:
+                pass
+            finally:
+                conn.close()
+    
+    try:
+        for port in test_ports:
+            server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            server_socket.bind(('127.0.0.1', port))
+            server_socket.listen(128)
+            server_sockets.append(server_socket)
+            thread = threading.Thread(target=serve, args=(server_socket, greetings[port]))
+            thread.daemon = True
+            thread.start()
+        print(f"  Started test servers on ports {test_ports}")
+        
+        print("\n1. Testing banner reads...")
+        grabber = BannerGrabber(max_bytes=64, read_timeout=0.3)
+        buffer = bytearray(grabber.max_bytes)
+        ssh = grabber.grab('127.0.0.1', 9876, buffer)
+        silent = grabber.grab('127.0.0.1', 9877, buffer)
+        flood = grabber.grab('127.0.0.1', 9878, buffer)
+        closed = grabber.grab('127.0.0.1', 9885, buffer)
+        if ssh == 'SSH-2.0-TestServer_1.0' and silent == '' and closed == '':
+            print(f"  ✓ Read {ssh!r}; silent and closed ports give no banner")
+        else:
+            print(f"  ✗ Banners {ssh!r}, {silent!r}, {closed!r}")
+        if flood == 'x' * 64:
+            print("  ✓ A 5000-byte greeting stops at the 64-byte budget")
+        else:
+            print(f"  ✗ Flood banner is {len(flood)} characters")
+        
+        print("\n2. Testing the stage runs alongside the sweep...")
+        found = []
+        grabber = BannerGrabber(concurrency=2, read_timeout=0.3,
+                                callback=lambda host, port, banner: found.append((port, time.monotonic())))
+        scanner = PortScanner('127.0.0.1', 9870, 9885, timeout=0.3, banner_grabber=grabber)
+        hits = []
+        results = scanner.scan(num_threads=10, callback=lambda port, service: hits.append((port, time.monotonic())))
+        if [port for port, _ in results] == test_ports and scanner.banner('127.0.0.1', 9876) == ssh:
+            print(f"  ✓ scan() returned once banners were in: {dict(grabber.banners)[('127.0.0.1', 9876)]!r}")
+        else:
+            print(f"  ✗ Results {results}, banners {grabber.banners}")
+        if len(grabber.threads) == 2 and sorted(port for port, _ in found) == [9876, 9878]:
+            print("  ✓ Two grabbing threads; callback fired for both greeting ports")
+        else:
+            print(f"  ✗ {len(grabber.threads)} threads, callbacks {found}")
+        first_hit = min(when for _, when in hits)
+        if all(when > first_hit for _, when in found):
+            print("  ✓ Banners arrive after the hits that triggered them")
+        else:
+            print(f"  ✗ Hit/banner order {hits} {found}")
+        grabber.close()
+        
+        print("\n3. Testing other engines and multiple targets...")
+        for engine in ('asyncio', 'selectors', 'process'):
+            grabber = BannerGrabber(read_timeout=0.3)
+            scanner = create_scanner('127.0.0.1', 9870, 9885, engine=engine, timeout=0.3, banner_grabber=grabber)
+            scanner.scan()
+            if scanner.banner('127.0.0.1', 9876) == ssh:
+                print(f"  ✓ {engine}: banner grabbed")
+            else:
+                print(f"  ✗ {engine}: banners {grabber.banners}")
+            grabber.close()
+        grabber = BannerGrabber(read_timeout=0.3)
+        scanner = MultiTargetScanner('127.0.0.1-2', 9870, 9885, timeout=0.3, banner_grabber=grabber)
+        scanner.scan(num_threads=20)
+        if scanner.banner('127.0.0.1', 9876) == ssh and scanner.banner('127.0.0.2', 9876) == '':
+            print("  ✓ Multi-target banners are keyed by host")
+        else:
+            print(f"  ✗ Multi-target banners {grabber.banners}")
+        
+        print("\n4. Testing banners in every export format...")
+        contents = {}
+        for file_format in ('json', 'csv', 'txt'):
+            path = os.path.join(work_dir, f'multi.{file_format}')
+            scanner.export_results(path, file_format)
+            with open(path) as f:
+                contents[file_format] = f.read()
+        data = json.loads(contents['json'])
+        entries = {entry['port']: entry for entry in data['results']['127.0.0.1']}
+        if entries[9876].get('banner') == ssh and 'banner' not in entries[9877]:
+            print("  ✓ JSON entries carry a banner only when one was read")
+        else:
+            print(f"  ✗ JSON entries {entries}")
+        if 'Host,Port,Service,Banner' in contents['csv'] and f'127.0.0.1,9876,Unknown Service,{ssh}' in contents['csv']:
+            print("  ✓ CSV has a Banner column")
+        else:
+            print(f"  ✗ CSV:\n{contents['csv']}")
+        if f'Port  9876: OPEN - Unknown Service [{ssh}]' in contents['txt']:
+            print("  ✓ Text export shows the banner next to the port")
+        else:
+            print(f"  ✗ Text:\n{contents['txt']}")
+        path = os.path.join(work_dir, 'plain.csv')
+        plain = PortScanner('127.0.0.1', 9876, 9876, timeout=0.3)
+        plain.scan()
+        plain.export_results(path, 'csv')
+        with open(path) as f:
+            if 'Port,Service\n' in f.read():
+                print("  ✓ Without a banner stage the CSV layout is unchanged")
+            else:
+                print("  ✗ Plain CSV layout changed")
+        grabber.close()
+        
+        print("\n5. Testing cancel drops queued grabs...")
+        grabber = BannerGrabber(concurrency=1, read_timeout=0.3)
+        for _ in range(10):
+            grabber.submit('127.0.0.1', 9877)
+        grabber.cancel()
+        started = time.time()
+        grabber.wait()
+        elapsed = time.time() - started
+        grabber.close()
+        if elapsed < 0.6:
+            print(f"  ✓ Ten queued silent grabs settled in {elapsed:.2f}s after cancel")
+        else:
+            print(f"  ✗ Waited {elapsed:.2f}s after cancel")
+        
+        print("\n6. Testing a failing callback does not hang the scan...")
+        def broken_callback(host, port, banner):
+            raise RuntimeError("callback failed")
+        grabber = BannerGrabber(concurrency=1, read_timeout=0.3, callback=broken_callback)
+        scanner = PortScanner('127.0.0.1', 9870, 9885, timeout=0.3, banner_grabber=grabber)
+        thread = threading.Thread(target=scanner.scan, kwargs={'num_threads': 10})
+        thread.daemon = True
+        thread.start()
+        thread.join(10)
+        if not thread.is_alive() and sorted(port for _, port in grabber.errors) == [9876, 9878]:
+            print(f"  ✓ scan() returned; {len(grabber.errors)} callback errors kept in errors")
+        else:
+            print(f"  ✗ scan() still running: {thread.is_alive()}, errors {grabber.errors}")
+        if grabber.threads[0].is_alive():
+            print("  ✓ The stage thread survived both errors")
+        else:
+            print("  ✗ The stage thread died")
+        grabber.close()
+        
+    except Exception as e:
+        print(f"  ✗ Error during test: {e}")
+    finally:
+        for server_socket in server_sockets:
+            server_socket.close()
+        for name in os.listdir(work_dir):
+            os.remove(os.path.join(work_dir, name))
+        os.rmdir(work_dir)
+        print(f"\n  Closed all test servers")
+    
+    print("\n" + "=" * 60)
+    print("Banner grabbing tests completed!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    test_banners()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Test script for cooperative cancellation and pause/resume
+"""
+
+import socket
+import threading
+import time
+import sys
+import os
+
+def test_cancellation():
+    """Test cancelling, pausing and resuming scans on each engine"""
+    print("=" * 60)
+    print("IP Port Scanner - Cancellation Tests")
+    print("=" * 60)
+    
+    # Add the script directory to path for imports
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, script_dir)
+    
+    # Import scanner components by reading only what's needed
+    scanner_file = os.path.join(script_dir, 'port_scanner.py')
+    with open(scanner_file, 'r') as f:
+        lines = f.readlines()
+    
+    # Extract non-GUI code (imports, constants, scanner classes)
+    scanner_code = []
+    gui_started = False
+    
+    for line in lines:
+        # Skip GUI-related imports
+        if 'import tkinter' in line or 'from tkinter' in line:
+            continue
+        # Stop before GUI class definition
+        if 'class PortScannerGUI:' in line:
+            gui_started = True
+            break
+        if not gui_started:
+            scanner_code.append(line)
+    
+    # Load the scanner code into globals
+    exec(''.join(scanner_code), globals())
+    
+    test_ports = [9876, 9877]
+    server_sockets = []
+    
+    def after(delay, action):
+        timer = threading.Timer(delay, action)
+        timer.start()
+        return timer
+    
+    try:
+        for port in test_ports:
+            server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            server_socket.bind(('127.0.0.1', port))
+            server_socket.listen(5)
+            server_sockets.append(server_socket)
+        print(f"  Started test servers on ports {test_ports}")
+        
+        # A listener with a full accept backlog leaves further connects hanging
+        blackhole = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        blackhole.bind(('127.0.0.1', 0))
+        blackhole.listen(0)
+        blackhole_port = blackhole.getsockname()[1]
+        filler = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        filler.connect(('127.0.0.1', blackhole_port))
+        server_sockets.extend([blackhole, filler])
+        
+        print("\n1. Testing cancel mid-scan and continuing...")
+        scanner = PortScanner('127.0.0.1', 9870, 9885, timeout=0.3, scan_delay=0.05)
+        after(0.2, scanner.cancel)
+        started = time.time()
+        results = scanner.scan(num_threads=2)
+        elapsed = time.time() - started
+        remaining = len(scanner.remaining_ports)
+        if scanner.control.is_cancelled and remaining and scanner.ports_scanned + remaining == 16:
+            print(f"  ✓ Cancelled after {elapsed:.2f}s: {scanner.ports_scanned} scanned, {remaining} remaining")
+        else:
+            print(f"  ✗ Scanned {scanner.ports_scanned}, remaining {scanner.remaining_ports}")
+        found = []
+        results = scanner.continue_scan(num_threads=2, callback=lambda port, service: found.append(port))
+        if [port for port, _ in results] == test_ports and scanner.ports_scanned == 16 and not scanner.remaining_ports:
+            print(f"  ✓ continue_scan finished the remaining ports; results {[port for port, _ in results]}")
+        else:
+            print(f"  ✗ After continuing: results {results}, scanned {scanner.ports_scanned}")
+        
+        print("\n2. Testing pause and resume...")
+        scanner = PortScanner('127.0.0.1', 9870, 9885, timeout=0.3, scan_delay=0.05)
+        snapshots = []
+        after(0.15, scanner.pause)
+        after(0.3, lambda: snapshots.append(scanner.ports_scanned))
+        after(0.6, lambda: snapshots.append(scanner.ports_scanned))
+        after(0.65, scanner.resume)
+        results = scanner.scan(num_threads=2)
+        if len(snapshots) == 2 and snapshots[0] == snapshots[1] < 16:
+            print(f"  ✓ No probes while paused (held at {snapshots[0]} of 16)")
+        else:
+            print(f"  ✗ Progress while paused: {snapshots}")
+        if [port for port, _ in results] == test_ports and scanner.ports_scanned == 16:
+            print("  ✓ Scan completed after resume")
+        else:
+            print(f"  ✗ Results after resume {results}")
+        
+        print("\n3. Testing that cancel aborts blocked connects...")
+        scanner = PortScanner('127.0.0.1', blackhole_port, blackhole_port, timeout=5)
+        after(0.2, scanner.cancel)
+        started = time.time()
+        scanner.scan(num_threads=1)
+        elapsed = time.time() - started
+        if elapsed < 1 and scanner.remaining_ports == [blackhole_port]:
+            print(f"  ✓ 5s connect aborted after {elapsed:.2f}s and returned as remaining work")
+        else:
+            print(f"  ✗ Took {elapsed:.2f}s, remaining {scanner.remaining_ports}")
+        
+        print("\n4. Testing cancel on the selectors engine...")
+        scanner = SelectorPortScanner('127.0.0.1', blackhole_port, blackhole_port, timeout=5)
+        after(0.2, scanner.cancel)
+        started = time.time()
+        scanner.scan()
+        elapsed = time.time() - started
+        if elapsed < 1 and scanner.remaining_ports == [blackhole_port]:
+            print(f"  ✓ Pending connect abandoned after {elapsed:.2f}s")
+        else:
+            print(f"  ✗ Took {elapsed:.2f}s, remaining {scanner.remaining_ports}")
+        
+        print("\n5. Testing cancel on the asyncio engine...")
+        scanner = AsyncPortScanner('127.0.0.1', 9870, 9885, timeout=0.3, concurrency=1,
+                                   rate_limiter=RateLimiter(global_rate=20))
+        after(0.2, scanner.cancel)
+        scanner.scan()
+        remaining = len(scanner.remaining_ports)
+        if remaining and scanner.ports_scanned + remaining == 16:
+            print(f"  ✓ Stopped with {scanner.ports_scanned} scanned and {remaining} remaining")
+        else:
+            print(f"  ✗ Scanned {scanner.ports_scanned}, remaining {scanner.remaining_ports}")
+        
+        print("\n6. Testing multi-target cancel and continue...")
+        scanner = MultiTargetScanner('127.0.0.1-2', 9870, 9879, timeout=0.3, scan_delay=0.05)
+        after(0.2, scanner.cancel)
+        scanner.scan(num_threads=2)
+        remaining = len(scanner.remaining_ports)
+        if remaining and scanner.ports_scanned + remaining == 20:
+            print(f"  ✓ Stopped with {remaining} (host, port) probes remaining")
+        else:
+            print(f"  ✗ Scanned {scanner.ports_scanned}, remaining {scanner.remaining_ports}")
+        results = scanner.continue_scan(num_threads=4)
+        if scanner.ports_scanned == 20 and [port for port, _ in results.get('127.0.0.1', [])] == test_ports:
+            print("  ✓ continue_scan completed every host")
+        else:
+            print(f"  ✗ After continuing: scanned {scanner.ports_scanned}, results {results}")
+        
+        print("\n7. Testing cancel wakes workers waiting on the rate limiter...")
+        scanner = PortScanner('127.0.0.1', 9000, 9999, timeout=0.3, scan_delay=0.2)
+        after(0.5, scanner.cancel)
+        started = time.time()
+        scanner.scan(num_threads=100)
+        elapsed = time.time() - started
+        remaining = len(scanner.remaining_ports)
+        if elapsed < 1.0 and scanner.ports_scanned + remaining == 1000:
+            print(f"  ✓ 100 paced workers stopped {elapsed - 0.5:.2f}s after cancel, {remaining} ports remaining")
+        else:
+            print(f"  ✗ Returned after {elapsed:.2f}s; scanned {scanner.ports_scanned}, remaining {remaining}")
+        
+        print("\n8. Testing a cancel issued before scan() starts is kept...")
+        scanner = PortScanner('127.0.0.1', 9870, 9885, timeout=0.3)
+        scanner.cancel()
+        scanner.scan(num_threads=4)
+        early = (scanner.ports_scanned, len(scanner.remaining_ports))
+        scanner.scan(num_threads=4)
+        rerun = (scanner.ports_scanned, sorted(port for port, _ in scanner.open_ports))
+        if early == (0, 16) and rerun == (16, test_ports):
+            print("  ✓ Cancelled scanner stopped before probing; the next scan() re-armed it")
+        else:
+            print(f"  ✗ Early cancel gave {early}, rerun gave {rerun}")
+        
+    except Exception as e:
+        print(f"  ✗ Error during test: {e}")
+    finally:
+        for server_socket in server_sockets:
+            server_socket.close()
+        print(f"\n  Closed all test servers")
+    
+    print("\n" + "=" * 60)
+    print("Cancellation tests completed!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    test_cancellation()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test script for distributed coordinator/worker scanning
+"""
+
+import socket
+import time
+import json
+import threading
+import sys
+import os
+
+def test_distributed():
+    """Test lease handling and result merging between a coordinator and workers"""
+    print("=" * 60)
+    print("IP Port Scanner - Distributed Scanning Tests")
+    print("=" * 60)
+    
+    # Add the script directory to path for imports
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, script_dir)
+    
+    # Import scanner components by reading only what's needed
+    scanner_file = os.path.join(script_dir, 'port_scanner.py')
+    with open(scanner_file, 'r') as f:
+        lines = f.readlines()
+    
+    # Extract non-GUI code (imports, constants, scanner classes)
+    scanner_code = []
+    gui_started = False
+    
+    for line in lines:
+        # Skip GUI-related imports
+        if 'import tkinter' in line or 'from tkinter' in line:
+            continue
+        # Stop before GUI class definition
+        if 'class PortScannerGUI:' in line:
+            gui_started = True
+            break
+        if not gui_started:
+            scanner_code.append(line)
+    
+    # Load the scanner code into globals
+    exec(''.join(scanner_code), globals())
+    
+    test_servers = [('127.0.0.1', 9876), ('127.0.0.1', 12001), ('127.0.0.2', 9878)]
+    server_sockets = []
+    
+    def start_workers(address, count):
+        workers = []
+        for _ in range(count):
+            worker = ScanWorker(address[0], address[1], engine='selectors')
+            thread = threading.Thread(target=worker.run)
+            thread.daemon = True
+            thread.start()
+            workers.append((worker, thread))
+        return workers
+    
+    try:
+        for host, port in test_servers:
+            server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            server_socket.bind((host, port))
+            server_socket.listen(5)
+            server_sockets.append(server_socket)
+        print(f"  Started test servers on {test_servers}")
+        
+        print("\n1. Testing a scan shared by several local workers...")
+        found = []
+        progress_updates = []
+        coordinator = ScanCoordinator('127.0.0.1-2', 9000, 12999, timeout=0.3, chunk_size=500)
+        address = coordinator.start()
+        workers = start_workers(address, 3)
+        start_time = time.time()
+        results = coordinator.scan(
+            callback=lambda host, port, service: found.append((host, port)),
+            progress_callback=lambda scanned, total: progress_updates.append((scanned, total))
+        )
+        duration = time.time() - start_time
+        for _, thread in workers:
+            thread.join(2)
+        
+        got = sorted((host, port) for host, ports in results.items() for port, _ in ports)
+        if got == sorted(test_servers) and sorted(found) == sorted(test_servers):
+            print(f"  ✓ Merged results from all workers in {duration:.2f}s: {got}")
+        else:
+            print(f"  ✗ Expected {sorted(test_servers)}, got {got}")
+        
+        chunk_counts = [worker.chunks_scanned for worker, _ in workers]
+        if sum(chunk_counts) == 16 and all(not thread.is_alive() for _, thread in workers):
+            print(f"  ✓ 16 chunks split across workers {chunk_counts}; all workers exited")
+        else:
+            print(f"  ✗ Unexpected chunk distribution {chunk_counts}")
+        
+        if progress_updates and progress_updates[-1] == (8000, 8000):
+            print(f"  ✓ Progress reached {progress_updates[-1][0]}/{progress_updates[-1][1]}")
+        else:
+            print(f"  ✗ Progress ended at {progress_updates[-1:]}")
+        
+        print("\n2. Testing re-issue of leases from dead and stalled workers...")
+        coordinator = ScanCoordinator('127.0.0.1', 9870, 9879, timeout=0.3, chunk_size=5, lease_timeout=0.5)
+        address = coordinator.start()
+        
+        # One worker takes a lease and disconnects, another takes a lease and stalls
+        dead = socket.create_connection(address)
+        dead.sendall(b'{"type": "lease"}\n')
+        dead_lease = json.loads(dead.makefile('rb').readline())
+        dead.close()
+        stalled = socket.create_connection(address)
+        stalled.sendall(b'{"type": "lease"}\n')
+        stalled_lease = json.loads(stalled.makefile('rb').readline())
+        
+        result_holder = []
+        scan_thread = threading.Thread(target=lambda: result_holder.append(coordinator.scan()))
+        scan_thread.start()
+        workers = start_workers(address, 1)
+        scan_thread.join(5)
+        stalled.close()
+        
+        if result_holder and [port for port, _ in result_holder[0].get('127.0.0.1', [])] == [9876]:
+            print(f"  ✓ Leases {dead_lease['lease_id']} and {stalled_lease['lease_id']} were re-issued and completed")
+        else:
+            print(f"  ✗ Scan did not complete after worker failures: {result_holder}")
+        
+    except Exception as e:
+        print(f"  ✗ Error during test: {e}")
+    finally:
+        for server_socket in server_sockets:
+            server_socket.close()
+        print(f"\n  Closed all test servers")
+    
+    print("\n" + "=" * 60)
+    print("Distributed scanning tests completed!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    test_distributed()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Test script for bulk DNS resolution and the TTL cache
+"""
+
+import socket
+import time
+import sys
+import os
+
+def test_dns():
+    """Test hostname targets, bulk resolution, TTL expiry and background PTR lookups"""
+    print("=" * 60)
+    print("IP Port Scanner - DNS Resolution Tests")
+    print("=" * 60)
+    
+    # Add the script directory to path for imports
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, script_dir)
+    
+    # Import scanner components by reading only what's needed
+    scanner_file = os.path.join(script_dir, 'port_scanner.py')
+    with open(scanner_file, 'r') as f:
+        lines = f.readlines()
+    
+    # Extract non-GUI code (imports, constants, scanner classes)
+    scanner_code = []
+    gui_started = False
+    
+    for line in lines:
+        # Skip GUI-related imports
+        if 'import tkinter' in line or 'from tkinter' in line:
+            continue
+        # Stop before GUI class definition
+        if 'class PortScannerGUI:' in line:
+            gui_started = True
+            break
+        if not gui_started:
+            scanner_code.append(line)
+    
+    # Load the scanner code into globals
+    exec(''.join(scanner_code), globals())
+    
+    test_ports = [9876, 9877]
+    server_sockets = []
+    
+    # Stub resolver standing in for DNS: inventory names map into 127.0.0.0/8
+    zone = {f"host{i}.lab.test": f"127.0.0.{i + 1}" for i in range(40)}
+    queries = []
+    
+    def stub_forward(name):
+        queries.append(name)
+        time.sleep(0.1)
+        if name not in zone:
+            raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+        return [zone[name]]
+    
+    def stub_reverse(address):
+        time.sleep(0.5)
+        return f"ptr-{address.replace('.', '-')}.lab.test"
+    
+    try:
+        for port in test_ports:
+            server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            server_socket.bind(('127.0.0.1', port))
+            server_socket.listen(128)
+            server_sockets.append(server_socket)
+        print(f"  Started test servers on ports {test_ports}")
+        
+        print("\n1. Testing hostnames are told apart from addresses and ranges...")
+        cases = {'localhost': True, 'host1.lab.test': True, 'web-01.example.com': True, '10.0.0.1': False,
+                 '10.0.0.1-20': False, '10.0.0.0/24': False, '-bad.example': False}
+        wrong = [token for token, expected in cases.items() if is_hostname(token) != expected]
+        if not wrong:
+            print(f"  ✓ {len(cases)} tokens classified correctly")
+        else:
+            print(f"  ✗ Misclassified {wrong}")
+        
+        print("\n2. Testing bulk resolution runs in parallel...")
+        resolver = DnsResolver(concurrency=20, forward=stub_forward, reverse=stub_reverse)
+        started = time.time()
+        hosts = parse_targets(', '.join(zone) + ', 10.0.0.1', resolver)
+        elapsed = time.time() - started
+        if hosts == list(zone.values()) + ['10.0.0.1'] and elapsed < 1.0:
+            print(f"  ✓ {len(zone)} names resolved in {elapsed:.2f}s (serially {len(zone) * 0.1:.1f}s)")
+        else:
+            print(f"  ✗ Hosts {hosts[:3]}... in {elapsed:.2f}s")
+        
+        print("\n3. Testing the cache is shared across scans...")
+        count = len(queries)
+        started = time.time()
+        parse_targets(list(zone), resolver)
+        if len(queries) == count and time.time() - started < 0.05:
+            print(f"  ✓ Second batch answered from the cache ({len(resolver.cache)} entries)")
+        else:
+            print(f"  ✗ {len(queries) - count} repeated queries")
+        
+        print("\n4. Testing answers and failures expire...")
+        now = [0.0]
+        cache = DnsCache(ttl=60, negative_ttl=5, clock=lambda: now[0])
+        resolver_ttl = DnsResolver(cache=cache, forward=stub_forward)
+        queries.clear()
+        resolver_ttl.resolve('host1.lab.test')
+        missing = resolver_ttl.resolve('missing.lab.test')
+        now[0] = 10
+        resolver_ttl.resolve('host1.lab.test')
+        resolver_ttl.resolve('missing.lab.test')
+        now[0] = 61
+        resolver_ttl.resolve('host1.lab.test')
+        if missing == [] and queries == ['host1.lab.test', 'missing.lab.test', 'missing.lab.test', 'host1.lab.test']:
+            print("  ✓ Negative answer re-queried after 5s, positive answer after 60s")
+        else:
+            print(f"  ✗ Queries {queries}")
+        try:
+            parse_targets('host1.lab.test, missing.lab.test', resolver_ttl)
+            print("  ✗ Should have raised ValueError for an unresolvable name")
+        except ValueError as e:
+            print(f"  ✓ Correctly raised ValueError: {e}")
+        
+        print("\n5. Testing a hosts-file name through the system resolver...")
+        scanner = PortScanner('localhost', 9870, 9885, timeout=0.3)
+        results = scanner.scan(num_threads=10)
+        if scanner.target_ip == '127.0.0.1' and [port for port, _ in results] == test_ports:
+            print(f"  ✓ localhost scanned as {scanner.target_ip}, labelled '{scanner.hostname('127.0.0.1')}'")
+        else:
+            print(f"  ✗ Target {scanner.target_ip}, results {results}")
+        
+        print("\n6. Testing PTR lookups run beside the probes...")
+        reverse = ReverseDns(resolver)
+        scanner = MultiTargetScanner(['host0.lab.test', 'host1.lab.test'], 9870, 9885, timeout=0.3,
+                                     resolver=resolver, reverse_dns=reverse)
+        found = []
+        scanner.scan(num_threads=10, callback=lambda host, port, service: found.append((time.time(), port)))
+        finished = time.time()
+        first_hit = min(at for at, _ in found)
+        if reverse.hostnames == {'127.0.0.1': 'ptr-127-0-0-1.lab.test'} and first_hit < finished - 0.3:
+            print(f"  ✓ Both hits found before the 0.5s PTR lookup finished; named {reverse.hostnames}")
+        else:
+            print(f"  ✗ Hostnames {reverse.hostnames}, first hit {finished - first_hit:.2f}s before the end")
+        if scanner.hostname('127.0.0.2') == 'host1.lab.test':
+            print("  ✓ Hosts without a PTR name keep the name they were given")
+        else:
+            print(f"  ✗ 127.0.0.2 named {scanner.hostname('127.0.0.2')!r}")
+        
+    except Exception as e:
+        print(f"  ✗ Error during test: {e}")
+    finally:
+        for server_socket in server_sockets:
+            server_socket.close()
+        print(f"\n  Closed all test servers")
+    
+    print("\n" + "=" * 60)
+    print("DNS resolution tests completed!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    test_dns()
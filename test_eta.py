@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Test script for the EWMA-based ETA estimator
+"""
+
+import socket
+import threading
+import time
+import sys
+import os
+
+def test_eta():
+    """Test rate smoothing, confidence bounds and in-flight tails"""
+    print("=" * 60)
+    print("IP Port Scanner - ETA Estimator Tests")
+    print("=" * 60)
+    
+    # Add the script directory to path for imports
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, script_dir)
+    
+    # Import scanner components by reading only what's needed
+    scanner_file = os.path.join(script_dir, 'port_scanner.py')
+    with open(scanner_file, 'r') as f:
+        lines = f.readlines()
+    
+    # Extract non-GUI code (imports, constants, scanner classes)
+    scanner_code = []
+    gui_started = False
+    
+    for line in lines:
+        # Skip GUI-related imports
+        if 'import tkinter' in line or 'from tkinter' in line:
+            continue
+        # Stop before GUI class definition
+        if 'class PortScannerGUI:' in line:
+            gui_started = True
+            break
+        if not gui_started:
+            scanner_code.append(line)
+    
+    # Load the scanner code into globals
+    exec(''.join(scanner_code), globals())
+    
+    test_ports = [9876, 9877]
+    server_sockets = []
+    
+    try:
+        for port in test_ports:
+            server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            server_socket.bind(('127.0.0.1', port))
+            server_socket.listen(128)
+            server_sockets.append(server_socket)
+        print(f"  Started test servers on ports {test_ports}")
+        
+        print("\n1. Testing the estimate follows a change in throughput...")
+        # 10s at 1000 ports/s, then a filtered tail at 10 ports/s for 15s
+        estimator = EtaEstimator(half_life=1.0)
+        scanned = 0
+        for tick in range(251):
+            now = tick * 0.1
+            estimator.update(now, scanned)
+            scanned += 100 if now < 10 else 1
+        remaining = 20000 - scanned
+        eta, low, high = estimator.estimate(remaining)
+        cumulative = now / scanned * remaining
+        if abs(estimator.rate - 10) < 1 and abs(eta - remaining / 10) < remaining / 10 * 0.1:
+            print(f"  ✓ Rate settled at {estimator.rate:.1f} ports/s; ETA {eta:.0f}s "
+                  f"(cumulative average said {cumulative:.0f}s)")
+        else:
+            print(f"  ✗ Rate {estimator.rate:.1f}, ETA {eta:.0f}s")
+        
+        print("\n2. Testing confidence bounds...")
+        estimator = EtaEstimator(half_life=1.0)
+        for tick in range(50):
+            estimator.update(tick * 0.1, tick * 10 + (5 if tick % 2 else 0))
+        eta, low, high = estimator.estimate(1000)
+        steady = EtaEstimator(half_life=1.0)
+        for tick in range(50):
+            steady.update(tick * 0.1, tick * 10)
+        steady_eta, steady_low, steady_high = steady.estimate(1000)
+        if low < eta < high and high - low > steady_high - steady_low and abs(steady_high - steady_low) < 0.01:
+            print(f"  ✓ Jittery rate gives {low:.0f}s <= {eta:.0f}s <= {high:.0f}s; steady rate is exact")
+        else:
+            print(f"  ✗ Bounds ({low}, {eta}, {high}), steady ({steady_low}, {steady_eta}, {steady_high})")
+        
+        print("\n3. Testing in-flight probes and edge cases...")
+        tail = steady.estimate(40, in_flight=40, timeout=3.0)
+        queued = steady.estimate(140, in_flight=40, timeout=3.0)
+        expected = [(0.4, 0.0, 3.0), (1.4, 1.0, 4.0)]
+        if all(abs(a - b) < 0.01 for got, want in zip((tail, queued), expected) for a, b in zip(got, want)):
+            print(f"  ✓ In-flight tail bounded by the timeout: 40 left -> {tail[0]:.1f}s (max {tail[2]:.1f}s), "
+                  f"140 left -> {queued[0]:.1f}s (max {queued[2]:.1f}s)")
+        else:
+            print(f"  ✗ Tail {tail}, queued {queued}")
+        stalled = EtaEstimator()
+        stalled.update(0.0, 100)
+        if stalled.estimate(10) is None:
+            stalled.update(1.0, 100)
+            eta, low, high = stalled.estimate(10, in_flight=2, timeout=1.0)
+            if eta == high == float('inf') and stalled.estimate(0) == (0.0, 0.0, 0.0):
+                print("  ✓ No estimate before a rate, unbounded while stalled, zero when done")
+            else:
+                print(f"  ✗ Stalled estimate {(eta, low, high)}")
+        else:
+            print(f"  ✗ Estimate from a single sample: {stalled.estimate(10)}")
+        
+        print("\n4. Testing formatting...")
+        snapshot = ProgressSnapshot(50, 100, 0, 10.0, 5.0, 65.0, 50.0, 90.0)
+        formatted = [format_duration(45), format_duration(200), format_duration(7500), format_duration(float('inf')),
+                     format_eta(snapshot)]
+        if formatted == ['45s', '3m 20s', '2h 5m', 'unknown', '1m 5s (50s-1m 30s)']:
+            print(f"  ✓ {formatted}")
+        else:
+            print(f"  ✗ {formatted}")
+        
+        print("\n5. Testing scanners publish the ETA in their progress snapshots...")
+        scanner = PortScanner('127.0.0.1', 9800, 9899, timeout=0.3, scan_delay=0.01, progress_interval=0.05)
+        etas = []
+        scanner.scan(num_threads=2, progress_callback=lambda scanned, total: etas.append(scanner.progress.eta))
+        estimates = [eta for eta in etas if eta is not None]
+        if estimates and estimates[-1] == 0.0 and all(eta >= 0 for eta in estimates) and len(estimates) > 2:
+            print(f"  ✓ {len(estimates)} snapshots carried an ETA, ending at {estimates[-1]}")
+        else:
+            print(f"  ✗ ETAs {etas}")
+        
+        print("\n6. Testing the ETA counts in-flight probes under the other engines...")
+        # A full accept queue drops further SYNs, so probes of these ports wait out their timeout
+        for port in range(9900, 9910):
+            server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            server_socket.bind(('127.0.0.1', port))
+            server_socket.listen(0)
+            server_sockets.append(server_socket)
+            for _ in range(2):
+                client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                client.setblocking(False)
+                client.connect_ex(('127.0.0.1', port))
+                server_sockets.append(client)
+        time.sleep(0.2)
+        for engine in ('selectors', 'asyncio', 'process'):
+            scanner = create_scanner('127.0.0.1', 9800, 9909, engine=engine, timeout=1.5, progress_interval=0.05)
+            thread = threading.Thread(target=scanner.scan)
+            thread.start()
+            deadline = time.time() + 1.0
+            while scanner.ports_scanned < 100 and time.time() < deadline:
+                time.sleep(0.02)
+            time.sleep(0.2)
+            in_flight, snapshot = scanner.probes_in_flight(), scanner.progress
+            thread.join()
+            if in_flight == 10 and snapshot and snapshot.eta_high is not None and snapshot.eta_high <= 1.5:
+                print(f"  ✓ {engine}: 10 probes in flight, ETA {snapshot.eta:.2f}s (at most {snapshot.eta_high:.2f}s)")
+            else:
+                print(f"  ✗ {engine}: {in_flight} probes in flight, snapshot {snapshot}")
+        
+    except Exception as e:
+        print(f"  ✗ Error during test: {e}")
+    finally:
+        for server_socket in server_sockets:
+            server_socket.close()
+        print(f"\n  Closed all test servers")
+    
+    print("\n" + "=" * 60)
+    print("ETA estimator tests completed!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    test_eta()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Test script for ephemeral port budgeting and TIME_WAIT handling
+"""
+
+import socket
+import time
+import tempfile
+import threading
+import sys
+import os
+
+def test_port_budget():
+    """Test the ephemeral port budget, EADDRNOTAVAIL retries and SO_LINGER 0 closes"""
+    print("=" * 60)
+    print("IP Port Scanner - Ephemeral Port Budget Tests")
+    print("=" * 60)
+    
+    # Add the script directory to path for imports
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, script_dir)
+    
+    # Import scanner components by reading only what's needed
+    scanner_file = os.path.join(script_dir, 'port_scanner.py')
+    with open(scanner_file, 'r') as f:
+        lines = f.readlines()
+    
+    # Extract non-GUI code (imports, constants, scanner classes)
+    scanner_code = []
+    gui_started = False
+    
+    for line in lines:
+        # Skip GUI-related imports
+        if 'import tkinter' in line or 'from tkinter' in line:
+            continue
+        # Stop before GUI class definition
+        if 'class PortScannerGUI:' in line:
+            gui_started = True
+            break
+        if not gui_started:
+            scanner_code.append(line)
+    
+    # Load the scanner code into globals
+    exec(''.join(scanner_code), globals())
+    
+    test_ports = [9876, 9877]
+    server_sockets = []
+    real_socket = socket.socket
+    
+    def time_wait_count(port):
+        # Local sockets in TIME_WAIT (state 06) towards 127.0.0.1:port
+        with open('/proc/net/tcp') as f:
+            return sum(1 for line in f.readlines()[1:]
+                       if line.split()[2] == f"0100007F:{port:04X}" and line.split()[3] == '06')
+    
+    def settled_time_wait_count(port):
+        # Connections the server closes late still move into TIME_WAIT; wait for the count to stop changing
+        count = time_wait_count(port)
+        for _ in range(20):
+            time.sleep(0.1)
+            previous, count = count, time_wait_count(port)
+            if count == previous:
+                break
+        return count
+    
+    try:
+        for port in test_ports:
+            server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            server_socket.bind(('127.0.0.1', port))
+            server_socket.listen(128)
+            server_sockets.append(server_socket)
+        print(f"  Started test servers on ports {test_ports}")
+        
+        print("\n1. Testing the ephemeral range is read from the kernel...")
+        with tempfile.NamedTemporaryFile('w', suffix='.range', delete=False) as f:
+            f.write("32768\t60999\n")
+        low_high = ephemeral_port_range(f.name)
+        os.remove(f.name)
+        if low_high == (32768, 60999) and ephemeral_port_range('/nonexistent') == (49152, 65535):
+            print(f"  ✓ Parsed {low_high}; falls back to the IANA range; this host uses {ephemeral_port_range()}")
+        else:
+            print(f"  ✗ Parsed {low_high}")
+        
+        print("\n2. Testing probes are held while TIME_WAIT fills the budget...")
+        now = [0.0]
+        budget = EphemeralPortBudget(port_range=(1000, 1009), time_wait=60, reserve=0.1, clock=lambda: now[0])
+        for i in range(budget.limit):
+            now[0] = i
+            budget.record_close()
+        held_delay = budget.delay()
+        now[0] = 60
+        if budget.limit == 9 and held_delay == 52 and budget.delay() == 0 and budget.held == 8:
+            print(f"  ✓ Full budget of {budget.limit} waits {held_delay:.0f}s for the oldest port; free once it expires")
+        else:
+            print(f"  ✗ Limit {budget.limit}, delay {held_delay}, then {budget.delay()}, held {budget.held}")
+        
+        print("\n3. Testing exhaustion backs off exponentially...")
+        backoffs = []
+        for _ in range(8):
+            budget.exhausted()
+            budget.exhausted()  # Failing alongside the first one, inside the same hold
+            backoffs.append(budget.backoff)
+            now[0] += budget.backoff
+        budget.recovered()
+        if backoffs[:3] == [0.05, 0.1, 0.2] and backoffs[-1] == budget.max_backoff and budget.backoff == 0:
+            print(f"  ✓ Backoff {backoffs[0]}s doubling to {backoffs[-1]}s once per hold, reset after a successful "
+                  f"connect")
+        else:
+            print(f"  ✗ Backoffs {backoffs}, after recovery {budget.backoff}")
+        
+        print("\n4. Testing EADDRNOTAVAIL is retried rather than reported...")
+        for engine in ('threads', 'selectors', 'asyncio'):
+            failures = [4]
+            
+            class ExhaustedSocket(real_socket):
+                # The first connects find no free local port
+                def connect_ex(self, address):
+                    if failures[0] > 0:
+                        failures[0] -= 1
+                        return errno.EADDRNOTAVAIL
+                    return super().connect_ex(address)
+                
+                def connect(self, address):
+                    code = self.connect_ex(address)
+                    if code:
+                        raise OSError(code, os.strerror(code))
+            
+            budget = EphemeralPortBudget()
+            socket.socket = ExhaustedSocket
+            try:
+                scanner = create_scanner('127.0.0.1', 9870, 9885, engine=engine, timeout=0.3, port_budget=budget)
+                results = scanner.scan(num_threads=4)
+            finally:
+                socket.socket = real_socket
+            if [port for port, _ in results] == test_ports and scanner.state_counts[PORT_ERROR] == 0 \
+                    and budget.exhaustions > 0 and scanner.ports_scanned == 16:
+                print(f"  ✓ {engine}: {budget.exhaustions} exhaustion(s) retried, all 16 ports classified")
+            else:
+                print(f"  ✗ {engine}: results {results}, states {scanner.state_counts}, "
+                      f"{budget.exhaustions} exhaustion(s)")
+        
+        print("\n5. Testing SO_LINGER 0 leaves no TIME_WAIT behind...")
+        if not os.path.exists('/proc/net/tcp'):
+            print("  ✓ Skipped: /proc/net/tcp not available")
+        else:
+            # The side that closes first gets the TIME_WAIT, so this server only closes once the client has
+            closer = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            closer.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            closer.bind(('127.0.0.1', 9878))
+            closer.listen(128)
+            server_sockets.append(closer)
+            
+            def close_after_client():
+                while True:
+                    try:
+                        conn, _ = closer.accept()
+                    except OSError:
+                        return
+                    try:
+                        conn.recv(1)  # b'' on the client's FIN, ECONNRESET on its RST
+                    except OSError:
+                        pass
+                    conn.close()
+            threading.Thread(target=close_after_client, daemon=True).start()
+            counts = {}
+            for linger_reset in (False, True):
+                budget = EphemeralPortBudget()
+                scanner = PortScanner('127.0.0.1', 9878, 9878, timeout=0.3, port_budget=budget,
+                                      linger_reset=linger_reset)
+                before = settled_time_wait_count(9878)
+                for _ in range(20):
+                    scanner.scan_port(9878)
+                counts[linger_reset] = (before, settled_time_wait_count(9878), budget.held)
+            # Loopback may recycle TIME_WAIT ports (tcp_tw_reuse), so compare totals rather than deltas
+            graceful, reset = counts[False], counts[True]
+            if graceful[1] > graceful[0] and graceful[1] >= 20 and graceful[2] == 20 and reset[1] <= reset[0] \
+                    and reset[2] == 0:
+                print(f"  ✓ Graceful closes left {graceful[1]} TIME_WAIT entries (20 budgeted); "
+                      f"linger_reset added none")
+            else:
+                print(f"  ✗ (TIME_WAIT before, after, budgeted) without/with linger_reset: {counts}")
+        
+        print("\n6. Testing process shards split the port budget...")
+        
+        class BudgetReporter:
+            """Reports its shard's port budget limit as its only hit"""
+            
+            def __init__(self, target_ip, start_port, end_port, port_budget=None, **options):
+                self.port_budget = port_budget
+                self.state_counts = {state: 0 for state in PORT_STATES}
+            
+            def probes_in_flight(self):
+                return 0
+            
+            def scan(self, callback=None, progress_callback=None):
+                callback(self.port_budget.limit, '')
+        
+        SCAN_ENGINES['budget'] = BudgetReporter
+        try:
+            parent = EphemeralPortBudget(port_range=(40000, 40999), reserve=0)
+            for _ in range(100):
+                parent.record_close()
+            scanner = ProcessPortScanner('127.0.0.1', 1, 4, processes=4, shard_engine='budget', port_budget=parent)
+            scanner.scan()
+        finally:
+            del SCAN_ENGINES['budget']
+        limits = [limit for limit, _ in scanner.open_ports]
+        if limits == [225] * 4:
+            print(f"  ✓ 4 shards share the 900 free ports: {limits}")
+        else:
+            print(f"  ✗ Shard budget limits {limits} (expected 4 x 225)")
+        
+    except Exception as e:
+        print(f"  ✗ Error during test: {e}")
+    finally:
+        socket.socket = real_socket
+        for server_socket in server_sockets:
+            server_socket.close()
+        print(f"\n  Closed all test servers")
+    
+    print("\n" + "=" * 60)
+    print("Ephemeral port budget tests completed!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    test_port_budget()
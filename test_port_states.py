@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Test script for open/closed/filtered port state classification
+"""
+
+import socket
+import json
+import tempfile
+import errno
+import sys
+import os
+
+def test_port_states():
+    """Test errno classification, per-state statistics and compact exports"""
+    print("=" * 60)
+    print("IP Port Scanner - Port State Tests")
+    print("=" * 60)
+    
+    # Add the script directory to path for imports
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, script_dir)
+    
+    # Import scanner components by reading only what's needed
+    scanner_file = os.path.join(script_dir, 'port_scanner.py')
+    with open(scanner_file, 'r') as f:
+        lines = f.readlines()
+    
+    # Extract non-GUI code (imports, constants, scanner classes)
+    scanner_code = []
+    gui_started = False
+    
+    for line in lines:
+        # Skip GUI-related imports
+        if 'import tkinter' in line or 'from tkinter' in line:
+            continue
+        # Stop before GUI class definition
+        if 'class PortScannerGUI:' in line:
+            gui_started = True
+            break
+        if not gui_started:
+            scanner_code.append(line)
+    
+    # Load the scanner code into globals
+    exec(''.join(scanner_code), globals())
+    
+    test_ports = [9876, 9877]
+    server_sockets = []
+    export_dir = tempfile.mkdtemp()
+    
+    try:
+        for port in test_ports:
+            server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            server_socket.bind(('127.0.0.1', port))
+            server_socket.listen(128)
+            server_sockets.append(server_socket)
+        print(f"  Started test servers on ports {test_ports}")
+        
+        # A listener with a full accept backlog never answers further connects
+        blackhole = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        blackhole.bind(('127.0.0.1', 9880))
+        blackhole.listen(0)
+        filler = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        filler.connect(('127.0.0.1', 9880))
+        server_sockets.extend([blackhole, filler])
+        
+        print("\n1. Testing errno classification...")
+        expected = {
+            0: PORT_OPEN,
+            errno.ECONNREFUSED: PORT_CLOSED,
+            errno.EAGAIN: PORT_FILTERED,
+            errno.ETIMEDOUT: PORT_FILTERED,
+            errno.EHOSTUNREACH: PORT_FILTERED,
+            errno.ENETUNREACH: PORT_FILTERED,
+            errno.EMFILE: PORT_ERROR,
+        }
+        wrong = {code: classify_errno(code) for code, state in expected.items() if classify_errno(code) != state}
+        if not wrong:
+            print(f"  ✓ {len(expected)} errnos map to the expected states")
+        else:
+            print(f"  ✗ Misclassified: {wrong}")
+        
+        print("\n2. Testing probe_port keeps errno and time to answer...")
+        scanner = PortScanner('127.0.0.1', 9870, 9880, timeout=0.3)
+        probes = {port: scanner.probe_port(port) for port in (9876, 9870, 9880)}
+        if (probes[9876].state, probes[9870].state, probes[9880].state) == (PORT_OPEN, PORT_CLOSED, PORT_FILTERED):
+            print("  ✓ Open, closed (RST) and filtered (no answer) told apart")
+        else:
+            print(f"  ✗ Probes {probes}")
+        if probes[9870].errno == errno.ECONNREFUSED and probes[9880].elapsed >= 0.25 > probes[9870].elapsed:
+            print(f"  ✓ Filtered probe took {probes[9880].elapsed:.2f}s, closed took {probes[9870].elapsed:.4f}s")
+        else:
+            print(f"  ✗ Timings {probes}")
+        
+        print("\n3. Testing per-state counts on every engine...")
+        for engine in ('threads', 'asyncio', 'selectors', 'process'):
+            scanner = create_scanner('127.0.0.1', 9870, 9880, engine=engine, timeout=0.3)
+            scanner.scan()
+            counts = scanner.state_counts
+            if counts == {PORT_OPEN: 2, PORT_CLOSED: 8, PORT_FILTERED: 1, PORT_ERROR: 0}:
+                print(f"  ✓ {engine}: {scanner.state_summary()}")
+            else:
+                print(f"  ✗ {engine}: {counts}")
+        if scanner.state_seconds[PORT_FILTERED] == 0:
+            print("  ✓ Process engine reports counts only, without time per state")
+        else:
+            print(f"  ✗ Process engine state seconds {scanner.state_seconds}")
+        
+        print("\n4. Testing time spent per state...")
+        scanner = PortScanner('127.0.0.1', 9870, 9880, timeout=0.3)
+        scanner.scan(num_threads=4)
+        if scanner.state_seconds[PORT_FILTERED] > scanner.state_seconds[PORT_CLOSED]:
+            print(f"  ✓ One filtered port cost {scanner.state_seconds[PORT_FILTERED]:.2f}s, "
+                  f"eight closed ports {scanner.state_seconds[PORT_CLOSED]:.4f}s")
+        else:
+            print(f"  ✗ State seconds {scanner.state_seconds}")
+        
+        print("\n5. Testing compact closed/filtered exports...")
+        scanner = PortScanner('127.0.0.1', 9870, 9880, timeout=0.3, record_states=True)
+        scanner.scan(num_threads=4)
+        path = os.path.join(export_dir, 'states.json')
+        scanner.export_results(path, 'json', include_closed=True)
+        with open(path) as f:
+            data = json.load(f)
+        if data['port_states'] == {PORT_CLOSED: '9870-9875,9878-9879', PORT_FILTERED: '9880'}:
+            print(f"  ✓ JSON port_states: {data['port_states']}")
+        else:
+            print(f"  ✗ JSON port_states: {data.get('port_states')}")
+        if data['scan_info']['state_counts'][PORT_CLOSED] == 8:
+            print("  ✓ JSON scan_info carries per-state counts")
+        else:
+            print(f"  ✗ scan_info {data['scan_info']}")
+        path = os.path.join(export_dir, 'states.csv')
+        scanner.export_results(path, 'csv', include_closed=True)
+        with open(path) as f:
+            content = f.read()
+        if 'closed,"9870-9875,9878-9879"' in content and 'filtered,9880' in content:
+            print("  ✓ CSV lists closed/filtered ranges")
+        else:
+            print(f"  ✗ CSV content: {content}")
+        path = os.path.join(export_dir, 'states.txt')
+        scanner.export_results(path, 'txt', include_closed=True)
+        with open(path) as f:
+            content = f.read()
+        if 'CLOSED: 9870-9875,9878-9879' in content and '2 open, 8 closed, 1 filtered, 0 error' in content:
+            print("  ✓ TXT lists per-state counts and ranges")
+        else:
+            print(f"  ✗ TXT content: {content}")
+        path = os.path.join(export_dir, 'plain.json')
+        scanner.export_results(path, 'json')
+        with open(path) as f:
+            if 'port_states' not in json.load(f):
+                print("  ✓ Closed ports left out unless requested")
+            else:
+                print("  ✗ port_states exported without include_closed")
+        
+        print("\n6. Testing multi-target state exports...")
+        scanner = MultiTargetScanner('127.0.0.1-2', 9875, 9877, timeout=0.3, record_states=True)
+        scanner.scan(num_threads=4)
+        path = os.path.join(export_dir, 'multi.json')
+        scanner.export_results(path, 'json', include_closed=True)
+        with open(path) as f:
+            data = json.load(f)
+        if data['port_states'] == {'127.0.0.1': {PORT_CLOSED: '9875'}, '127.0.0.2': {PORT_CLOSED: '9875-9877'}}:
+            print(f"  ✓ Per-host port_states: {data['port_states']}")
+        else:
+            print(f"  ✗ Per-host port_states: {data.get('port_states')}")
+        
+    except Exception as e:
+        print(f"  ✗ Error during test: {e}")
+    finally:
+        for server_socket in server_sockets:
+            server_socket.close()
+        for name in os.listdir(export_dir):
+            os.remove(os.path.join(export_dir, name))
+        os.rmdir(export_dir)
+        print(f"\n  Closed all test servers")
+    
+    print("\n" + "=" * 60)
+    print("Port state tests completed!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    test_port_states()
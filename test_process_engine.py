@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Test script for multi-process sharded scanning (ProcessPortScanner)
+"""
+
+import socket
+import time
+import sys
+import os
+
+def test_process_engine():
+    """Test the process-sharded scanning engine"""
+    print("=" * 60)
+    print("IP Port Scanner - Process Engine Tests")
+    print("=" * 60)
+    
+    # Add the script directory to path for imports
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, script_dir)
+    
+    # Import scanner components by reading only what's needed
+    scanner_file = os.path.join(script_dir, 'port_scanner.py')
+    with open(scanner_file, 'r') as f:
+        lines = f.readlines()
+    
+    # Extract non-GUI code (imports, constants, scanner classes)
+    scanner_code = []
+    gui_started = False
+    
+    for line in lines:
+        # Skip GUI-related imports
+        if 'import tkinter' in line or 'from tkinter' in line:
+            continue
+        # Stop before GUI class definition
+        if 'class PortScannerGUI:' in line:
+            gui_started = True
+            break
+        if not gui_started:
+            scanner_code.append(line)
+    
+    # Load the scanner code into globals
+    exec(''.join(scanner_code), globals())
+    
+    print("\n1. Testing CPU detection and sharding...")
+    cpus = usable_cpu_count()
+    print(f"  ✓ Usable CPUs (affinity/cgroup aware): {cpus}")
+    
+    scanner = ProcessPortScanner('127.0.0.1', 1, 65535, processes=4)
+    shards = scanner._build_shards()
+    covered = sum(end - start + 1 for start, end in shards)
+    contiguous = all(shards[i][1] + 1 == shards[i + 1][0] for i in range(len(shards) - 1))
+    if len(shards) == 4 and covered == 65535 and contiguous and shards[0][0] == 1 and shards[-1][1] == 65535:
+        print(f"  ✓ Port range split into {len(shards)} contiguous shards: {shards}")
+    else:
+        print(f"  ✗ Bad shard layout: {shards}")
+    
+    scanner = ProcessPortScanner('127.0.0.1', 80, 82, processes=8)
+    if len(scanner._build_shards()) == 3:
+        print("  ✓ Never creates more shards than ports")
+    else:
+        print(f"  ✗ Expected 3 shards, got {scanner._build_shards()}")
+    
+    test_ports = [9876, 9877, 9878, 12001]
+    server_sockets = []
+    
+    try:
+        for port in test_ports:
+            server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            server_socket.bind(('127.0.0.1', port))
+            server_socket.listen(5)
+            server_sockets.append(server_socket)
+        print(f"\n  Started test servers on ports {test_ports}")
+        
+        print("\n2. Testing sharded scan with live callbacks...")
+        found = []
+        progress_updates = []
+        scanner = create_scanner('127.0.0.1', 9000, 12999, engine='process', processes=4, timeout=0.3)
+        start_time = time.time()
+        results = scanner.scan(
+            callback=lambda port, service: found.append(port),
+            progress_callback=lambda scanned, total: progress_updates.append((scanned, total))
+        )
+        duration = time.time() - start_time
+        found_ports = [port for port, _ in results]
+        
+        if found_ports == test_ports and sorted(found) == test_ports:
+            print(f"  ✓ Found all test ports across shards in {duration:.2f}s: {found_ports}")
+        else:
+            print(f"  ✗ Expected {test_ports}, found {found_ports} (callbacks: {found})")
+        
+        if progress_updates and progress_updates[-1] == (4000, 4000):
+            print(f"  ✓ Combined progress reached {progress_updates[-1][0]}/{progress_updates[-1][1]}")
+        else:
+            print(f"  ✗ Combined progress ended at {progress_updates[-1:]} (expected (4000, 4000))")
+        
+        print("\n3. Testing threaded shards...")
+        scanner = ProcessPortScanner('127.0.0.1', 9870, 9885, processes=2, shard_engine='threads', timeout=0.3)
+        results = scanner.scan(num_threads=20)
+        if [port for port, _ in results] == test_ports[:3]:
+            print(f"  ✓ Threaded shards found {[port for port, _ in results]}")
+        else:
+            print(f"  ✗ Threaded shards found {results}")
+        
+        class BurstEngine:
+            """Reports every port in its range as open from eight threads at once"""
+            
+            def __init__(self, target_ip, start_port, end_port, **options):
+                self.ports = range(start_port, end_port + 1)
+                self.state_counts = {state: 0 for state in PORT_STATES}
+            
+            def scan(self, callback=None, progress_callback=None):
+                workers = [threading.Thread(target=lambda i=i: [callback(port, '') for port in self.ports[i::8]])
+                           for i in range(8)]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+        
+        SCAN_ENGINES['burst'] = BurstEngine
+        hits_offset = 4 * SHARD_COUNTERS
+        shm = shared_memory.SharedMemory(create=True, size=hits_offset + 2 * 60000)
+        try:
+            _scan_shard(shm, 1, 0, hits_offset, '127.0.0.1', 1, 60000, {'engine': 'burst', 'num_threads': None})
+            count = shm.buf[:4 * SHARD_COUNTERS].cast('I')[1]
+            reported = sorted(shm.buf[hits_offset:].cast('H').tolist())
+        finally:
+            del SCAN_ENGINES['burst']
+            shm.close()
+            shm.unlink()
+        if count == 60000 and reported == list(range(1, 60001)):
+            print("  ✓ 60000 hits from concurrent shard threads each got their own slot")
+        else:
+            print(f"  ✗ Shard recorded {count} hits, {len(set(reported))} distinct ports")
+        
+    except Exception as e:
+        print(f"  ✗ Error during test: {e}")
+    finally:
+        for server_socket in server_sockets:
+            server_socket.close()
+        print(f"\n  Closed all test servers")
+    
+    print("\n" + "=" * 60)
+    print("Process engine tests completed!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    test_process_engine()
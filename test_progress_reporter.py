@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test script for rate-limited progress reporting
+"""
+
+import socket
+import time
+import sys
+import os
+
+def test_progress_reporter():
+    """Test progress snapshots, rate limiting and final delivery"""
+    print("=" * 60)
+    print("IP Port Scanner - Progress Reporter Tests")
+    print("=" * 60)
+    
+    # Add the script directory to path for imports
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, script_dir)
+    
+    # Import scanner components by reading only what's needed
+    scanner_file = os.path.join(script_dir, 'port_scanner.py')
+    with open(scanner_file, 'r') as f:
+        lines = f.readlines()
+    
+    # Extract non-GUI code (imports, constants, scanner classes)
+    scanner_code = []
+    gui_started = False
+    
+    for line in lines:
+        # Skip GUI-related imports
+        if 'import tkinter' in line or 'from tkinter' in line:
+            continue
+        # Stop before GUI class definition
+        if 'class PortScannerGUI:' in line:
+            gui_started = True
+            break
+        if not gui_started:
+            scanner_code.append(line)
+    
+    # Load the scanner code into globals
+    exec(''.join(scanner_code), globals())
+    
+    test_ports = [9876, 9877]
+    server_sockets = []
+    
+    class FakeScanner:
+        def __init__(self):
+            self.ports_scanned = 0
+            self.total_ports = 1000
+            self.state_counts = {PORT_OPEN: 0}
+            self.progress = None
+    
+    try:
+        for port in test_ports:
+            server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            server_socket.bind(('127.0.0.1', port))
+            server_socket.listen(128)
+            server_sockets.append(server_socket)
+        print(f"  Started test servers on ports {test_ports}")
+        
+        print("\n1. Testing snapshots carry throughput and hits...")
+        fake = FakeScanner()
+        calls = []
+        reporter = ProgressReporter(fake, lambda scanned, total: calls.append(scanned), interval=0.05).start()
+        for _ in range(10):
+            fake.ports_scanned += 50
+            time.sleep(0.02)
+        fake.state_counts[PORT_OPEN] = 3
+        time.sleep(0.1)
+        snapshot = fake.progress
+        if snapshot and snapshot.ports_scanned == 500 and snapshot.open_ports == 3 and snapshot.rate > 0:
+            print(f"  ✓ Snapshot: {snapshot.ports_scanned}/{snapshot.total_ports}, {snapshot.rate:.0f} ports/s, "
+                  f"{snapshot.open_ports} open after {snapshot.elapsed:.2f}s")
+        else:
+            print(f"  ✗ Snapshot {snapshot}")
+        
+        print("\n2. Testing unchanged counters are not re-reported...")
+        count = len(calls)
+        time.sleep(0.2)
+        if len(calls) == count and calls == sorted(set(calls)):
+            print(f"  ✓ {count} callbacks, none repeated while idle")
+        else:
+            print(f"  ✗ Callbacks {calls}")
+        fake.ports_scanned = 1000
+        reporter.stop()
+        if calls[-1] == 1000:
+            print("  ✓ stop() delivers the final counters")
+        else:
+            print(f"  ✗ Last callback {calls[-1]}")
+        
+        print("\n3. Testing callback cost is proportional to time, not ports...")
+        scanner = PortScanner('127.0.0.1', 1, 20000, timeout=0.3)
+        updates = []
+        started = time.time()
+        results = scanner.scan(num_threads=100,
+                               progress_callback=lambda scanned, total: updates.append((scanned, total)))
+        elapsed = time.time() - started
+        if len(updates) <= elapsed / 0.1 + 2 and updates[-1] == (20000, 20000):
+            print(f"  ✓ {len(updates)} callbacks for 20000 ports in {elapsed:.2f}s")
+        else:
+            print(f"  ✗ {len(updates)} callbacks in {elapsed:.2f}s, last {updates[-1:]}")
+        if scanner.progress.open_ports == len(results) and scanner.progress.ports_scanned == 20000:
+            print(f"  ✓ scanner.progress holds the final snapshot ({scanner.progress.open_ports} open)")
+        else:
+            print(f"  ✗ scanner.progress {scanner.progress}")
+        
+        print("\n4. Testing the reporting interval is configurable...")
+        counts = {}
+        for interval in (0.02, 0.5):
+            scanner = PortScanner('127.0.0.1', 9870, 9885, timeout=0.3, scan_delay=0.02, progress_interval=interval)
+            updates = []
+            scanner.scan(num_threads=4, progress_callback=lambda scanned, total: updates.append(scanned))
+            counts[interval] = len(updates)
+        if counts[0.02] > counts[0.5]:
+            print(f"  ✓ 50 Hz gave {counts[0.02]} updates, 2 Hz gave {counts[0.5]}")
+        else:
+            print(f"  ✗ Update counts {counts}")
+        
+        print("\n5. Testing the other engines report through the reporter...")
+        for engine in ('asyncio', 'selectors', 'process'):
+            scanner = create_scanner('127.0.0.1', 9870, 9885, engine=engine, timeout=0.3)
+            updates = []
+            scanner.scan(progress_callback=lambda scanned, total: updates.append((scanned, total)))
+            if updates and updates[-1] == (16, 16) and scanner.progress.open_ports == 2:
+                print(f"  ✓ {engine}: {len(updates)} update(s), final {updates[-1]}")
+            else:
+                print(f"  ✗ {engine}: updates {updates}, snapshot {scanner.progress}")
+        
+    except Exception as e:
+        print(f"  ✗ Error during test: {e}")
+    finally:
+        for server_socket in server_sockets:
+            server_socket.close()
+        print(f"\n  Closed all test servers")
+    
+    print("\n" + "=" * 60)
+    print("Progress reporter tests completed!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    test_progress_reporter()
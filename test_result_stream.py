@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Test script for streaming results to NDJSON and CSV during the scan
+"""
+
+import socket
+import time
+import json
+import tempfile
+import threading
+import subprocess
+import signal
+import sys
+import os
+
+def test_result_stream():
+    """Test incremental NDJSON/CSV output, flushing, stdout and crash survival"""
+    print("=" * 60)
+    print("IP Port Scanner - Result Stream Tests")
+    print("=" * 60)
+    
+    # Add the script directory to path for imports
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, script_dir)
+    
+    # Import scanner components by reading only what's needed
+    scanner_file = os.path.join(script_dir, 'port_scanner.py')
+    with open(scanner_file, 'r') as f:
+        lines = f.readlines()
+    
+    # Extract non-GUI code (imports, constants, scanner classes)
+    scanner_code = []
+    gui_started = False
+    
+    for line in lines:
+        # Skip GUI-related imports
+        if 'import tkinter' in line or 'from tkinter' in line:
+            continue
+        # Stop before GUI class definition
+        if 'class PortScannerGUI:' in line:
+            gui_started = True
+            break
+        if not gui_started:
+            scanner_code.append(line)
+    
+    # Load the scanner code into globals
+    exec(''.join(scanner_code), globals())
+    
+    stream_dir = tempfile.mkdtemp()
+    test_ports = [9876, 9877]
+    server_sockets = []
+    
+    def read_lines(path):
+        with open(path) as f:
+            return [line for line in f.read().splitlines() if line]
+    
+    try:
+        for port in test_ports:
+            server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            server_socket.bind(('127.0.0.1', port))
+            server_socket.listen(128)
+            server_sockets.append(server_socket)
+        print(f"  Started test servers on ports {test_ports}")
+        
+        print("\n1. Testing NDJSON records reach the file while the scan runs...")
+        path = os.path.join(stream_dir, 'live.ndjson')
+        stream = ResultStream(path, flush_interval=0.1)
+        scanner = PortScanner('127.0.0.1', 9870, 9895, timeout=0.3, scan_delay=0.05, stream=stream)
+        thread = threading.Thread(target=scanner.scan, kwargs={'num_threads': 4})
+        thread.start()
+        seen_during_scan = False
+        while thread.is_alive():
+            if len(read_lines(path)) == 2:
+                seen_during_scan = True
+                break
+            time.sleep(0.02)
+        thread.join()
+        stream.close()
+        records = [json.loads(line) for line in read_lines(path)]
+        if seen_during_scan and sorted(record['port'] for record in records) == test_ports:
+            print(f"  ✓ Both records on disk before the scan finished: {records[0]}")
+        else:
+            print(f"  ✗ Seen during scan: {seen_during_scan}, records {records}")
+        
+        print("\n2. Testing CSV streams from a multi-host scan and appends...")
+        path = os.path.join(stream_dir, 'hosts.csv')
+        for append in (False, True):
+            stream = ResultStream(path, 'csv', append=append)
+            MultiTargetScanner('127.0.0.1-2', 9870, 9885, timeout=0.3, stream=stream).scan(num_threads=10)
+            stream.close()
+        with open(path, newline='') as f:
+            rows = list(csv.reader(f))
+        if rows[0] == list(ResultStream.CSV_COLUMNS) and len(rows) == 5 and \
+                sorted((row[0], row[1]) for row in rows[1:]) == [('127.0.0.1', '9876')] * 2 + [('127.0.0.1', '9877')] * 2:
+            print("  ✓ One header, one row per open port per run")
+        else:
+            print(f"  ✗ Rows {rows}")
+        
+        print("\n3. Testing the buffer stays bounded between flushes...")
+        path = os.path.join(stream_dir, 'bulk.ndjson')
+        stream = ResultStream(path, flush_interval=60, buffer_size=100)
+        largest = 0
+        for i in range(1050):
+            stream.write('10.0.0.1', i + 1, 'Unknown Service')
+            largest = max(largest, len(stream.pending))
+        written = len(read_lines(path))
+        stream.close()
+        if largest < 100 and written == 1000 and len(read_lines(path)) == 1050:
+            print(f"  ✓ At most {largest} records buffered; {written} on disk before close, 1050 after")
+        else:
+            print(f"  ✗ Largest buffer {largest}, {written} written before close")
+        
+        print("\n4. Testing a killed process keeps the results already found...")
+        path = os.path.join(stream_dir, 'killed.ndjson')
+        process = subprocess.Popen([sys.executable, scanner_file, 'scan', '127.0.0.1', '--ports', '9870-9999',
+                                    '--delay', '0.05', '--threads', '4', '--stream', path, '--flush-interval', '0.1'],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.time() + 10
+        while time.time() < deadline and not (os.path.exists(path) and len(read_lines(path)) == 2):
+            time.sleep(0.05)
+        process.send_signal(signal.SIGKILL)
+        process.wait()
+        records = [json.loads(line) for line in read_lines(path)]
+        if process.returncode == -signal.SIGKILL and sorted(record['port'] for record in records) == test_ports:
+            print(f"  ✓ Scan killed mid-run; both records intact")
+        else:
+            print(f"  ✗ Exit {process.returncode}, records {records}")
+        
+        print("\n5. Testing streaming to stdout for piping...")
+        output = subprocess.run([sys.executable, scanner_file, 'scan', '127.0.0.1', '--ports', '9870-9885',
+                                 '--stream', '-', '--stream-format', 'csv'], capture_output=True, text=True, timeout=60)
+        lines = output.stdout.splitlines()
+        if lines[0] == ','.join(ResultStream.CSV_COLUMNS) and sorted(line.split(',')[1] for line in lines[1:]) == ['9876', '9877']:
+            print(f"  ✓ stdout holds only the CSV stream ({len(lines)} lines); summary on stderr")
+        else:
+            print(f"  ✗ stdout {output.stdout!r}, stderr {output.stderr[-200:]!r}")
+        
+        print("\n6. Testing stage output stays off a stdout stream...")
+        greeter = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        greeter.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        greeter.bind(('127.0.0.1', 9879))
+        greeter.listen(128)
+        server_sockets.append(greeter)
+        
+        def greet():
+            while True:
+                try:
+                    conn, _ = greeter.accept()
+                except OSError:
+                    return
+                conn.sendall(b"HELLO\r\n")
+                conn.close()
+        threading.Thread(target=greet, daemon=True).start()
+        output = subprocess.run([sys.executable, scanner_file, 'scan', '127.0.0.1', '--ports', '9870-9885',
+                                 '--stream', '-', '--banners', '--reverse-dns'],
+                                capture_output=True, text=True, timeout=60)
+        try:
+            records = [json.loads(line) for line in output.stdout.splitlines()]
+        except ValueError:
+            records = None
+        if records is not None and sorted(record['port'] for record in records) == test_ports + [9879] and \
+                'BANNER - HELLO' in output.stderr:
+            print(f"  ✓ Every stdout line is a JSON record ({len(records)}); banners went to stderr")
+        else:
+            print(f"  ✗ stdout {output.stdout!r}, stderr {output.stderr[-200:]!r}")
+        
+    except Exception as e:
+        print(f"  ✗ Error during test: {e}")
+    finally:
+        for server_socket in server_sockets:
+            server_socket.close()
+        for name in os.listdir(stream_dir):
+            os.remove(os.path.join(stream_dir, name))
+        os.rmdir(stream_dir)
+        print(f"\n  Closed all test servers")
+    
+    print("\n" + "=" * 60)
+    print("Result stream tests completed!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    test_result_stream()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test script for the virtualized results view model
+"""
+
+import time
+import sys
+import os
+
+def test_results_view():
+    """Test row batching, filtering, sorting and windowing"""
+    print("=" * 60)
+    print("IP Port Scanner - Results View Tests")
+    print("=" * 60)
+    
+    # Add the script directory to path for imports
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, script_dir)
+    
+    # Import scanner components by reading only what's needed
+    scanner_file = os.path.join(script_dir, 'port_scanner.py')
+    with open(scanner_file, 'r') as f:
+        lines = f.readlines()
+    
+    # Extract non-GUI code (imports, constants, scanner classes)
+    scanner_code = []
+    gui_started = False
+    
+    for line in lines:
+        # Skip GUI-related imports
+        if 'import tkinter' in line or 'from tkinter' in line:
+            continue
+        # Stop before GUI class definition
+        if 'class PortScannerGUI:' in line:
+            gui_started = True
+            break
+        if not gui_started:
+            scanner_code.append(line)
+    
+    # Load the scanner code into globals
+    exec(''.join(scanner_code), globals())
+    
+    try:
+        print("\n1. Testing batched adds and windowing...")
+        view = ResultView()
+        view.add([('127.0.0.1', port, PORT_OPEN, 'HTTP') for port in range(1, 11)])
+        view.add([('127.0.0.2', 22, PORT_OPEN, 'SSH')])
+        window = view.window(8, 5)
+        if len(view) == 11 and [row[1] for row in window] == [9, 10, 22]:
+            print(f"  ✓ 11 rows held; window(8, 5) returned the last {len(window)}")
+        else:
+            print(f"  ✗ {len(view)} rows, window {window}")
+        
+        print("\n2. Testing filtering...")
+        view.set_filter('  ssh ')
+        if len(view) == 1 and view.window(0, 10)[0][0] == '127.0.0.2':
+            print("  ✓ Case-insensitive filter matched the single SSH row")
+        else:
+            print(f"  ✗ Filter kept {view.window(0, 10)}")
+        view.add([('127.0.0.3', 2222, PORT_OPEN, 'SSH'), ('127.0.0.3', 80, PORT_OPEN, 'HTTP')])
+        if len(view) == 2 and len(view.rows) == 13:
+            print("  ✓ New rows honour the active filter")
+        else:
+            print(f"  ✗ {len(view)} visible of {len(view.rows)}")
+        view.set_filter('')
+        if len(view) == 13:
+            print("  ✓ Clearing the filter shows every row again")
+        else:
+            print(f"  ✗ {len(view)} rows after clearing the filter")
+        
+        print("\n3. Testing sorting...")
+        view = ResultView(sort_keys={0: lambda host: tuple(int(part) for part in host.split('.'))})
+        view.add([('10.0.0.10', 80, PORT_OPEN, 'HTTP'), ('10.0.0.9', 443, PORT_OPEN, 'HTTPS'),
+                  ('10.0.0.100', 22, PORT_CLOSED, '')])
+        view.sort_by(1)
+        ascending = [row[1] for row in view.window(0, 3)]
+        view.sort_by(1)
+        descending = [row[1] for row in view.window(0, 3)]
+        if ascending == [22, 80, 443] and descending == [443, 80, 22]:
+            print("  ✓ Sorting the same column twice reverses the order")
+        else:
+            print(f"  ✗ Ascending {ascending}, descending {descending}")
+        view.sort_by(0)
+        view.add([('10.0.0.1', 8080, PORT_OPEN, 'HTTP-Proxy')])
+        hosts = [row[0] for row in view.window(0, 4)]
+        if hosts == ['10.0.0.1', '10.0.0.9', '10.0.0.10', '10.0.0.100']:
+            print("  ✓ Column sort key orders hosts numerically, including rows added later")
+        else:
+            print(f"  ✗ Host order {hosts}")
+        
+        print("\n4. Testing a large result set...")
+        view = ResultView()
+        start = time.time()
+        for host in range(100):
+            view.add([(f"10.0.{host}.1", port, PORT_OPEN, 'HTTP') for port in range(1, 1001)])
+        view.sort_by(1)
+        window = view.window(50000, 20)
+        view.set_filter('10.0.42.1')
+        filtered = len(view)
+        elapsed = time.time() - start
+        if len(view.rows) == 100000 and len(window) == 20 and filtered == 1000 and elapsed < 5:
+            print(f"  ✓ 100000 rows added, sorted, windowed and filtered in {elapsed:.2f}s")
+        else:
+            print(f"  ✗ {len(view.rows)} rows, window {len(window)}, filtered {filtered}, {elapsed:.2f}s")
+        
+        print("\n5. Testing clear...")
+        view.clear()
+        if len(view) == 0 and view.window(0, 20) == [] and view.filter_text == '10.0.42.1':
+            print("  ✓ Clear drops the rows but keeps the filter and sort settings")
+        else:
+            print(f"  ✗ {len(view)} rows after clear")
+        
+    except Exception as e:
+        print(f"  ✗ Error during test: {e}")
+    
+    print("\n" + "=" * 60)
+    print("Results view tests completed!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    test_results_view()
@@ -48,20 +48,29 @@ def test_port_scanner():
         ("127.0.0.1", True),
         ("192.168.1.1", True),
         ("256.1.1.1", False),
-        ("invalid", False),
+        ("scanme.example.com", True),
+        ("bad_host!", False),
         ("", False)
     ]
     
-    import re
-    pattern = re.compile(r"^(\d{1,3}\.){3}\d{1,3}$")
     for ip, expected in test_ips:
-        valid = False
-        if pattern.match(ip):
-            parts = ip.split('.')
-            valid = all(0 <= int(part) <= 255 for part in parts)
+        # The GUI validates its target field with parse_targets
+        try:
+            valid = bool(parse_targets(ip, resolve=False))
+        except ValueError:
+            valid = False
         result = "✓" if valid == expected else "✗"
         print(f"  {result} IP: {ip:20s} Valid: {valid} (Expected: {expected})")
     
+    long_names = ['fileserverbackupprimary01_x', 'a' * 24 + '!', 'x' * 254, 'host.' + 'b' * 64 + '.example']
+    started = time.time()
+    rejected = [name for name in long_names if not is_hostname(name)]
+    elapsed = time.time() - started
+    if rejected == long_names and elapsed < 0.1:
+        print(f"  ✓ Long invalid names rejected in {elapsed * 1000:.2f}ms")
+    else:
+        print(f"  ✗ Rejected {len(rejected)}/{len(long_names)} long invalid names in {elapsed:.2f}s")
+    
     print("\n2. Testing port validation...")
     test_ports = [
         ("80", True),
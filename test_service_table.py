@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Test script for the lazily loaded port -> service table
+"""
+
+import socket
+import tempfile
+import time
+import sys
+import os
+
+def test_service_table():
+    """Test lazy loading, lookups and merging of local service names"""
+    print("=" * 60)
+    print("IP Port Scanner - Service Table Tests")
+    print("=" * 60)
+    
+    # Add the script directory to path for imports
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, script_dir)
+    
+    # Import scanner components by reading only what's needed
+    scanner_file = os.path.join(script_dir, 'port_scanner.py')
+    with open(scanner_file, 'r') as f:
+        lines = f.readlines()
+    
+    # Extract non-GUI code (imports, constants, scanner classes)
+    scanner_code = []
+    gui_started = False
+    
+    for line in lines:
+        # Skip GUI-related imports
+        if 'import tkinter' in line or 'from tkinter' in line:
+            continue
+        # Stop before GUI class definition
+        if 'class PortScannerGUI:' in line:
+            gui_started = True
+            break
+        if not gui_started:
+            scanner_code.append(line)
+    
+    # Load the scanner code into globals
+    exec(''.join(scanner_code), globals())
+    
+    test_ports = [9876, 9877]
+    server_sockets = []
+    services_dir = tempfile.mkdtemp()
+    
+    try:
+        for port in test_ports:
+            server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            server_socket.bind(('127.0.0.1', port))
+            server_socket.listen(128)
+            server_sockets.append(server_socket)
+        print(f"  Started test servers on ports {test_ports}")
+        
+        print("\n1. Testing the table loads lazily...")
+        table = ServiceTable()
+        if table.indexes is None and table.names is None:
+            started = time.time()
+            name = table.lookup(25)
+            print(f"  ✓ Nothing decoded until the first lookup ({name!r} after {(time.time() - started) * 1000:.1f}ms)")
+        else:
+            print("  ✗ Table decoded at construction")
+        
+        print("\n2. Testing lookups...")
+        checks = {(22, 'tcp'): 'SSH', (443, 'tcp'): 'HTTPS', (53, 'udp'): 'domain', (0, 'tcp'): 'Unknown Service',
+                  (70000, 'tcp'): 'Unknown Service'}
+        found = {key: table.lookup(*key) for key in checks}
+        if found == checks and len(table) > len(COMMON_SERVICES):
+            print(f"  ✓ {len(table)} named entries; {found}")
+        else:
+            print(f"  ✗ Lookups {found}, {len(table)} entries")
+        started = time.time()
+        for _ in range(100000):
+            service_name(8080)
+        elapsed = time.time() - started
+        if elapsed < 1:
+            print(f"  ✓ 100000 lookups in {elapsed:.3f}s")
+        else:
+            print(f"  ✗ 100000 lookups took {elapsed:.3f}s")
+        
+        print("\n3. Testing the local services file fills unnamed ports...")
+        services_file = os.path.join(services_dir, 'services')
+        with open(services_file, 'w') as f:
+            f.write("# local additions\n")
+            f.write("scanner-test\t9876/tcp\t\t# test listener\n")
+            f.write("not-ssh\t\t22/tcp\n")
+            f.write("broken line\n")
+        table = ServiceTable(services_file=services_file)
+        if table.lookup(9876) == 'scanner-test' and table.lookup(22) == 'SSH' and table.lookup(9876, 'udp') == 'Unknown Service':
+            print("  ✓ Local entry used for an unnamed port; built-in and display names kept")
+        else:
+            print(f"  ✗ 9876 -> {table.lookup(9876)}, 22 -> {table.lookup(22)}")
+        missing = ServiceTable(data='', services_file=os.path.join(services_dir, 'absent'))
+        if missing.lookup(80) == 'HTTP' and missing.lookup(81) == 'Unknown Service':
+            print("  ✓ Works without embedded data or a services file")
+        else:
+            print(f"  ✗ Bare table gave {missing.lookup(80)}, {missing.lookup(81)}")
+        bundled = ServiceTable(services_file=os.path.join(services_dir, 'absent'))
+        registered = {port: bundled.lookup(port) for port in (3000, 6443, 9200, 11211, 10250, 25565)}
+        if 'Unknown Service' not in registered.values():
+            print(f"  ✓ Registry and override ports named without a services file: {registered}")
+        else:
+            print(f"  ✗ Built-in table is missing names: {registered}")
+        
+        print("\n4. Testing the table builder round-trips...")
+        import build_service_table
+        payload, counts = build_service_table.build_payload([('tcp', 4000, 'alpha'), ('udp', 4000, 'beta'),
+                                                             ('tcp', 4000, 'ignored'), ('tcp', 65535, 'alpha')])
+        encoded = base64.b85encode(zlib.compress(payload)).decode()
+        table = ServiceTable(data=encoded, services_file=os.path.join(services_dir, 'absent'))
+        if (table.lookup(4000), table.lookup(4000, 'udp'), table.lookup(65535)) == ('alpha', 'beta', 'alpha') \
+                and counts == {'tcp': 2, 'udp': 1}:
+            print("  ✓ Built table decodes to the same names; first source wins")
+        else:
+            print(f"  ✗ Decoded {table.lookup(4000)}, {table.lookup(4000, 'udp')}, counts {counts}")
+        registry = os.path.join(services_dir, 'service-names-port-numbers.csv')
+        with open(registry, 'w', encoding='utf-8') as f:
+            f.write("Service Name,Port Number,Transport Protocol,Description\n")
+            f.write("ircu,6665-6667,tcp,IRCU\n")
+            f.write("wap-wsp,9200,udp,WAP connectionless session service\n")
+            f.write(",9300,tcp,Unassigned\n")
+            f.write("sctp-only,9301,sctp,Not TCP or UDP\n")
+        entries = list(build_service_table.read_iana_csv(registry))
+        if entries == [('tcp', 6665, 'ircu'), ('tcp', 6666, 'ircu'), ('tcp', 6667, 'ircu'), ('udp', 9200, 'wap-wsp')]:
+            print("  ✓ Registry CSV rows expand port ranges and skip unnamed or non-TCP/UDP rows")
+        else:
+            print(f"  ✗ Registry CSV gave {entries}")
+        
+        print("\n5. Testing scan results carry table names...")
+        scanner = PortScanner('127.0.0.1', 9870, 9885, timeout=0.3)
+        results = scanner.scan(num_threads=10)
+        if results and all(service == service_name(port) for port, service in results):
+            print(f"  ✓ Results {results}")
+        else:
+            print(f"  ✗ Results {results}")
+        
+    except Exception as e:
+        print(f"  ✗ Error during test: {e}")
+    finally:
+        for server_socket in server_sockets:
+            server_socket.close()
+        for name in os.listdir(services_dir):
+            os.remove(os.path.join(services_dir, name))
+        os.rmdir(services_dir)
+        print(f"\n  Closed all test servers")
+    
+    print("\n" + "=" * 60)
+    print("Service table tests completed!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    test_service_table()
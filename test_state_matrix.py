@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Test script for the bit-packed port state matrix
+"""
+
+import socket
+import json
+import tempfile
+import time
+import sys
+import os
+
+def test_state_matrix():
+    """Test matrix storage, queries, file backing and scanner integration"""
+    print("=" * 60)
+    print("IP Port Scanner - State Matrix Tests")
+    print("=" * 60)
+    
+    # Add the script directory to path for imports
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, script_dir)
+    
+    # Import scanner components by reading only what's needed
+    scanner_file = os.path.join(script_dir, 'port_scanner.py')
+    with open(scanner_file, 'r') as f:
+        lines = f.readlines()
+    
+    # Extract non-GUI code (imports, constants, scanner classes)
+    scanner_code = []
+    gui_started = False
+    
+    for line in lines:
+        # Skip GUI-related imports
+        if 'import tkinter' in line or 'from tkinter' in line:
+            continue
+        # Stop before GUI class definition
+        if 'class PortScannerGUI:' in line:
+            gui_started = True
+            break
+        if not gui_started:
+            scanner_code.append(line)
+    
+    # Load the scanner code into globals
+    exec(''.join(scanner_code), globals())
+    
+    test_ports = [9876, 9877]
+    server_sockets = []
+    matrix_dir = tempfile.mkdtemp()
+    
+    try:
+        for port in test_ports:
+            server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            server_socket.bind(('127.0.0.1', port))
+            server_socket.listen(128)
+            server_sockets.append(server_socket)
+        print(f"  Started test servers on ports {test_ports}")
+        
+        print("\n1. Testing 2-bit packing...")
+        hosts = [f"10.0.{i // 256}.{i % 256}" for i in range(512)]
+        matrix = PortStateMatrix(hosts)
+        if len(matrix.buffer) == 512 * 16384:
+            print("  ✓ 512 hosts x 65536 ports held in 8 MiB")
+        else:
+            print(f"  ✗ Buffer is {len(matrix.buffer)} bytes")
+        matrix.set('10.0.0.7', 0, PORT_OPEN)
+        matrix.set('10.0.0.7', 1, PORT_CLOSED)
+        matrix.set('10.0.0.7', 2, PORT_FILTERED)
+        matrix.set('10.0.0.7', 65535, PORT_OPEN)
+        matrix.set('10.0.0.7', 3, PORT_OPEN)
+        matrix.set('10.0.0.7', 3, PORT_ERROR)
+        states = [matrix.get('10.0.0.7', port) for port in (0, 1, 2, 3, 65535)]
+        if states == [PORT_OPEN, PORT_CLOSED, PORT_FILTERED, None, PORT_OPEN] and matrix.get('10.0.0.8', 0) is None:
+            print(f"  ✓ Neighbouring lanes kept apart: {states}")
+        else:
+            print(f"  ✗ States {states}")
+        
+        print("\n2. Testing row and column queries...")
+        for i, host in enumerate(hosts):
+            if i % 3 == 0:
+                matrix.set(host, 443, PORT_OPEN)
+            matrix.set(host, 22, PORT_FILTERED)
+        started = time.time()
+        open_hosts = matrix.hosts_with(443)
+        filtered_hosts = matrix.hosts_with(22, PORT_FILTERED)
+        row = matrix.ports('10.0.0.7')
+        elapsed = time.time() - started
+        if open_hosts == hosts[::3] and len(filtered_hosts) == 512:
+            print(f"  ✓ hosts_with(443) found {len(open_hosts)} hosts, hosts_with(22, filtered) {len(filtered_hosts)}")
+        else:
+            print(f"  ✗ hosts_with returned {len(open_hosts)} / {len(filtered_hosts)} hosts")
+        if row == [0, 65535] and matrix.ports('10.0.0.7', PORT_FILTERED) == [2, 22]:
+            print(f"  ✓ ports() returns sorted ports per state ({elapsed * 1000:.1f}ms for three queries)")
+        else:
+            print(f"  ✗ ports() returned {row}")
+        
+        print("\n3. Testing the memory-mapped file...")
+        path = os.path.join(matrix_dir, 'states.psm')
+        matrix = PortStateMatrix(hosts, path=path)
+        matrix.set('10.0.1.44', 8080, PORT_OPEN)
+        matrix.set('10.0.1.255', 8080, PORT_OPEN)
+        matrix.close()
+        reopened = PortStateMatrix.open(path)
+        if reopened.hosts == hosts and reopened.hosts_with(8080) == ['10.0.1.44', '10.0.1.255']:
+            print(f"  ✓ Reopened {os.path.getsize(path)} byte file is still queryable")
+        else:
+            print(f"  ✗ Reopened matrix has {reopened.hosts_with(8080)}")
+        reopened.close()
+        try:
+            with open(os.path.join(matrix_dir, 'bogus'), 'wb') as f:
+                f.write(b'not a matrix')
+            PortStateMatrix.open(os.path.join(matrix_dir, 'bogus'))
+            print("  ✗ Should have raised ValueError for a foreign file")
+        except ValueError as e:
+            print(f"  ✓ Correctly raised ValueError: {e}")
+        
+        print("\n4. Testing scanners store every state in the matrix...")
+        scanner = PortScanner('127.0.0.1', 9870, 9880, timeout=0.3, record_states=True)
+        scanner.scan(num_threads=4)
+        matrix = scanner.state_matrix
+        if matrix.ports('127.0.0.1') == test_ports and len(matrix.ports('127.0.0.1', PORT_CLOSED)) == 9:
+            print("  ✓ Open and closed ports recorded")
+        else:
+            print(f"  ✗ Matrix rows {matrix.ports('127.0.0.1')}")
+        
+        print("\n5. Testing export reads straight from the matrix...")
+        path = os.path.join(matrix_dir, 'multi.psm')
+        scanner = MultiTargetScanner('127.0.0.1-2', 9875, 9877, timeout=0.3, state_file=path)
+        streamed = list(scanner.iter_scan(num_threads=4))
+        export = os.path.join(matrix_dir, 'multi.json')
+        scanner.export_results(export, 'json')
+        with open(export) as f:
+            data = json.load(f)
+        ports = [entry['port'] for entry in data['results'].get('127.0.0.1', [])]
+        if scanner.open_ports == [] and len(streamed) == 2 and ports == test_ports:
+            print(f"  ✓ Streaming scan kept no result list; export still lists {ports}")
+        else:
+            print(f"  ✗ Export results {data['results']}")
+        if scanner.state_matrix.hosts_with(9875, PORT_CLOSED) == ['127.0.0.1', '127.0.0.2']:
+            print("  ✓ hosts_with() answers across the scanned hosts")
+        else:
+            print(f"  ✗ hosts_with(9875, closed) = {scanner.state_matrix.hosts_with(9875, PORT_CLOSED)}")
+        scanner.state_matrix.close()
+        
+    except Exception as e:
+        print(f"  ✗ Error during test: {e}")
+    finally:
+        for server_socket in server_sockets:
+            server_socket.close()
+        for name in os.listdir(matrix_dir):
+            os.remove(os.path.join(matrix_dir, name))
+        os.rmdir(matrix_dir)
+        print(f"\n  Closed all test servers")
+    
+    print("\n" + "=" * 60)
+    print("State matrix tests completed!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    test_state_matrix()
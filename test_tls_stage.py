@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Test script for the TLS handshake and certificate stage
+"""
+
+import socket
+import threading
+import tempfile
+import json
+import ssl
+import subprocess
+from datetime import datetime, timedelta, timezone
+import time
+import sys
+import os
+
+def test_tls_stage():
+    """Test handshakes, certificate parsing and caching, sessions and exports"""
+    print("=" * 60)
+    print("IP Port Scanner - TLS Stage Tests")
+    print("=" * 60)
+    
+    # Add the script directory to path for imports
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, script_dir)
+    
+    # Import scanner components by reading only what's needed
+    scanner_file = os.path.join(script_dir, 'port_scanner.py')
+    with open(scanner_file, 'r') as f:
+        lines = f.readlines()
+    
+    # Extract non-GUI code (imports, constants, scanner classes)
+    scanner_code = []
+    gui_started = False
+    
+    for line in lines:
+        # Skip GUI-related imports
+        if 'import tkinter' in line or 'from tkinter' in line:
+            continue
+        # Stop before GUI class definition
+        if 'class PortScannerGUI:' in line:
+            gui_started = True
+            break
+        if not gui_started:
+            scanner_code.append(line)
+    
+    # Load the scanner code into globals
+    exec(''.join(scanner_code), globals())
+    
+    # 9876 and 9877 share one certificate, 9878 caps TLS at 1.2, 9879 is plain TCP
+    tls_ports = [9876, 9877, 9878]
+    test_ports = tls_ports + [9879]
+    server_sockets = []
+    work_dir = tempfile.mkdtemp()
+    cert_file = os.path.join(work_dir, 'cert.pem')
+    key_file = os.path.join(work_dir, 'key.pem')
+    
+    def serve(server_socket, context):
+        while True:
+            try:
+                conn, _ = server_socket.accept()
+            except OSError:
+                return
+            try:
+                if context:
+                    conn = context.wrap_socket(conn, server_side=True)
+                    conn.sendall(b"hello\n")  # Lets TLS 1.3 session tickets reach the client
+                else:
+                    time.sleep(0.1)
+            except OSError:
+                pass
+            finally:
+                conn.close()
+    
+    try:
+        subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '30',
+                        '-keyout', key_file, '-out', cert_file, '-subj', '/CN=*.example.test/O=Port Scanner Test',
+                        '-addext', 'subjectAltName=DNS:*.example.test,DNS:example.test'],
+                       check=True, capture_output=True)
+        print("  Generated a self-signed wildcard certificate")
+        contexts = {}
+        for port in tls_ports:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(cert_file, key_file)
+            if port == 9878:
+                context.maximum_version = ssl.TLSVersion.TLSv1_2
+            contexts[port] = context
+        for port in test_ports:
+            server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            server_socket.bind(('127.0.0.1', port))
+            server_socket.listen(128)
+            server_sockets.append(server_socket)
+            thread = threading.Thread(target=serve, args=(server_socket, contexts.get(port)))
+            thread.daemon = True
+            thread.start()
+        print(f"  Started TLS servers on {tls_ports} and a plain server on 9879")
+        
+        print("\n1. Testing certificate parsing...")
+        with open(cert_file) as f:
+            der = ssl.PEM_cert_to_DER_cert(f.read())
+        cert = parse_certificate(der)
+        expected_expiry = datetime.now(timezone.utc) + timedelta(days=30)
+        if cert.subject == 'CN=*.example.test, O=Port Scanner Test' and cert.issuer == cert.subject \
+                and abs(cert.not_after - expected_expiry) < timedelta(minutes=5) \
+                and cert.dns_names == ['*.example.test', 'example.test']:
+            print(f"  ✓ {cert.subject}, expires {cert.not_after:%Y-%m-%d}, names {cert.dns_names}")
+        else:
+            print(f"  ✗ Parsed {cert}")
+        
+        print("\n2. Testing the stage during a scan...")
+        prober = TlsProber(handshake_timeout=0.5)
+        scanner = PortScanner('127.0.0.1', 9870, 9885, timeout=0.3, tls_prober=prober)
+        results = scanner.scan(num_threads=10)
+        tls = {port: scanner.tls_info('127.0.0.1', port) for port in test_ports}
+        if [port for port, _ in results] == test_ports and all(tls[port] for port in tls_ports) and tls[9879] is None:
+            print(f"  ✓ Handshakes on {tls_ports}; plain port 9879 recorded nothing")
+        else:
+            print(f"  ✗ Results {results}, TLS {tls}")
+        if tls[9878] and tls[9878].protocol == 'TLSv1.2' and tls[9876].protocol in ('TLSv1.2', 'TLSv1.3'):
+            print(f"  ✓ Protocols {tls[9876].protocol} / {tls[9878].protocol}, cipher {tls[9876].cipher}")
+        else:
+            print(f"  ✗ Protocols {tls}")
+        if prober.parsed == 1 and len(prober.certificates) == 1 and tls[9876].certificate is tls[9877].certificate:
+            print("  ✓ Three ports presenting one certificate parsed it once")
+        else:
+            print(f"  ✗ Parsed {prober.parsed} certificates")
+        
+        print("\n3. Testing session resumption on a rescan...")
+        scanner.scan(num_threads=10)
+        reused = scanner.tls_info('127.0.0.1', 9878)
+        if reused and reused.session_reused:
+            print("  ✓ TLS 1.2 session from the first scan was resumed")
+        else:
+            print(f"  ✗ Second scan TLS result {reused}")
+        
+        print("\n4. Testing a restricted port set and multiple targets...")
+        prober = TlsProber(handshake_timeout=0.5, ports={9877})
+        scanner = MultiTargetScanner('127.0.0.1-2', 9870, 9885, timeout=0.3, tls_prober=prober)
+        scanner.scan(num_threads=20)
+        if list(prober.results) == [('127.0.0.1', 9877)]:
+            print("  ✓ Only the listed port was probed")
+        else:
+            print(f"  ✗ Probed {list(prober.results)}")
+        
+        print("\n5. Testing TLS details in every export format...")
+        prober = TlsProber(handshake_timeout=0.5)
+        scanner = PortScanner('127.0.0.1', 9876, 9879, timeout=0.3, tls_prober=prober)
+        scanner.scan()
+        contents = {}
+        for file_format in ('json', 'csv', 'txt'):
+            path = os.path.join(work_dir, f'tls.{file_format}')
+            scanner.export_results(path, file_format)
+            with open(path) as f:
+                contents[file_format] = f.read()
+        entries = {entry['port']: entry for entry in json.loads(contents['json'])['results']}
+        if entries[9876]['tls']['subject'] == cert.subject and entries[9876]['tls']['sha256'] == cert.fingerprint \
+                and 'tls' not in entries[9879]:
+            print("  ✓ JSON carries protocol, cipher and certificate details")
+        else:
+            print(f"  ✗ JSON entries {entries}")
+        if 'TLS Protocol,TLS Cipher,Cert Subject,Cert Expires,Cert SHA256' in contents['csv'] \
+                and cert.fingerprint in contents['csv']:
+            print("  ✓ CSV has TLS columns")
+        else:
+            print(f"  ✗ CSV:\n{contents['csv']}")
+        if f"expires {cert.not_after:%Y-%m-%d}" in contents['txt']:
+            print("  ✓ Text export shows the certificate expiry")
+        else:
+            print(f"  ✗ Text:\n{contents['txt']}")
+        
+    except Exception as e:
+        print(f"  ✗ Error during test: {e}")
+    finally:
+        for server_socket in server_sockets:
+            server_socket.close()
+        for name in os.listdir(work_dir):
+            os.remove(os.path.join(work_dir, name))
+        os.rmdir(work_dir)
+        print(f"\n  Closed all test servers")
+    
+    print("\n" + "=" * 60)
+    print("TLS stage tests completed!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    test_tls_stage()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Test script for the top-N most-likely-open ports mode
+"""
+
+import socket
+import tempfile
+import time
+import sys
+import os
+
+def test_top_ports():
+    """Test the port ranking and scanning only the top N ports"""
+    print("=" * 60)
+    print("IP Port Scanner - Top Ports Tests")
+    print("=" * 60)
+    
+    # Add the script directory to path for imports
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, script_dir)
+    
+    # Import scanner components by reading only what's needed
+    scanner_file = os.path.join(script_dir, 'port_scanner.py')
+    with open(scanner_file, 'r') as f:
+        lines = f.readlines()
+    
+    # Extract non-GUI code (imports, constants, scanner classes)
+    scanner_code = []
+    gui_started = False
+    
+    for line in lines:
+        # Skip GUI-related imports
+        if 'import tkinter' in line or 'from tkinter' in line:
+            continue
+        # Stop before GUI class definition
+        if 'class PortScannerGUI:' in line:
+            gui_started = True
+            break
+        if not gui_started:
+            scanner_code.append(line)
+    
+    # Load the scanner code into globals
+    exec(''.join(scanner_code), globals())
+    
+    # Both are among the hundred most commonly open ports
+    test_ports = [9999, 10000]
+    server_sockets = []
+    work_dir = tempfile.mkdtemp()
+    
+    try:
+        for port in test_ports:
+            server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            server_socket.bind(('127.0.0.1', port))
+            server_socket.listen(128)
+            server_sockets.append(server_socket)
+        print(f"  Started test servers on ports {test_ports}")
+        
+        print("\n1. Testing the ranking...")
+        ranking = top_ports(65535)
+        if sorted(ranking) == list(range(1, 65536)) and ranking[:len(TOP_PORTS)] == list(TOP_PORTS):
+            print(f"  ✓ Ranking covers all 65535 ports exactly once, led by {ranking[:5]}")
+        else:
+            print(f"  ✗ Ranking has {len(ranking)} ports ({len(set(ranking))} distinct)")
+        head = top_ports(1000)
+        if len(head) == 1000 and all(port in head for port in range(1, 1025) if port in COMMON_SERVICES):
+            print(f"  ✓ Top 1000 includes every common service port; last is {head[-1]}")
+        else:
+            print(f"  ✗ Top 1000 misses {[port for port in COMMON_SERVICES if port not in head]}")
+        ranged = top_ports(5, 8000, 9000)
+        if ranged == [port for port in ranking if 8000 <= port <= 9000][:5]:
+            print(f"  ✓ Ranking restricted to 8000-9000: {ranged}")
+        else:
+            print(f"  ✗ Restricted ranking {ranged}")
+        
+        print("\n2. Testing a top-N scan probes only the N best ports, best first...")
+        scanner = PortScanner('127.0.0.1', 1, 65535, timeout=0.3, top_ports=100)
+        probed = []
+        original_connect = scanner.connect
+        scanner.connect = lambda host, port: probed.append(port) or original_connect(host, port)
+        results = scanner.scan(num_threads=1)
+        if probed == top_ports(100) and scanner.total_ports == 100:
+            print(f"  ✓ Probed the top 100 in rank order: {probed[:5]}...")
+        else:
+            print(f"  ✗ Probed {len(probed)} ports: {probed[:10]}")
+        if [port for port, _ in results] == test_ports:
+            print(f"  ✓ Found {results}")
+        else:
+            print(f"  ✗ Results {results}")
+        
+        print("\n3. Testing other engines and multiple targets...")
+        for engine in ('asyncio', 'selectors'):
+            scanner = create_scanner('127.0.0.1', 1, 65535, engine=engine, timeout=0.3, top_ports=100)
+            results = scanner.scan()
+            if [port for port, _ in results] == test_ports and scanner.total_ports == 100:
+                print(f"  ✓ {engine}: {len(results)} hits in the top 100")
+            else:
+                print(f"  ✗ {engine}: {results}, {scanner.total_ports} ports")
+        scanner = MultiTargetScanner('127.0.0.1-2', 1, 65535, timeout=0.3, top_ports=100)
+        results = scanner.scan(num_threads=20)
+        if scanner.total_ports == 200 and [port for port, _ in results.get('127.0.0.1', [])] == test_ports:
+            print("  ✓ Multi-target scan covers the top 100 on each host")
+        else:
+            print(f"  ✗ Multi-target: {results}, {scanner.total_ports} ports")
+        try:
+            ProcessPortScanner('127.0.0.1', 1, 65535, top_ports=100)
+            print("  ✗ Process engine accepted top_ports")
+        except ValueError as e:
+            print(f"  ✓ Process engine refuses top_ports: {e}")
+        
+        print("\n4. Testing journals and exports record the mode...")
+        path = os.path.join(work_dir, 'top.journal')
+        PortScanner('127.0.0.1', 1, 65535, timeout=0.3, top_ports=20, journal=path).scan(num_threads=10)
+        resumed = resume_scan(path)
+        if resumed.top_ports == 20 and resumed._build_port_list() == top_ports(20):
+            print("  ✓ Resumed scan rebuilds the same top-20 port list")
+        else:
+            print(f"  ✗ Resumed scanner has top_ports={resumed.top_ports}")
+        export = os.path.join(work_dir, 'top.txt')
+        scanner = PortScanner('127.0.0.1', 1, 65535, timeout=0.3, top_ports=100)
+        scanner.scan()
+        scanner.export_results(export, 'txt')
+        with open(export) as f:
+            label = [line.strip() for line in f if line.startswith('Port Range')]
+        if label == ['Port Range: 1-65535 (top 100)']:
+            print(f"  ✓ Export says {label[0]!r}")
+        else:
+            print(f"  ✗ Export label {label}")
+        
+    except Exception as e:
+        print(f"  ✗ Error during test: {e}")
+    finally:
+        for server_socket in server_sockets:
+            server_socket.close()
+        for name in os.listdir(work_dir):
+            os.remove(os.path.join(work_dir, name))
+        os.rmdir(work_dir)
+        print(f"\n  Closed all test servers")
+    
+    print("\n" + "=" * 60)
+    print("Top ports tests completed!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    test_top_ports()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Test script for chunked work distribution with work stealing
+"""
+
+import socket
+import threading
+import errno
+import sys
+import os
+
+def test_work_distribution():
+    """Test chunk claiming, stealing and batched merging"""
+    print("=" * 60)
+    print("IP Port Scanner - Work Distribution Tests")
+    print("=" * 60)
+    
+    # Add the script directory to path for imports
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, script_dir)
+    
+    # Import scanner components by reading only what's needed
+    scanner_file = os.path.join(script_dir, 'port_scanner.py')
+    with open(scanner_file, 'r') as f:
+        lines = f.readlines()
+    
+    # Extract non-GUI code (imports, constants, scanner classes)
+    scanner_code = []
+    gui_started = False
+    
+    for line in lines:
+        # Skip GUI-related imports
+        if 'import tkinter' in line or 'from tkinter' in line:
+            continue
+        # Stop before GUI class definition
+        if 'class PortScannerGUI:' in line:
+            gui_started = True
+            break
+        if not gui_started:
+            scanner_code.append(line)
+    
+    # Load the scanner code into globals
+    exec(''.join(scanner_code), globals())
+    
+    test_ports = [9876, 9877]
+    server_sockets = []
+    
+    try:
+        for port in test_ports:
+            server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            server_socket.bind(('127.0.0.1', port))
+            server_socket.listen(128)
+            server_sockets.append(server_socket)
+        print(f"  Started test servers on ports {test_ports}")
+        
+        print("\n1. Testing chunk claiming...")
+        work = ChunkedWork(list(range(1000)), 4, chunk_size=64)
+        first = work.claim(0)
+        if first == list(range(64)) and work.shares[1] == [250, 500]:
+            print("  ✓ Each worker starts on its own contiguous share, 64 ports per claim")
+        else:
+            print(f"  ✗ First claim {first[:3]}.., shares {work.shares}")
+        
+        print("\n2. Testing work stealing...")
+        work = ChunkedWork(list(range(1000)), 4, chunk_size=64)
+        claimed = []
+        chunk = work.claim(0)
+        while chunk:
+            claimed.extend(chunk)
+            chunk = work.claim(0)
+        if sorted(claimed) == list(range(1000)) and work.steals > 0:
+            print(f"  ✓ A lone worker finished all 1000 ports after {work.steals} steals")
+        else:
+            print(f"  ✗ Claimed {len(claimed)} ports with {work.steals} steals")
+        
+        print("\n3. Testing concurrent claims hand out every port exactly once...")
+        work = ChunkedWork(list(range(20000)), 8, chunk_size=16)
+        claimed = [[] for _ in range(8)]
+        
+        def drain(index):
+            chunk = work.claim(index)
+            while chunk:
+                claimed[index].extend(chunk)
+                chunk = work.claim(index)
+        
+        threads = [threading.Thread(target=drain, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        everything = sorted(port for ports in claimed for port in ports)
+        if everything == list(range(20000)):
+            print("  ✓ No port lost or handed out twice")
+        else:
+            print(f"  ✗ {len(everything)} ports claimed, {len(set(everything))} unique")
+        work = ChunkedWork(list(range(100)), 2, chunk_size=10)
+        work.claim(0)
+        if sorted(work.drain()) == list(range(10, 100)) and not work.claim(1):
+            print("  ✓ drain() returns the unclaimed ports")
+        else:
+            print("  ✗ drain() returned the wrong ports")
+        
+        print("\n4. Testing scans probe every port once and merge in batches...")
+        scanner = PortScanner('127.0.0.1', 9000, 9999, timeout=0.3)
+        probed = []
+        original_connect = scanner.connect
+        scanner.connect = lambda host, port: probed.append(port) or original_connect(host, port)
+        progress_updates = []
+        results = scanner.scan(num_threads=50,
+                               progress_callback=lambda scanned, total: progress_updates.append(scanned))
+        if sorted(probed) == list(range(9000, 10000)) and scanner.ports_scanned == 1000:
+            print("  ✓ 1000 ports probed exactly once")
+        else:
+            print(f"  ✗ Probed {len(probed)} ({len(set(probed))} unique), counted {scanner.ports_scanned}")
+        if [port for port, _ in results] == test_ports and progress_updates[-1] == 1000:
+            print(f"  ✓ Results correct with {len(progress_updates)} merges for 1000 probes")
+        else:
+            print(f"  ✗ Results {results}, last progress {progress_updates[-1:]}")
+        
+        print("\n5. Testing resource errors retry inside the worker's chunk...")
+        scanner = PortScanner('127.0.0.1', 9870, 9880, timeout=0.3)
+        failures = {9876: 2}
+        original_connect = scanner.connect
+        
+        def flaky_connect(host, port):
+            if failures.get(port):
+                failures[port] -= 1
+                return errno.EMFILE
+            return original_connect(host, port)
+        
+        scanner.connect = flaky_connect
+        results = scanner.scan(num_threads=2)
+        if [port for port, _ in results] == test_ports and scanner.ports_scanned == 11:
+            print("  ✓ Port retried after EMFILE and counted once")
+        else:
+            print(f"  ✗ Results {results}, scanned {scanner.ports_scanned}")
+        
+        print("\n6. Testing workers back off while descriptors stay exhausted...")
+        for scanner in (PortScanner('127.0.0.1', 9870, 9880, timeout=0.3),
+                        MultiTargetScanner(['127.0.0.1'], 9870, 9880, timeout=0.3, discovery_ports=[])):
+            attempts = []
+            exhausted_until = time.monotonic() + 0.5
+            original_connect = scanner.connect
+            
+            def exhausted_connect(host, port, original_connect=original_connect, attempts=attempts,
+                                  exhausted_until=exhausted_until):
+                if time.monotonic() < exhausted_until:
+                    attempts.append(port)
+                    return errno.EMFILE
+                return original_connect(host, port)
+            
+            scanner.connect = exhausted_connect
+            scanner.scan(num_threads=4)
+            name = type(scanner).__name__
+            if len(attempts) < 100 and len(scanner.open_ports) == len(test_ports) and scanner.ports_scanned == 11:
+                print(f"  ✓ {name}: {len(attempts)} failed connects in 0.5s of EMFILE, then every port scanned once")
+            else:
+                print(f"  ✗ {name}: {len(attempts)} failed connects in 0.5s, results {scanner.open_ports}")
+        
+    except Exception as e:
+        print(f"  ✗ Error during test: {e}")
+    finally:
+        for server_socket in server_sockets:
+            server_socket.close()
+        print(f"\n  Closed all test servers")
+    
+    print("\n" + "=" * 60)
+    print("Work distribution tests completed!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    test_work_distribution()